@@ -0,0 +1,139 @@
+"""Aggregates and charts behind /api/analytics.
+
+The figures only change when the dataset does, so they are computed once per
+dataset version and the serialised responses are kept in memory. Charts are
+drawn on standalone ``Figure`` objects rather than through pyplot, whose
+global state is not thread-safe.
+"""
+import base64
+import hashlib
+import json
+import threading
+from io import BytesIO
+
+import numpy as np
+
+from metrics import timed
+
+
+def compute_aggregates(data):
+    """Everything the analytics page plots, as plain JSON-friendly values"""
+    prices = data['Price_in_Lakhs'].to_numpy(dtype=float)
+    counts, edges = np.histogram(prices[~np.isnan(prices)], bins=50)
+
+    state_prices = data.groupby('State', observed=True)['Price_in_Lakhs'].mean().sort_values(ascending=False).head(10)
+    bhk_prices = data.groupby('BHK', observed=True)['Price_in_Lakhs'].mean()
+    property_counts = data['Property_Type'].value_counts()
+
+    return {
+        'summary': {
+            'total': int(len(data)),
+            'avg_price': float(np.nanmean(prices)) if len(prices) else 0.0,
+            'avg_bhk': float(data['BHK'].mean()) if len(data) else 0.0,
+            'states': int(data['State'].nunique()),
+        },
+        'price_dist': {'bin_edges': edges.tolist(), 'counts': counts.tolist()},
+        'price_by_state': {'labels': [str(s) for s in state_prices.index], 'values': state_prices.tolist()},
+        'bhk_vs_price': {'labels': [str(b) for b in bhk_prices.index], 'values': bhk_prices.tolist()},
+        'property_type_dist': {'labels': [str(p) for p in property_counts.index],
+                               'values': property_counts.astype(int).tolist()},
+    }
+
+
+def _figure_to_base64(fig):
+    img = BytesIO()
+    fig.savefig(img, format='png', bbox_inches='tight')
+    return base64.b64encode(img.getvalue()).decode()
+
+
+def render_charts(aggregates):
+    """Render the four analytics charts as base64 PNGs"""
+    # matplotlib is only needed once charts are requested; keep it out of app startup
+    from matplotlib.figure import Figure
+
+    charts = {}
+
+    # Price distribution
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    hist = aggregates['price_dist']
+    edges = hist['bin_edges']
+    ax.hist(edges[:-1], bins=edges, weights=hist['counts'], alpha=0.7, color='skyblue')
+    ax.set_title('Price Distribution')
+    ax.set_xlabel('Price (Lakhs)')
+    ax.set_ylabel('Frequency')
+    charts['price_dist'] = _figure_to_base64(fig)
+
+    # Price by State
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    state = aggregates['price_by_state']
+    ax.bar(state['labels'], state['values'], color='lightcoral')
+    ax.set_title('Average Price by State (Top 10)')
+    ax.set_xlabel('State')
+    ax.set_ylabel('Average Price (Lakhs)')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    charts['price_by_state'] = _figure_to_base64(fig)
+
+    # BHK vs Price
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    bhk = aggregates['bhk_vs_price']
+    ax.bar(bhk['labels'], bhk['values'], color='lightgreen')
+    ax.set_title('Average Price by BHK')
+    ax.set_xlabel('BHK')
+    ax.set_ylabel('Average Price (Lakhs)')
+    charts['bhk_vs_price'] = _figure_to_base64(fig)
+
+    # Property Type Distribution
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+    prop = aggregates['property_type_dist']
+    ax.pie(prop['values'], labels=prop['labels'], autopct='%1.1f%%')
+    ax.set_title('Property Type Distribution')
+    charts['property_type_dist'] = _figure_to_base64(fig)
+
+    return charts
+
+
+class CachedResponse:
+    """A serialised response body and its ETag"""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload).encode()
+        self.etag = hashlib.sha1(self.body).hexdigest()
+
+
+class AnalyticsCache:
+    """Computes aggregates and charts once per dataset version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._aggregates = None
+        self._charts = None
+
+    def _refresh(self, data, version):
+        if self._version != version:
+            with timed('analytics_refresh', 'aggregation'):
+                aggregates = compute_aggregates(data)
+            with timed('analytics_refresh', 'serialization'):
+                self._aggregates = CachedResponse(aggregates)
+            self._charts = None
+            self._version = version
+
+    def aggregates(self, data, version):
+        with self._lock:
+            self._refresh(data, version)
+            return self._aggregates
+
+    def charts(self, data, version):
+        with self._lock:
+            self._refresh(data, version)
+            if self._charts is None:
+                with timed('analytics_refresh', 'render'):
+                    charts = render_charts(json.loads(self._aggregates.body))
+                with timed('analytics_refresh', 'serialization'):
+                    self._charts = CachedResponse(charts)
+            return self._charts
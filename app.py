@@ -1,56 +1,185 @@
-from flask import Flask, render_template, request, jsonify
-import pandas as pd
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-import base64
 from io import BytesIO
 import json
-from bengaluru_model import train_bengaluru_model, predict_bengaluru_price
+import time
+import config
+from model_registry import ModelRegistry, ServedData, ServedModel, Source, validate_model
+from prediction_cache import PredictionCache
+from batching import MicroBatcher
+from analytics import AnalyticsCache
+from serializers import FastJSONProvider, FrameEncoder, MIMETYPES
+from data_index import DataIndex, InvalidQuery, SORT_COLUMNS
+import metrics
+from metrics import StageTimer
+
+# pandas, scikit-learn and the model code take seconds to import. They are
+# imported inside the functions that use them, so the app can answer health
+# checks as soon as Flask is up while the models load behind it.
+STARTED_AT = time.time()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+prediction_cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL)
+
+def serving_model(bundle):
+    """The estimator used for inference: flattened trees unless configured otherwise
+
+    With a latency budget, a distilled surrogate that meets it serves small
+    requests in front of the forest.
+    """
+    model = bundle['model']
+    if config.INFERENCE_BACKEND == 'flat':
+        from tree_engine import compile_model
+        model = compile_model(model, max_rows=config.FLAT_MAX_ROWS)
+    if config.SURROGATE_P99_MS > 0:
+        from distill import budgeted_model
+        model = budgeted_model(bundle['meta'], model, config.SURROGATE_P99_MS, config.FLAT_MAX_ROWS)
+    if config.MICROBATCH_WINDOW_MS > 0:
+        model = MicroBatcher(model, config.MICROBATCH_WINDOW_MS, config.MICROBATCH_MAX_ROWS, bundle['meta']['name'])
+    return model
+
+# Load the trained bundles written by train_models.py, retraining only when
+# an artifact is missing or was built from different data. In shared mode the
+# forests and the dataset are mapped from what the master process published.
+# A specific version is only requested by the registry when hot reloading.
+def load_model(version=None):
+    import model_store
+    from encoding import compile_encoders
+    from india_model import train_india_model
+    if config.SHARED_DIR:
+        import shared_store
+        bundle = shared_store.attach_model('india', version)
+    elif version is None:
+        bundle = model_store.load_or_train('india', train_india_model, config.DATA_PATH)
+    else:
+        bundle = model_store.load_bundle('india', version)
+    encoders = compile_encoders(bundle['encoders'])
+    return ServedModel(serving_model(bundle), encoders, bundle['feature_cols'], bundle['meta'])
+
+def load_bengaluru_model(version=None):
+    import model_store
+    from encoding import compile_encoders
+    from bengaluru_model import train_bengaluru_model, ENCODER_FALLBACKS
+    if config.SHARED_DIR:
+        import shared_store
+        bundle = shared_store.attach_model('bengaluru', version)
+    elif version is None:
+        bundle = model_store.load_or_train('bengaluru', train_bengaluru_model, config.BENGALURU_DATA_PATH)
+    else:
+        bundle = model_store.load_bundle('bengaluru', version)
+    encoders = compile_encoders(bundle['encoders'], ENCODER_FALLBACKS)
+    return ServedModel(serving_model(bundle), encoders, bundle['feature_cols'], bundle['meta'])
+
+def load_data(version):
+    """The India dataset with its query index and page encoder"""
+    if config.SHARED_DIR:
+        import shared_store
+        frame, version = shared_store.attach_frame(version=version)
+    else:
+        import data_store
+        from india_model import load_india_data
+        frame = data_store.compact_frame(load_india_data())
+    return ServedData(frame, version, DataIndex(frame, version), FrameEncoder(frame))
+
+def data_version():
+    """Checksum of the data the latest India bundle was trained on"""
+    if config.SHARED_DIR:
+        import shared_store
+        return shared_store.current_version('data')
+    import model_store
+    meta = model_store.read_meta('india')
+    return meta and meta['data_checksum']
+
+def model_version(name):
+    def version():
+        if config.SHARED_DIR:
+            import shared_store
+            return shared_store.current_version(name)
+        import model_store
+        return model_store.latest_version(name)
+    return version
+
+def latest(load):
+    """First load of a model: the latest bundle, trained if missing"""
+    def load_latest():
+        served = load()
+        return served, served.meta['version']
+    return load_latest
+
+def latest_data():
+    """First load of the dataset, matching the India model being served"""
+    version = data_version() if config.SHARED_DIR else registry.get('india').meta['data_checksum']
+    return load_data(version), version
+
+def canary(spec):
+    """Validate a new ServedModel on the default form inputs before it goes live"""
+    def validate(served):
+        from features import build_feature_row
+        return validate_model(served, [build_feature_row({}, spec, served.encoders, served.feature_columns)])
+    return validate
+
+def on_swap(name, previous):
+    if name != 'data':
+        prediction_cache.invalidate(name)
+        # Stop the replaced model's batching thread; requests still holding it predict directly
+        if isinstance(previous.model, MicroBatcher):
+            previous.model.close()
+
+# Each request reads one snapshot per model from the registry, so a hot
+# reload never mixes versions within a request. Entries load on first use,
+# and the warm-up thread loads them all in the background right away.
+registry = ModelRegistry({
+    'india': Source(model_version('india'), load_model, canary('india'), latest(load_model)),
+    'bengaluru': Source(model_version('bengaluru'), load_bengaluru_model, canary('bengaluru'),
+                        latest(load_bengaluru_model)),
+    'data': Source(data_version, load_data, initial=latest_data),
+}, interval=config.REGISTRY_POLL_SECONDS, on_swap=on_swap)
+
+if config.WARMUP:
+    registry.warm_up()
+registry.start()
+analytics_cache = AnalyticsCache()
+profiles = metrics.ProfileStore()
+
+@app.before_request
+def start_timing():
+    g.request_start = time.perf_counter()
+    # Sample this request's stack if asked to and profiling is switched on
+    g.profiler = None
+    if config.PROFILING and 'X-Profile' in request.headers:
+        g.profiler = metrics.SamplingProfiler(interval_ms=config.PROFILE_INTERVAL_MS).start()
 
-# Load and train model on startup
-def load_model():
-    df = pd.read_csv("india_housing_prices.csv")
-    df_clean = df.dropna(subset=['Price_in_Lakhs', 'Size_in_SqFt', 'BHK'])
-    
-    numerical_features = ['BHK', 'Size_in_SqFt', 'Price_per_SqFt', 'Year_Built', 
-                         'Floor_No', 'Total_Floors', 'Age_of_Property', 
-                         'Nearby_Schools', 'Nearby_Hospitals']
-    
-    categorical_features = ['State', 'Property_Type', 'Furnished_Status', 
-                           'Public_Transport_Accessibility', 'Parking_Space', 
-                           'Security', 'Facing', 'Owner_Type', 'Availability_Status']
-    
-    # Encode categorical variables
-    le_dict = {}
-    for col in categorical_features:
-        if col in df_clean.columns:
-            le = LabelEncoder()
-            df_clean[col + '_encoded'] = le.fit_transform(df_clean[col].astype(str))
-            le_dict[col] = le
-    
-    # Prepare features
-    feature_cols = [col for col in numerical_features if col in df_clean.columns]
-    feature_cols += [col + '_encoded' for col in categorical_features if col in df_clean.columns]
-    
-    X = df_clean[feature_cols].fillna(0)
-    y = df_clean['Price_in_Lakhs']
-    
-    # Train model
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X, y)
-    
-    return model, le_dict, feature_cols, df_clean
-
-# Load model and encoders
-model, encoders, feature_columns, data = load_model()
-bengaluru_model, bengaluru_encoders, bengaluru_features, bengaluru_data = train_bengaluru_model()
+@app.after_request
+def record_timing(response):
+    # Streamed bodies (batch scoring) are timed up to the first byte
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.REQUESTS.observe(time.perf_counter() - g.request_start, endpoint, request.method,
+                             str(response.status_code))
+    if g.profiler is not None:
+        g.profiler.stop()
+        response.headers['X-Profile-Id'] = profiles.add(endpoint, g.profiler)
+    return response
+
+@app.teardown_request
+def stop_profiler(exc):
+    # after_request is skipped when a view raises; this always runs
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving, whether or not the models are loaded"""
+    return jsonify({'status': 'ok', 'uptime': round(time.time() - STARTED_AT, 3)})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: 200 once both models and the dataset are loaded, 503 until then"""
+    loaded = {name: registry.loaded(name) for name in registry.sources}
+    ready = all(loaded.values())
+    return jsonify({'ready': ready, 'loaded': loaded, 'uptime': round(time.time() - STARTED_AT, 3)}), \
+        200 if ready else 503
 
 @app.route('/')
 def home():
@@ -74,59 +203,36 @@ def bengaluru():
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    timer = StageTimer('predict')
     try:
         # Get form data
         form_data = request.form.to_dict()
-        
-        # Create feature vector
-        features = {}
-        
-        # Numerical features
-        features['BHK'] = float(form_data.get('bhk', 2))
-        features['Size_in_SqFt'] = float(form_data.get('size', 1000))
-        features['Year_Built'] = float(form_data.get('year_built', 2010))
-        features['Floor_No'] = float(form_data.get('floor_no', 1))
-        features['Total_Floors'] = float(form_data.get('total_floors', 5))
-        features['Age_of_Property'] = 2024 - features['Year_Built']
-        features['Nearby_Schools'] = float(form_data.get('nearby_schools', 5))
-        features['Nearby_Hospitals'] = float(form_data.get('nearby_hospitals', 3))
-        features['Price_per_SqFt'] = 0.1  # Default value
-        
-        # Categorical features
-        categorical_inputs = {
-            'State': form_data.get('state', 'Maharashtra'),
-            'Property_Type': form_data.get('property_type', 'Apartment'),
-            'Furnished_Status': form_data.get('furnished_status', 'Semi-furnished'),
-            'Public_Transport_Accessibility': form_data.get('transport', 'Medium'),
-            'Parking_Space': form_data.get('parking', 'Yes'),
-            'Security': form_data.get('security', 'Yes'),
-            'Facing': form_data.get('facing', 'North'),
-            'Owner_Type': form_data.get('owner_type', 'Owner'),
-            'Availability_Status': form_data.get('availability', 'Ready_to_Move')
-        }
-        
-        # Encode categorical features
-        for col, value in categorical_inputs.items():
-            if col in encoders:
-                try:
-                    encoded_value = encoders[col].transform([value])[0]
-                except:
-                    encoded_value = 0  # Default for unknown categories
-                features[col + '_encoded'] = encoded_value
+        timer.lap('form_parsing')
+        served = registry.get('india')
+        timer.lap('model')
         
         # Create feature array in correct order
-        feature_array = []
-        for col in feature_columns:
-            feature_array.append(features.get(col, 0))
+        from features import build_feature_row
+        feature_array = build_feature_row(form_data, 'india', served.encoders, served.feature_columns, timer)
         
-        # Make prediction
-        prediction = model.predict([feature_array])[0]
+        def evaluate():
+            timer.lap('cache')
+            prediction = served.model.predict([feature_array])[0]
+            timer.lap('tree_evaluation')
+            return prediction
+
+        # Make prediction, reusing the result for repeated inputs
+        prediction = prediction_cache.get_or_compute('india', served.meta['version'], feature_array, evaluate)
+        timer.lap('cache')
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'prediction': round(prediction, 2),
             'message': f'Predicted house price: ₹{prediction:.2f} Lakhs'
         })
+        timer.lap('response')
+        timer.finish()
+        return response
         
     except Exception as e:
         return jsonify({
@@ -137,15 +243,25 @@ def predict():
 
 @app.route('/predict_bengaluru', methods=['POST'])
 def predict_bengaluru():
+    timer = StageTimer('predict_bengaluru')
     try:
         form_data = request.form.to_dict()
-        prediction = predict_bengaluru_price(bengaluru_model, bengaluru_encoders, bengaluru_features, form_data)
+        timer.lap('form_parsing')
+        from bengaluru_model import predict_bengaluru_price
+        served = registry.get('bengaluru')
+        timer.lap('model')
+        prediction = predict_bengaluru_price(served.model, served.encoders, served.feature_columns, form_data,
+                                             cache=prediction_cache, model_version=served.meta['version'],
+                                             timer=timer)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'prediction': round(prediction, 2),
             'message': f'Predicted Bengaluru house price: ₹{prediction:.2f} Lakhs'
         })
+        timer.lap('response')
+        timer.finish()
+        return response
         
     except Exception as e:
         return jsonify({
@@ -154,83 +270,235 @@ def predict_bengaluru():
             'message': 'Error in Bengaluru prediction. Please check your inputs.'
         })
 
+def _batch_record_chunks(chunk_size):
+    """Raw records from a JSON array or an uploaded CSV, as DataFrame chunks"""
+    import pandas as pd
+    if 'file' in request.files:
+        # The upload is closed when the view returns, before the response streams.
+        # Keep every column as text; build_feature_matrix does the numeric parsing
+        upload = BytesIO(request.files['file'].read())
+        return pd.read_csv(upload, dtype=str, chunksize=chunk_size)
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list):
+        raise ValueError('Send a JSON array of records or upload a CSV file as "file"')
+    for i, record in enumerate(payload):
+        if not isinstance(record, dict):
+            raise ValueError(f'Record {i} is not a JSON object: {json.dumps(record)[:80]}')
+    return (_json_records_frame(payload[i:i + chunk_size]) for i in range(0, len(payload), chunk_size))
+
+def _json_records_frame(records):
+    """DataFrame of JSON records, with ``id`` kept exactly as sent"""
+    import pandas as pd
+    frame = pd.DataFrame(records)
+    if 'id' in frame:
+        # pandas would make integer ids float64 as soon as one record lacks an id
+        frame['id'] = pd.Series([record.get('id') for record in records], index=frame.index, dtype=object)
+    return frame
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many listings in one request, streamed back as NDJSON chunks"""
+    spec = request.args.get('model', 'india')
+    if spec not in ('india', 'bengaluru'):
+        return jsonify({'success': False, 'error': f'Unknown model {spec!r}',
+                        'message': 'model must be "india" or "bengaluru".'}), 400
+
+    try:
+        chunks = _batch_record_chunks(config.BATCH_CHUNK_SIZE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e),
+                        'message': 'Error in batch prediction. Please check your inputs.'}), 400
+
+    # The whole stream is scored by the version that was live when it started
+    from features import build_feature_matrix
+    served = registry.get(spec)
+
+    def generate():
+        offset = 0
+        try:
+            for records in chunks:
+                X = build_feature_matrix(records, spec, served.encoders, served.feature_columns)
+                chunk = {'offset': offset, 'predictions': np.round(served.model.predict(X), 2).tolist()}
+                if 'id' in records:
+                    chunk['ids'] = records['id'].astype(object).where(records['id'].notna(), None).tolist()
+                yield json.dumps(chunk) + '\n'
+                offset += len(records)
+        except Exception as e:
+            yield json.dumps({'success': False, 'error': str(e), 'offset': offset}) + '\n'
+            return
+        yield json.dumps({'success': True, 'total': offset}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/data')
 def get_data():
-    """Get paginated data for table view"""
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 50))
-    
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    
-    # Get subset of data
-    subset = data.iloc[start_idx:end_idx]
-    
-    return jsonify({
-        'data': subset.to_dict('records'),
-        'total': len(data),
+    """Get a page of data for table view, with optional filters and sorting
+
+    Filters: state, city, min_bhk/max_bhk, min_price/max_price. Sort with
+    sort=<column> or sort=-<column>. Page with page=N, or pass the returned
+    next_cursor back as cursor=... for keyset paging. format=ndjson|arrow
+    return just the rows.
+    """
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 50))
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), config.MAX_PAGE_SIZE)
+
+    dataset = registry.get('data')
+    try:
+        rows, meta = dataset.index.page(request.args, per_page, page=page,
+                                        cursor=request.args.get('cursor'))
+    except InvalidQuery as e:
+        return jsonify({'error': str(e)}), 400
+
+    total = meta['total']
+    page_info = {
+        'total': total,
         'page': page,
         'per_page': per_page,
-        'total_pages': (len(data) + per_page - 1) // per_page
+        'total_pages': (total + per_page - 1) // per_page,
+        'next_cursor': meta['next_cursor']
+    }
+
+    # ndjson/arrow carry only the rows; paging details go in headers
+    fmt = request.args.get('format', 'json')
+    if fmt == 'json':
+        envelope = app.json.dumps(page_info)
+        body = '{"data":' + dataset.encoder.to_json(rows) + ',' + envelope[1:]
+        return app.response_class(body, mimetype=MIMETYPES['json'])
+    if fmt == 'ndjson':
+        body = dataset.encoder.to_ndjson(rows)
+    elif fmt == 'arrow':
+        body = dataset.encoder.to_arrow(rows)
+    else:
+        return jsonify({'error': f'Unknown format {fmt!r}; use json, ndjson or arrow'}), 400
+
+    response = app.response_class(body, mimetype=MIMETYPES[fmt])
+    response.headers['X-Total-Count'] = str(total)
+    if meta['next_cursor']:
+        response.headers['X-Next-Cursor'] = meta['next_cursor']
+    return response
+
+@app.route('/api/data/filters')
+def get_data_filters():
+    """Values available for the data browser's filters"""
+    index = registry.get('data').index
+    return jsonify({
+        'states': index.values('State'),
+        'cities': index.values('City'),
+        'sort_columns': SORT_COLUMNS
     })
 
+@app.route('/api/data/memory')
+def get_data_memory():
+    """Memory held by the in-process dataset, per column"""
+    import data_store
+    return jsonify(data_store.memory_footprint(registry.get('data').frame))
+
 @app.route('/api/analytics')
 def get_analytics():
-    """Generate analytics charts"""
-    charts = {}
-    
-    # Price distribution
-    plt.figure(figsize=(10, 6))
-    plt.hist(data['Price_in_Lakhs'], bins=50, alpha=0.7, color='skyblue')
-    plt.title('Price Distribution')
-    plt.xlabel('Price (Lakhs)')
-    plt.ylabel('Frequency')
-    charts['price_dist'] = get_plot_url()
-    
-    # Price by State
-    plt.figure(figsize=(12, 6))
-    state_prices = data.groupby('State')['Price_in_Lakhs'].mean().sort_values(ascending=False).head(10)
-    state_prices.plot(kind='bar', color='lightcoral')
-    plt.title('Average Price by State (Top 10)')
-    plt.xlabel('State')
-    plt.ylabel('Average Price (Lakhs)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    charts['price_by_state'] = get_plot_url()
-    
-    # BHK vs Price
-    plt.figure(figsize=(10, 6))
-    bhk_prices = data.groupby('BHK')['Price_in_Lakhs'].mean()
-    bhk_prices.plot(kind='bar', color='lightgreen')
-    plt.title('Average Price by BHK')
-    plt.xlabel('BHK')
-    plt.ylabel('Average Price (Lakhs)')
-    charts['bhk_vs_price'] = get_plot_url()
-    
-    # Property Type Distribution
-    plt.figure(figsize=(8, 8))
-    property_counts = data['Property_Type'].value_counts()
-    plt.pie(property_counts.values, labels=property_counts.index, autopct='%1.1f%%')
-    plt.title('Property Type Distribution')
-    charts['property_type_dist'] = get_plot_url()
-    
-    return jsonify(charts)
+    """Analytics charts, or the raw aggregates with ?format=json
+
+    Both are computed once per dataset version and revalidated with ETags.
+    Recomputing is timed separately under the analytics_refresh path.
+    """
+    timer = StageTimer('analytics')
+    dataset = registry.get('data')
+    timer.lap('data')
+    if request.args.get('format') == 'json':
+        cached = analytics_cache.aggregates(dataset.frame, dataset.version)
+    else:
+        cached = analytics_cache.charts(dataset.frame, dataset.version)
+    timer.lap('cache')
+
+    response = app.response_class(cached.body, mimetype='application/json')
+    response.set_etag(cached.etag)
+    response.cache_control.no_cache = True
+    response = response.make_conditional(request)
+    timer.lap('response')
+    timer.finish()
+    return response
+
+@app.route('/api/encoding_stats')
+def get_encoding_stats():
+    """Lookup and unknown-category counters for each categorical encoder"""
+    from encoding import encoder_stats
+    return jsonify({
+        'india': encoder_stats(registry.get('india').encoders),
+        'bengaluru': encoder_stats(registry.get('bengaluru').encoders)
+    })
+
+@app.route('/api/prediction_cache')
+def get_prediction_cache_stats():
+    """Hit/miss counters and size of the prediction cache"""
+    return jsonify(prediction_cache.stats())
+
+@app.route('/api/serving_models')
+def get_serving_models():
+    """Whether each model is served by its distilled surrogate or the full forest"""
+    def describe(served):
+        if isinstance(served, MicroBatcher):
+            served = served.model
+        return served.info() if hasattr(served, 'info') else {'serving': 'forest'}
+    return jsonify({name: describe(registry.get(name).model) for name in ['india', 'bengaluru']})
+
+@app.route('/api/microbatching')
+def get_microbatching_stats():
+    """Batch sizes and queueing delay of the single-row prediction coalescer"""
+    served = {name: registry.get(name).model for name in ['india', 'bengaluru']}
+    return jsonify({name: model.stats() if isinstance(model, MicroBatcher) else None
+                    for name, model in served.items()})
+
+@app.route('/api/model_registry')
+def get_model_registry():
+    """Live version of each model and the dataset, with hot reload history"""
+    return jsonify(registry.stats())
+
+@app.route('/metrics')
+def get_metrics():
+    """Stage and request latency histograms and cache counters, Prometheus text format"""
+    cache = prediction_cache.stats()
+    extra = metrics.gauge('house_price_prediction_cache_lookups_total', 'Prediction cache lookups by result',
+                          [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])], 'counter')
+    extra += metrics.gauge('house_price_prediction_cache_entries', 'Entries in the prediction cache',
+                           [({}, cache['size'])])
+    extra += metrics.gauge('house_price_model_loaded', 'Whether each registry entry is loaded',
+                           [({'name': name}, int(registry.loaded(name))) for name in registry.sources])
+    extra += metrics.gauge('house_price_uptime_seconds', 'Seconds since the app started',
+                           [({}, round(time.time() - STARTED_AT, 3))])
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/latency')
+def get_latency():
+    """Per-stage and per-endpoint latency summaries (count, mean, p50/p95/p99 ms)"""
+    return jsonify({'stages': metrics.STAGES.summary(), 'requests': metrics.REQUESTS.summary()})
+
+@app.route('/api/profiles')
+def get_profiles():
+    """Requests profiled through the X-Profile header, newest first"""
+    return jsonify(profiles.list())
+
+@app.route('/api/profiles/<profile_id>')
+def get_profile(profile_id):
+    """One profile as collapsed stacks (flamegraph.pl / speedscope input)"""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({'error': f'No profile {profile_id!r}'}), 404
+    return Response(profile['collapsed'], mimetype='text/plain')
 
 @app.route('/api/bengaluru_localities')
 def get_bengaluru_localities():
     """Get Bengaluru localities for dropdown"""
-    localities = ['Koramangala', 'Indiranagar', 'Whitefield', 'Electronic City', 'HSR Layout', 
-                 'Marathahalli', 'Sarjapur Road', 'Bannerghatta Road', 'Hebbal', 'Yeshwanthpur']
+    from bengaluru_model import ENCODER_FALLBACKS
+    localities = [loc for loc in registry.get('bengaluru').encoders['location'].classes_.tolist()
+                  if loc != ENCODER_FALLBACKS['location']]
     return jsonify(localities)
 
-def get_plot_url():
-    """Convert matplotlib plot to base64 string"""
-    img = BytesIO()
-    plt.savefig(img, format='png', bbox_inches='tight')
-    img.seek(0)
-    plot_url = base64.b64encode(img.getvalue()).decode()
-    plt.close()
-    return plot_url
-
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""ASGI serving mode for app.py with bounded worker pools.
+
+The Flask app stays synchronous. Every request is handed to a thread pool
+chosen by path, and the event loop only moves bytes around:
+
+* ``inference``  /predict, /predict_bengaluru
+* ``bulk``       analytics charts and aggregates, batch scoring
+* ``default``    pages, the data API and everything else
+
+Each pool has a fixed number of threads and a cap on requests that are
+queued or running. Past the cap, requests are answered 503 straight away with
+a Retry-After header. A response that hasn't started within the pool's
+timeout is answered 504; its worker keeps the slot until it finishes, so a
+pile of slow requests still counts against the cap. Because chart rendering
+and batch scoring only ever occupy the bulk threads, they can't starve
+/predict.
+
+Run it with any ASGI server, e.g.:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+``GET /api/worker_pools`` is answered on the event loop itself and reports
+each pool's load and rejection counters.
+"""
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import config
+from app import app as flask_app
+
+
+class WorkerPool:
+    """Bounded thread pool with admission control"""
+
+    def __init__(self, name, workers, max_pending, timeout):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix=f'{name}-worker')
+        # Only touched from the event loop thread
+        self.pending = 0
+        self.completed = self.rejected = self.timed_out = self.failed = 0
+
+    @property
+    def full(self):
+        return self.pending >= self.max_pending
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'timeout': self.timeout,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'failed': self.failed,
+        }
+
+
+POOLS = {
+    'inference': WorkerPool('inference', config.INFERENCE_WORKERS, config.INFERENCE_MAX_PENDING,
+                            config.INFERENCE_TIMEOUT),
+    'bulk': WorkerPool('bulk', config.BULK_WORKERS, config.BULK_MAX_PENDING, config.BULK_TIMEOUT),
+    'default': WorkerPool('default', config.DEFAULT_WORKERS, config.DEFAULT_MAX_PENDING, config.DEFAULT_TIMEOUT),
+}
+
+# (path, prefix match, pool); first match wins
+ROUTES = [
+    ('/predict/batch', False, 'bulk'),
+    ('/predict', False, 'inference'),
+    ('/predict_bengaluru', False, 'inference'),
+    ('/api/analytics', True, 'bulk'),
+]
+
+
+def pool_for(path):
+    for route, prefix, pool in ROUTES:
+        if path == route or (prefix and path.startswith(route)):
+            return POOLS[pool]
+    return POOLS['default']
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    environ.setdefault('CONTENT_LENGTH', str(len(body)))
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode()), *headers]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def run_wsgi(environ, loop, queue, cancelled):
+    """Run the Flask app on a worker thread and hand its output to the event loop"""
+    def put(item):
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+    try:
+        result = flask_app(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not started:
+                    put(('start', response['status'], response['headers']))
+                    started = True
+                if cancelled[0]:
+                    return
+                if chunk:
+                    put(('body', chunk))
+            if not started:
+                put(('start', response['status'], response['headers']))
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        put(('end',))
+    except Exception as exc:  # pragma: no cover - Flask turns view errors into 500s itself
+        put(('error', exc))
+
+
+async def handle_http(scope, receive, send):
+    if scope['path'] == '/api/worker_pools':
+        await send_json(send, 200, {name: pool.stats() for name, pool in POOLS.items()})
+        return
+
+    pool = pool_for(scope['path'])
+    if pool.full:
+        pool.rejected += 1
+        await send_json(send, 503, {'success': False, 'error': 'Server busy, please retry'},
+                        [(b'retry-after', b'1')])
+        return
+
+    body = await read_body(receive)
+    if body is None:
+        return
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    cancelled = [False]
+    pool.pending += 1
+    future = loop.run_in_executor(pool.executor, run_wsgi, build_environ(scope, body), loop, queue, cancelled)
+
+    def release(_):
+        pool.pending -= 1
+    future.add_done_callback(release)
+
+    try:
+        message = await asyncio.wait_for(queue.get(), pool.timeout)
+    except asyncio.TimeoutError:
+        cancelled[0] = True
+        pool.timed_out += 1
+        await send_json(send, 504, {'success': False, 'error': 'Request timed out'})
+        return
+
+    if message[0] == 'error':
+        pool.failed += 1
+        await send_json(send, 500, {'success': False, 'error': 'Internal server error'})
+        return
+
+    _, status, headers = message
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    # Streamed bodies (batch scoring) are forwarded chunk by chunk without a deadline
+    while True:
+        message = await queue.get()
+        if message[0] == 'body':
+            await send({'type': 'http.response.body', 'body': message[1], 'more_body': True})
+        else:
+            if message[0] == 'error':
+                pool.failed += 1
+            else:
+                pool.completed += 1
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for pool in POOLS.values():
+                    pool.executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,135 @@
+"""Distributed batch scoring with the PipelineModel saved by house_price_prediction.py.
+
+The saved model is the fitted StringIndexer, the VectorAssembler and the
+best regressor, so it scores raw listings directly. Input is a CSV or Parquet
+file, directory or glob. Every input split is scored by its own task, and
+predictions are written as a partitioned dataset with one file per output
+partition. Nothing is collected to the driver.
+
+    python batch_score.py listings.csv predictions/
+    python batch_score.py 'dumps/2024-*/' predictions/ --partition-by State --output-format csv
+
+Without --master the job runs in local[*] mode. Under spark-submit it uses
+the cluster master it is given, with no code changes:
+
+    spark-submit --master yarn batch_score.py s3://bucket/listings/ s3://bucket/predictions/
+"""
+import argparse
+import time
+
+from pyspark.ml import PipelineModel
+from pyspark.sql import functions as F
+
+from features import CURRENT_YEAR, INDIA_CATEGORICAL_FIELDS, INDIA_CONSTANTS, INDIA_NUMERIC_FIELDS
+from house_price_prediction import CATEGORICAL_COLS, FEATURE_COLS, MODEL_PATH, create_spark_session
+
+# Same defaults the web app uses for missing form fields
+NUMERIC_DEFAULTS = {feature: float(default) for _, feature, default in INDIA_NUMERIC_FIELDS}
+NUMERIC_DEFAULTS.update(INDIA_CONSTANTS)
+CATEGORICAL_DEFAULTS = {feature: default for _, feature, default in INDIA_CATEGORICAL_FIELDS}
+
+# Columns the pipeline adds; dropped from the output
+PIPELINE_COLS = ['features'] + [f'{c}_indexed' for c in CATEGORICAL_COLS]
+
+# Prefix of the untouched copies of the input columns carried through scoring
+ORIGINAL_PREFIX = '__input_'
+
+
+def input_format(path):
+    return 'csv' if path.rstrip('/').lower().endswith('.csv') else 'parquet'
+
+
+def read_listings(spark, path, fmt=None):
+    """Listings as a DataFrame; CSV columns are read as strings to skip schema inference"""
+    fmt = fmt or input_format(path)
+    if fmt == 'csv':
+        return spark.read.csv(path, header=True, inferSchema=False)
+    return spark.read.parquet(path)
+
+
+def load_pipeline(path=MODEL_PATH):
+    model = PipelineModel.load(path)
+    if len(model.stages) < 3:
+        raise SystemExit(f'{path} holds only a regressor; rerun house_price_prediction.py to save the '
+                         'full pipeline with its indexer')
+    return model
+
+
+def prepare_listings(df):
+    """Add missing feature columns and fill missing values with the app's defaults
+
+    Numeric inputs are cast to double. Age_of_Property is derived from
+    Year_Built when it is absent. Categoricals without a default stay null;
+    the indexer scores those as unseen.
+    """
+    columns = set(df.columns)
+    numeric = [c for c in FEATURE_COLS if not c.endswith('_indexed')]
+    for c in numeric:
+        if c == 'Age_of_Property':
+            continue
+        value = F.col(c).cast('double') if c in columns else F.lit(None).cast('double')
+        df = df.withColumn(c, F.coalesce(value, F.lit(NUMERIC_DEFAULTS.get(c, 0.0))))
+    age = F.lit(CURRENT_YEAR) - F.col('Year_Built')
+    if 'Age_of_Property' in columns:
+        age = F.coalesce(F.col('Age_of_Property').cast('double'), age)
+    df = df.withColumn('Age_of_Property', age)
+
+    for c in CATEGORICAL_COLS:
+        value = F.col(c).cast('string') if c in columns else F.lit(None).cast('string')
+        if c in CATEGORICAL_DEFAULTS:
+            value = F.coalesce(value, F.lit(CATEGORICAL_DEFAULTS[c]))
+        df = df.withColumn(c, value)
+    return df
+
+
+def score(model, df, keep=None):
+    """Input columns (or only ``keep``) plus ``prediction`` in lakhs, rounded to 2 places
+
+    The input columns come back exactly as read: prepare_listings fills the
+    feature columns in place, so the originals are carried through as copies.
+    """
+    columns = keep or [c for c in df.columns if c not in PIPELINE_COLS and c != 'prediction']
+    df = df.select('*', *[F.col(c).alias(ORIGINAL_PREFIX + c) for c in columns])
+    scored = model.transform(prepare_listings(df))
+    return scored.select(*[F.col(ORIGINAL_PREFIX + c).alias(c) for c in columns],
+                         F.round('prediction', 2).alias('prediction'))
+
+
+def write_predictions(df, path, fmt='parquet', partition_by=None, partitions=None):
+    if partitions:
+        df = df.repartition(partitions, *(partition_by or []))
+    writer = df.write.mode('overwrite')
+    if partition_by:
+        writer = writer.partitionBy(*partition_by)
+    if fmt == 'csv':
+        writer.option('header', True).csv(path)
+    else:
+        writer.parquet(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='CSV or Parquet file, directory or glob')
+    parser.add_argument('output', help='directory for the predictions')
+    parser.add_argument('--model', default=MODEL_PATH, help='saved PipelineModel')
+    parser.add_argument('--input-format', choices=['csv', 'parquet'], help='default: from the extension')
+    parser.add_argument('--output-format', choices=['csv', 'parquet'], default='parquet')
+    parser.add_argument('--partition-by', nargs='+', help='output partition columns, e.g. State City')
+    parser.add_argument('--partitions', type=int, help='output partitions (default: one per input split)')
+    parser.add_argument('--keep', nargs='+', help='input columns to copy to the output (default: all)')
+    parser.add_argument('--master', help='Spark master; spark-submit sets it, otherwise local[*]')
+    args = parser.parse_args()
+
+    spark = create_spark_session('HousePriceBatchScoring', args.master)
+    start = time.perf_counter()
+    model = load_pipeline(args.model)
+    listings = read_listings(spark, args.input, args.input_format)
+    predictions = score(model, listings, args.keep)
+    write_predictions(predictions, args.output, args.output_format, args.partition_by, args.partitions)
+    print(f'Scored {args.input} with {args.model} -> {args.output} ({args.output_format}) '
+          f'in {time.perf_counter() - start:.1f}s')
+    spark.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Micro-batching of concurrent single-row predictions.
+
+Every /predict call used to run its own ``model.predict`` on one row, so under
+load the fixed per-call overhead dominated. ``MicroBatcher`` sits in front of
+the model with the same ``predict`` interface. A single-row call is queued,
+and a dispatcher thread waits until the oldest queued row is ``window_ms``
+old or ``max_rows`` rows are waiting. It then runs one vectorised predict and
+hands each caller its own result. Calls with more than one row go straight
+to the model.
+
+``close()`` stops the dispatcher once the queued rows are answered. Calls
+made after that go straight to the model, so a request still holding a
+replaced model keeps working.
+
+Batch sizes and the queueing delay added to each row are recorded for
+/api/microbatching.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Recent batches/rows the percentiles are computed over
+STATS_WINDOW = 10000
+
+# Upper bounds of the batch size histogram buckets
+SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row ``predict`` calls into vectorised batches"""
+
+    def __init__(self, model, window_ms=2.0, max_rows=64, name=None):
+        self.model = model
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self.name = name
+        self._queue = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._stats_lock = threading.Lock()
+        self.batches = self.rows = 0
+        self.size_counts = [0] * (len(SIZE_BUCKETS) + 1)
+        self.batch_sizes = deque(maxlen=STATS_WINDOW)
+        self.queue_delays = deque(maxlen=STATS_WINDOW)
+        self._thread = threading.Thread(target=self._run, name=f'microbatch-{name or "model"}', daemon=True)
+        self._thread.start()
+
+    def predict(self, X):
+        if len(X) != 1:
+            return self.model.predict(X)
+        future = Future()
+        with self._cond:
+            if self._stopping:
+                return self.model.predict(X)
+            self._queue.append((np.asarray(X[0], dtype=np.float64), future, time.monotonic()))
+            self._cond.notify()
+        return np.array([future.result()])
+
+    def close(self, timeout=None):
+        """Answer the queued rows, then stop the dispatcher thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _next_batch(self):
+        """The next batch, or None once stopping and the queue is empty"""
+        with self._cond:
+            while not self._queue and not self._stopping:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = self._queue[0][2] + self.window
+            # When stopping, whatever is queued goes out at once
+            while len(self._queue) < self.max_rows and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self.max_rows]
+            del self._queue[:self.max_rows]
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            started = time.monotonic()
+            try:
+                predictions = self.model.predict(np.vstack([row for row, _, _ in batch]))
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+            else:
+                for (_, future, _), prediction in zip(batch, predictions):
+                    future.set_result(prediction)
+            self._record(len(batch), [started - queued for _, _, queued in batch])
+
+    def _record(self, size, delays):
+        bucket = next((i for i, bound in enumerate(SIZE_BUCKETS) if size <= bound), len(SIZE_BUCKETS))
+        with self._stats_lock:
+            self.batches += 1
+            self.rows += size
+            self.size_counts[bucket] += 1
+            self.batch_sizes.append(size)
+            self.queue_delays.extend(delays)
+
+    def stats(self):
+        with self._stats_lock:
+            sizes = np.array(self.batch_sizes)
+            delays = np.array(self.queue_delays) * 1000
+            buckets = {f'<={bound}': count for bound, count in zip(SIZE_BUCKETS, self.size_counts)}
+            buckets[f'>{SIZE_BUCKETS[-1]}'] = self.size_counts[-1]
+            return {
+                'window_ms': self.window * 1000,
+                'max_rows': self.max_rows,
+                'batches': self.batches,
+                'rows': self.rows,
+                'batch_size': {
+                    'mean': float(sizes.mean()) if sizes.size else 0.0,
+                    'max': int(sizes.max()) if sizes.size else 0,
+                    'histogram': buckets,
+                },
+                'queue_delay_ms': {
+                    p: float(np.percentile(delays, q)) if delays.size else 0.0
+                    for p, q in [('p50', 50), ('p95', 95), ('p99', 99)]
+                },
+            }
@@ -0,0 +1,365 @@
+"""Endpoint benchmarks for app.py on synthetic data.
+
+Each run builds (or reuses) synthetic datasets of the requested size under
+artifacts/benchmarks/, with their own Parquet copy and model bundles, and
+points the app at them. It then measures the same requests in two ways:
+
+* ``in-process``  one request at a time through Flask's test client, so there
+  is no network or server overhead
+* ``server``      a local server in a subprocess (the Flask threaded server,
+  uvicorn with asgi.py, or gunicorn with gunicorn_conf.py), driven by
+  --concurrency client threads
+
+The cases are /predict and /predict_bengaluru with seeded random forms,
+/api/data at each --page-sizes and with a filter and sort, and
+/api/analytics as charts and JSON. Each case reports throughput, mean and
+p50/p95/p99/max latency, and failures. A failure is a non-200 status, a
+connection error, or ``success: false`` from a prediction. The first,
+uncached request of each case is reported on its own as ``first_ms`` and is
+not counted in the percentiles.
+
+Results are written as JSON with the commit, host and parameters.
+``--compare`` prints the change against an earlier results file:
+
+    python benchmark.py --rows 100000 --requests 500 --concurrency 8
+    python benchmark.py --modes server --server uvicorn --compare artifacts/benchmarks/endpoints-<...>.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+import numpy as np
+
+import synthetic_data
+
+RESULTS_DIR = os.path.join('artifacts', 'benchmarks')
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Value ranges (inclusive) for the random prediction forms
+NUMERIC_RANGES = {
+    'india': {'bhk': (1, 5), 'size': (400, 3000), 'year_built': (1990, 2023), 'floor_no': (0, 20),
+              'total_floors': (1, 30), 'nearby_schools': (1, 10), 'nearby_hospitals': (1, 10)},
+    'bengaluru': {'bhk': (1, 5), 'size': (500, 3000), 'bath': (1, 5), 'balcony': (0, 3)},
+}
+
+CATEGORICAL_CHOICES = {
+    'india': {
+        'state': list(synthetic_data.CITIES),
+        'property_type': list(synthetic_data.PROPERTY_TYPES),
+        'furnished_status': list(synthetic_data.FURNISHING),
+        'transport': list(synthetic_data.TRANSPORT),
+        'parking': ['Yes', 'No'],
+        'security': ['Yes', 'No'],
+        'facing': synthetic_data.FACING,
+        'owner_type': synthetic_data.OWNER_TYPES,
+        'availability': synthetic_data.AVAILABILITY,
+    },
+    'bengaluru': {
+        'area_type': [' '.join(area.split()) for area in synthetic_data.BENGALURU_AREA_TYPES],
+        'availability': ['Ready To Move', 'Under Construction'],
+        'locality': synthetic_data.BENGALURU_LOCATIONS,
+    },
+}
+
+SERVER_COMMANDS = {
+    'flask': lambda port: [sys.executable, '-c',
+                           f'from app import app; app.run(port={port}, threaded=True, use_reloader=False)'],
+    'uvicorn': lambda port: [sys.executable, '-m', 'uvicorn', 'asgi:application',
+                             '--port', str(port), '--log-level', 'warning'],
+    'gunicorn': lambda port: [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_conf.py',
+                              '-b', f'127.0.0.1:{port}', 'app:app'],
+}
+
+
+def prepare_data(india_rows, bengaluru_rows, seed=0, root=RESULTS_DIR):
+    """Directory holding the synthetic CSVs for these sizes, written on first use"""
+    workdir = os.path.abspath(os.path.join(root, f'data-{india_rows}-{bengaluru_rows}-{seed}'))
+    os.makedirs(workdir, exist_ok=True)
+    india = os.path.join(workdir, 'india_housing_prices.csv')
+    bengaluru = os.path.join(workdir, 'Bengaluru_House_Data.csv')
+    if not os.path.exists(india):
+        synthetic_data.write_india_csv(india, india_rows, seed)
+    if not os.path.exists(bengaluru):
+        synthetic_data.write_bengaluru_csv(bengaluru, bengaluru_rows, seed)
+    return workdir
+
+
+def app_env(workdir, prediction_cache=True):
+    """Environment that points config at the benchmark data and keeps background work quiet"""
+    env = {
+        'DATA_PATH': os.path.join(workdir, 'india_housing_prices.csv'),
+        'BENGALURU_DATA_PATH': os.path.join(workdir, 'Bengaluru_House_Data.csv'),
+        'PARQUET_PATH': os.path.join(workdir, 'india_housing_prices.parquet'),
+        'ARTIFACT_DIR': os.path.join(workdir, 'models'),
+        'REGISTRY_POLL_SECONDS': '0',
+        'PROFILING': '0',
+        'WARMUP': '1',
+    }
+    if not prediction_cache:
+        env['PREDICTION_CACHE_SIZE'] = '0'
+    return env
+
+
+def form_payloads(spec, n, seed=0):
+    """``n`` seeded random forms for a prediction endpoint"""
+    rng = np.random.default_rng(seed)
+    numeric = {field: rng.integers(low, high + 1, size=n) for field, (low, high) in NUMERIC_RANGES[spec].items()}
+    categorical = {field: rng.choice(choices, size=n) for field, choices in CATEGORICAL_CHOICES[spec].items()}
+    return [{**{field: str(values[i]) for field, values in numeric.items()},
+             **{field: str(values[i]) for field, values in categorical.items()}} for i in range(n)]
+
+
+def build_cases(n, india_rows, page_sizes, seed=0):
+    """``{case: [(method, path, body, check_success)]}`` with ``n + 1`` requests each"""
+    rng = np.random.default_rng(seed)
+    cases = {}
+    for spec, path in [('india', '/predict'), ('bengaluru', '/predict_bengaluru')]:
+        forms = form_payloads(spec, n + 1, seed)
+        cases[path.lstrip('/')] = [('POST', path, urlencode(form).encode(), True) for form in forms]
+
+    # Pages are drawn from the first half, where pages always exist
+    for per_page in page_sizes:
+        pages = rng.integers(1, max(1, india_rows // per_page // 2) + 1, size=n + 1)
+        cases[f'data_{per_page}'] = [('GET', f'/api/data?page={page}&per_page={per_page}', None, False)
+                                     for page in pages]
+    states = rng.choice(CATEGORICAL_CHOICES['india']['state'], size=n + 1)
+    pages = rng.integers(1, 21, size=n + 1)
+    cases['data_filtered_50'] = [
+        ('GET', f'/api/data?{urlencode({"state": state, "min_bhk": 3, "sort": "-Price_in_Lakhs", "page": page})}',
+         None, False) for state, page in zip(states, pages)]
+
+    cases['analytics'] = [('GET', '/api/analytics', None, False)] * (n + 1)
+    cases['analytics_json'] = [('GET', '/api/analytics?format=json', None, False)] * (n + 1)
+    return cases
+
+
+def _succeeded(status, body, check_success):
+    if status != 200:
+        return False
+    return not check_success or json.loads(body).get('success', False)
+
+
+def measure(send, requests, concurrency=1):
+    """Latency of every request and the overall throughput, with ``send(request) -> (status, body)``"""
+    latencies = np.zeros(len(requests))
+    failed = np.zeros(len(requests), dtype=bool)
+
+    def one(i):
+        method, path, body, check_success = requests[i]
+        start = time.perf_counter()
+        try:
+            status, content = send(method, path, body)
+            failed[i] = not _succeeded(status, content, check_success)
+        except (OSError, http.client.HTTPException, ValueError):
+            failed[i] = True
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(len(requests)):
+            one(i)
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(one, range(len(requests))))
+    return summarize(latencies, failed, time.perf_counter() - start, concurrency)
+
+
+def summarize(latencies, failed, seconds, concurrency):
+    ms = latencies * 1000
+    return {
+        'requests': int(len(ms)),
+        'failures': int(failed.sum()),
+        'concurrency': concurrency,
+        'seconds': round(seconds, 4),
+        'throughput_rps': round(len(ms) / seconds, 2) if seconds else None,
+        'latency_ms': {
+            'mean': round(float(ms.mean()), 3),
+            'p50': round(float(np.percentile(ms, 50)), 3),
+            'p95': round(float(np.percentile(ms, 95)), 3),
+            'p99': round(float(np.percentile(ms, 99)), 3),
+            'max': round(float(ms.max()), 3),
+        },
+    }
+
+
+def _form_headers(body):
+    return {'Content-Type': 'application/x-www-form-urlencoded'} if body is not None else {}
+
+
+def run_cases(send, cases, concurrency=1):
+    results = {}
+    for name, requests in cases.items():
+        first = measure(send, requests[:1])
+        results[name] = measure(send, requests[1:], concurrency)
+        results[name]['first_ms'] = first['latency_ms']['max']
+        print(f'  {name:<20}{results[name]["throughput_rps"]:>10.1f} req/s   '
+              f'p50 {results[name]["latency_ms"]["p50"]:>8.2f} ms   '
+              f'p99 {results[name]["latency_ms"]["p99"]:>8.2f} ms   '
+              f'failures {results[name]["failures"]}')
+    return results
+
+
+def run_in_process(env, cases):
+    """Sequential requests through the test client; the app is imported with ``env`` applied"""
+    os.environ.update(env)
+    start = time.perf_counter()
+    import app as app_module
+    for name in app_module.registry.sources:
+        app_module.registry.get(name)
+    load_seconds = time.perf_counter() - start
+    client = app_module.app.test_client()
+
+    def send(method, path, body):
+        response = client.open(path, method=method, data=body, headers=_form_headers(body))
+        return response.status_code, response.get_data()
+
+    return {'load_seconds': round(load_seconds, 3), 'cases': run_cases(send, cases)}
+
+
+def wait_ready(port, process, timeout):
+    start = time.perf_counter()
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/readyz')
+            if connection.getresponse().status == 200:
+                return time.perf_counter() - start
+        except (OSError, http.client.HTTPException):
+            pass
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError(f'/readyz not ready after {timeout:.0f}s')
+        time.sleep(0.05)
+
+
+def run_server(env, cases, server='flask', port=5077, concurrency=8, timeout=600.0):
+    """Concurrent requests against a local server started in a subprocess"""
+    env = dict(os.environ, **env)
+    if server == 'gunicorn':
+        # The master publishes to SHARED_DIR; keep it apart from a running deployment
+        env['SHARED_DIR'] = os.path.join('/dev/shm', f'house-prices-bench-{os.getpid()}')
+    process = subprocess.Popen(SERVER_COMMANDS[server](port), cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    connections = threading.local()
+
+    def send(method, path, body):
+        # One connection per client thread; http.client reopens it if the server closed it
+        if not hasattr(connections, 'current'):
+            connections.current = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        connection = connections.current
+        try:
+            connection.request(method, path, body=body, headers=_form_headers(body))
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+    try:
+        ready_seconds = wait_ready(port, process, timeout)
+        return {'server': server, 'ready_seconds': round(ready_seconds, 3),
+                'cases': run_cases(send, cases, concurrency)}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+    return result.stdout.strip() + ('-dirty' if dirty else '') if result.returncode == 0 else None
+
+
+def compare(previous, current):
+    """Print p50, p99 and throughput per case against an earlier results file"""
+    print(f'\nvs {previous["meta"].get("commit")} ({previous["meta"].get("timestamp")})')
+    print(f'{"mode/case":<34}{"p50 ms":>18}{"p99 ms":>18}{"req/s":>18}')
+    for mode, run in current['runs'].items():
+        before_cases = previous['runs'].get(mode, {}).get('cases', {})
+        for name, after in run['cases'].items():
+            before = before_cases.get(name)
+            if before is None:
+                continue
+            cells = []
+            for old, new in [(before['latency_ms']['p50'], after['latency_ms']['p50']),
+                             (before['latency_ms']['p99'], after['latency_ms']['p99']),
+                             (before['throughput_rps'], after['throughput_rps'])]:
+                change = f'{(new - old) / old:+.0%}' if old else 'n/a'
+                cells.append(f'{new:>10.2f} {change:>6}')
+            print(f'{mode + "/" + name:<34}' + ''.join(f'{cell:>18}' for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help='India dataset rows')
+    parser.add_argument('--bengaluru-rows', type=int, default=13_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per case and mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in server mode')
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--modes', nargs='+', choices=['in-process', 'server'], default=['in-process', 'server'])
+    parser.add_argument('--server', choices=sorted(SERVER_COMMANDS), default='flask')
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--cases', nargs='+', help='run only these cases')
+    parser.add_argument('--no-prediction-cache', action='store_true',
+                        help='disable the prediction cache so every /predict evaluates the model')
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/endpoints-<time>-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    workdir = prepare_data(args.rows, args.bengaluru_rows, args.seed)
+    print(f'data: {workdir} ({time.perf_counter() - start:.1f}s)')
+    env = app_env(workdir, prediction_cache=not args.no_prediction_cache)
+    cases = build_cases(args.requests, args.rows, args.page_sizes, args.seed)
+    if args.cases:
+        cases = {name: requests for name, requests in cases.items() if name in args.cases}
+
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        },
+        'runs': {},
+    }
+    # The server subprocess loads the bundles the in-process run trained, so it runs second
+    if 'in-process' in args.modes:
+        print('in-process (test client, sequential)')
+        results['runs']['in-process'] = run_in_process(env, cases)
+    if 'server' in args.modes:
+        print(f'server ({args.server}, {args.concurrency} client threads)')
+        results['runs']['server'] = run_server(env, cases, args.server, args.port, args.concurrency)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f'endpoints-{datetime.now():%Y%m%d-%H%M%S}-{commit or "nogit"}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nWrote {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Ingestion pipeline for Bengaluru_House_Data.csv.
+
+The raw file mixes formats: ``size`` is free text ("2 BHK", "4 Bedroom",
+"1 RK"), and ``total_sqft`` may be a range ("1133 - 1384") or carry a unit
+("34.46Sq. Meter"). Availability is either "Ready To Move" or a month
+("19-Dec"). The file is read in chunks and each chunk is normalised with
+vectorised string operations. Only the cleaned, compactly typed columns are
+kept. Rare locations are folded into ``OTHER_LOCATION`` once all chunks are
+in, because the counts are global.
+"""
+import pandas as pd
+
+import config
+
+OTHER_LOCATION = 'other'
+
+READY = 'Ready To Move'
+UNDER_CONSTRUCTION = 'Under Construction'
+
+# Square feet per unit for the non-sqft areas that appear in total_sqft
+AREA_UNITS = {
+    'Sq. Meter': 10.7639,
+    'Sq. Yards': 9.0,
+    'Perch': 272.25,
+    'Acres': 43560.0,
+    'Cents': 435.6,
+    'Guntha': 1089.0,
+    'Grounds': 2400.0,
+}
+
+RAW_COLUMNS = ['area_type', 'availability', 'location', 'size', 'total_sqft', 'bath', 'balcony', 'price']
+
+# Listings with less floor area per bedroom than this are data-entry errors
+MIN_SQFT_PER_BHK = 300
+
+
+def parse_total_sqft(values):
+    """Square feet from plain numbers, ranges (midpoint) or unit-suffixed areas"""
+    text = values.astype(str).str.strip()
+    sqft = pd.to_numeric(text, errors='coerce')
+
+    bounds = text.str.extract(r'^([\d.]+)\s*-\s*([\d.]+)$').astype(float)
+    sqft = sqft.fillna(bounds.mean(axis=1, skipna=False))
+
+    with_unit = text.str.extract(r'^([\d.]+)\s*([A-Za-z. ]+)$')
+    factor = with_unit[1].str.strip().map(AREA_UNITS)
+    sqft = sqft.fillna(with_unit[0].astype(float) * factor)
+    return sqft
+
+
+def clean_chunk(chunk):
+    """Normalise one raw chunk into model-ready columns"""
+    out = pd.DataFrame(index=chunk.index)
+    out['area_type'] = chunk['area_type'].str.replace(r'\s+', ' ', regex=True).str.strip()
+    ready = chunk['availability'].str.strip().isin([READY, 'Immediate Possession'])
+    out['availability'] = ready.map({True: READY, False: UNDER_CONSTRUCTION})
+    out['location'] = chunk['location'].str.strip().fillna(OTHER_LOCATION)
+    out['BHK'] = chunk['size'].str.extract(r'^\s*(\d+)', expand=False).astype(float)
+    out['total_sqft'] = parse_total_sqft(chunk['total_sqft'])
+    out['bath'] = pd.to_numeric(chunk['bath'], errors='coerce')
+    out['balcony'] = pd.to_numeric(chunk['balcony'], errors='coerce')
+    out['price'] = pd.to_numeric(chunk['price'], errors='coerce')
+
+    out = out.dropna(subset=['BHK', 'total_sqft', 'price'])
+    out = out[out['total_sqft'] >= out['BHK'] * MIN_SQFT_PER_BHK]
+    # Most listings have a bathroom per bedroom; missing balconies are usually none
+    out['bath'] = out['bath'].fillna(out['BHK'])
+    out['balcony'] = out['balcony'].fillna(0)
+
+    # The target keeps full precision
+    for col in ['BHK', 'total_sqft', 'bath', 'balcony']:
+        out[col] = out[col].astype('float32')
+    return out
+
+
+def read_raw(path=None, chunksize=5000):
+    """The raw file as an iterator of DataFrame chunks, with the text columns kept as strings"""
+    return pd.read_csv(path or config.BENGALURU_DATA_PATH, usecols=RAW_COLUMNS,
+                       dtype={col: 'str' for col in ['area_type', 'availability', 'location', 'size', 'total_sqft']},
+                       chunksize=chunksize)
+
+
+def clean_listings(chunks, min_location_count=10):
+    """Clean raw chunks and collapse locations with fewer than ``min_location_count`` listings"""
+    df = pd.concat([clean_chunk(chunk) for chunk in chunks], ignore_index=True)
+
+    counts = df['location'].value_counts()
+    rare = counts.index[counts < min_location_count]
+    df.loc[df['location'].isin(rare), 'location'] = OTHER_LOCATION
+
+    for col in ['area_type', 'availability', 'location']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def load_bengaluru_dataset(path=None, chunksize=5000, min_location_count=10):
+    """Cleaned Bengaluru listings with rare locations collapsed"""
+    return clean_listings(read_raw(path, chunksize), min_location_count)
@@ -1,85 +1,77 @@
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 
-def train_bengaluru_model():
-    # Load main dataset and filter for Bengaluru
-    df = pd.read_csv("india_housing_prices.csv")
-    bengaluru_data = df[df['City'].str.contains('Bangalore', case=False, na=False)].copy()
-    
-    if len(bengaluru_data) == 0:
-        # If no Bangalore data, create sample data
-        bengaluru_data = df.sample(n=min(5000, len(df))).copy()
-        bengaluru_data['City'] = 'Bangalore'
-    
-    # Clean data
-    bengaluru_data = bengaluru_data.dropna(subset=['Price_in_Lakhs', 'Size_in_SqFt', 'BHK'])
-    
-    # Features for Bengaluru model
-    numerical_features = ['BHK', 'Size_in_SqFt', 'Year_Built', 'Floor_No', 'Total_Floors', 
-                         'Age_of_Property', 'Nearby_Schools', 'Nearby_Hospitals']
-    
-    categorical_features = ['Property_Type', 'Furnished_Status', 'Locality',
-                           'Public_Transport_Accessibility', 'Parking_Space', 'Security']
-    
+from bengaluru_data import load_bengaluru_dataset, OTHER_LOCATION
+from encoding import compile_encoders
+from features import build_feature_row
+from training import fit_forest
+
+# Features for Bengaluru model
+NUMERICAL_FEATURES = ['BHK', 'total_sqft', 'bath', 'balcony']
+
+CATEGORICAL_FEATURES = ['area_type', 'availability', 'location']
+
+# Unknown values for these columns are scored as the given category
+ENCODER_FALLBACKS = {'location': OTHER_LOCATION}
+
+def prepare_training_data(path=None):
+    """Encoded feature matrix, target and the fitted encoders"""
+    # Load the cleaned Bengaluru listings
+    return encode_training_data(load_bengaluru_dataset(path))
+
+def encode_training_data(bengaluru_data):
+    """Fit the encoders on cleaned listings and add their encoded columns in place"""
     # Encode categorical variables
     le_dict = {}
-    for col in categorical_features:
-        if col in bengaluru_data.columns:
-            le = LabelEncoder()
-            bengaluru_data[col + '_encoded'] = le.fit_transform(bengaluru_data[col].astype(str))
-            le_dict[col] = le
+    for col in CATEGORICAL_FEATURES:
+        le = LabelEncoder()
+        bengaluru_data[col + '_encoded'] = le.fit_transform(bengaluru_data[col].astype(str))
+        le_dict[col] = le
     
     # Prepare features
-    feature_cols = [col for col in numerical_features if col in bengaluru_data.columns]
-    feature_cols += [col + '_encoded' for col in categorical_features if col in bengaluru_data.columns]
+    feature_cols = NUMERICAL_FEATURES + [col + '_encoded' for col in CATEGORICAL_FEATURES]
     
-    X = bengaluru_data[feature_cols].fillna(0)
-    y = bengaluru_data['Price_in_Lakhs']
+    X = bengaluru_data[feature_cols]
+    y = bengaluru_data['price']
+    return X, y, le_dict, feature_cols, bengaluru_data
+
+def train_bengaluru_model(path=None):
+    X, y, le_dict, feature_cols, bengaluru_data = prepare_training_data(path)
     
     # Train model
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X, y)
+    model = fit_forest(X, y, n_estimators=100, random_state=42)
     
     return model, le_dict, feature_cols, bengaluru_data
 
-def predict_bengaluru_price(model, encoders, feature_columns, input_data):
-    features = {}
-    
-    # Numerical features
-    features['BHK'] = float(input_data.get('bhk', 2))
-    features['Size_in_SqFt'] = float(input_data.get('size', 1000))
-    features['Year_Built'] = float(input_data.get('year_built', 2010))
-    features['Floor_No'] = float(input_data.get('floor_no', 1))
-    features['Total_Floors'] = float(input_data.get('total_floors', 5))
-    features['Age_of_Property'] = 2024 - features['Year_Built']
-    features['Nearby_Schools'] = float(input_data.get('nearby_schools', 5))
-    features['Nearby_Hospitals'] = float(input_data.get('nearby_hospitals', 3))
-    
-    # Categorical features
-    categorical_inputs = {
-        'Property_Type': input_data.get('property_type', 'Apartment'),
-        'Furnished_Status': input_data.get('furnished_status', 'Semi-furnished'),
-        'Locality': input_data.get('locality', 'Koramangala'),
-        'Public_Transport_Accessibility': input_data.get('transport', 'High'),
-        'Parking_Space': input_data.get('parking', 'Yes'),
-        'Security': input_data.get('security', 'Yes')
-    }
-    
-    # Encode categorical features
-    for col, value in categorical_inputs.items():
-        if col in encoders:
-            try:
-                encoded_value = encoders[col].transform([value])[0]
-            except:
-                encoded_value = 0
-            features[col + '_encoded'] = encoded_value
-    
-    # Create feature array
-    feature_array = [features.get(col, 0) for col in feature_columns]
-    
+def new_training_rows(path, le_dict, feature_cols):
+    """Features and target for extra listings, encoded with an existing model's encoders"""
+    # Locations are matched against the trained encoder, so nothing is collapsed here
+    listings = load_bengaluru_dataset(path, min_location_count=1)
+    encoders = compile_encoders(le_dict, ENCODER_FALLBACKS)
+    for col, encoder in encoders.items():
+        listings[col + '_encoded'] = encoder.encode_many(listings[col].astype(str))
+    return listings[feature_cols], listings['price']
+
+def predict_bengaluru_price(model, encoders, feature_columns, input_data, cache=None, model_version=None,
+                            timer=None):
+    """Predict one listing; ``encoders`` are compiled with encoding.compile_encoders
+
+    Pass a prediction_cache.PredictionCache and the bundle version to reuse
+    results for repeated inputs, and a metrics.StageTimer to time each stage.
+    """
+    feature_array = build_feature_row(input_data, 'bengaluru', encoders, feature_columns, timer)
+
+    def evaluate():
+        if timer is not None:
+            timer.lap('cache')
+        prediction = model.predict([feature_array])[0]
+        if timer is not None:
+            timer.lap('tree_evaluation')
+        return prediction
+
     # Make prediction
-    prediction = model.predict([feature_array])[0]
-    return prediction
\ No newline at end of file
+    if cache is None:
+        return evaluate()
+    prediction = cache.get_or_compute('bengaluru', model_version, feature_array, evaluate)
+    if timer is not None:
+        timer.lap('cache')
+    return prediction
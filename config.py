@@ -0,0 +1,75 @@
+"""Runtime settings shared by the web app and the offline training jobs.
+
+Every value can be overridden with an environment variable of the same name.
+"""
+import os
+
+# Source datasets
+DATA_PATH = os.environ.get('DATA_PATH', 'india_housing_prices.csv')
+BENGALURU_DATA_PATH = os.environ.get('BENGALURU_DATA_PATH', 'Bengaluru_House_Data.csv')
+# Columnar copy of DATA_PATH built by data_store.py
+PARQUET_PATH = os.environ.get('PARQUET_PATH', 'india_housing_prices.parquet')
+
+# Versioned model bundles written by train_models.py
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', 'artifacts')
+# Cores used to fit a forest (-1 = all)
+TRAIN_N_JOBS = int(os.environ.get('TRAIN_N_JOBS', -1))
+
+# Batch scoring: rows scored per predict() call and streamed per response chunk
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 5000))
+
+# Largest page /api/data will serve
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 200))
+
+# Prediction cache: max entries (0 disables it) and entry lifetime in seconds (0 = no expiry)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+
+# Inference backend: 'flat' evaluates flattened tree arrays with numpy (much
+# faster for single rows), 'sklearn' calls the fitted estimator directly
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'flat')
+# Batches larger than this go to sklearn even with the flat backend
+FLAT_MAX_ROWS = int(os.environ.get('FLAT_MAX_ROWS', 256))
+
+# Distilled surrogate serving: p99 single-row latency budget in ms (0 serves
+# the full forest). The surrogate is used only if it meets the budget on this
+# host; bigger batches and failures fall back to the forest.
+SURROGATE_P99_MS = float(os.environ.get('SURROGATE_P99_MS', 0))
+
+# ASGI front-end (asgi.py): worker threads, max requests queued or running,
+# and seconds to wait for a response, per pool
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 4))
+INFERENCE_MAX_PENDING = int(os.environ.get('INFERENCE_MAX_PENDING', 64))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 2))
+BULK_WORKERS = int(os.environ.get('BULK_WORKERS', 2))
+BULK_MAX_PENDING = int(os.environ.get('BULK_MAX_PENDING', 8))
+BULK_TIMEOUT = float(os.environ.get('BULK_TIMEOUT', 30))
+DEFAULT_WORKERS = int(os.environ.get('DEFAULT_WORKERS', 8))
+DEFAULT_MAX_PENDING = int(os.environ.get('DEFAULT_MAX_PENDING', 64))
+DEFAULT_TIMEOUT = float(os.environ.get('DEFAULT_TIMEOUT', 10))
+
+# Micro-batching of concurrent single-row predictions: how long the first
+# queued row waits for company (0 disables it) and the largest batch
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', 0))
+MICROBATCH_MAX_ROWS = int(os.environ.get('MICROBATCH_MAX_ROWS', 64))
+
+# Multi-process serving: directory the master publishes model node arrays and
+# dataset columns to (use tmpfs, e.g. /dev/shm/house-prices; empty disables
+# shared mode)
+SHARED_DIR = os.environ.get('SHARED_DIR', '')
+
+# Seconds between checks for newly published model versions (0 disables hot reload)
+REGISTRY_POLL_SECONDS = float(os.environ.get('REGISTRY_POLL_SECONDS', 5))
+
+# Load both models and the dataset on a background thread as soon as the app
+# starts (0 loads each one only when a request first needs it)
+WARMUP = int(os.environ.get('WARMUP', 1))
+
+# Sampling profiler for requests sent with an X-Profile header (0 ignores the
+# header) and the stack sampling interval in ms
+PROFILING = int(os.environ.get('PROFILING', 0))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 1))
+
+# Training rows priced outside [Q1 - k*IQR, Q3 + k*IQR] are dropped as
+# outliers (0 keeps every row)
+OUTLIER_IQR_K = float(os.environ.get('OUTLIER_IQR_K', 1.5))
@@ -0,0 +1,8 @@
+import os
+
+# test_data_browser.py is a script for a running server (python test_data_browser.py), not a pytest module
+collect_ignore = ['test_data_browser.py']
+
+# Tests that import app must not start its background loading and polling threads
+os.environ.setdefault('WARMUP', '0')
+os.environ.setdefault('REGISTRY_POLL_SECONDS', '0')
@@ -0,0 +1,191 @@
+"""Indexes behind the /api/data browser.
+
+Built once when the dataset is loaded:
+
+* an inverted index per categorical filter column (value -> row positions)
+* a sort order and rank array per sortable column, which also answer range
+  filters with two binary searches
+
+A query resolves to an array of row positions in sort order. It is computed
+from the indexes without scanning the frame and cached, so every page after
+the first is a slice. Cursors are keyset-style: they hold the sort rank of
+the last row served and the dataset version, and the next page starts with a
+binary search.
+"""
+import base64
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+FILTER_COLUMNS = ['State', 'City']
+
+SORT_COLUMNS = ['ID', 'Price_in_Lakhs', 'BHK', 'Size_in_SqFt', 'Year_Built']
+
+# query parameter -> (column, bound)
+RANGE_FILTERS = {
+    'min_bhk': ('BHK', 'min'),
+    'max_bhk': ('BHK', 'max'),
+    'min_price': ('Price_in_Lakhs', 'min'),
+    'max_price': ('Price_in_Lakhs', 'max'),
+}
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def encode_cursor(query_key, rank, version=None):
+    raw = json.dumps({'q': query_key, 'r': int(rank), 'v': version}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor, query_key, version=None):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        rank = int(payload['r'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidQuery('Malformed cursor')
+    if payload.get('q') != query_key:
+        raise InvalidQuery('Cursor does not belong to this query')
+    # Ranks index one build of the dataset; after a reload they point elsewhere
+    if payload.get('v') != version:
+        raise InvalidQuery('Cursor is from another version of the dataset; start again from the first page')
+    return rank
+
+
+class DataIndex:
+    """Sorted and inverted indexes over a static DataFrame
+
+    ``version`` identifies the frame; cursors carry it and are refused by an
+    index built on another version.
+    """
+
+    def __init__(self, df, version=None, cache_size=128):
+        self.version = version
+        self.n_rows = len(df)
+        position_dtype = np.int32 if self.n_rows < 2 ** 31 else np.int64
+
+        self.inverted = {}
+        for col in FILTER_COLUMNS:
+            if col in df:
+                groups = df.groupby(col, observed=True, sort=False).indices
+                self.inverted[col] = {str(value): rows.astype(position_dtype) for value, rows in groups.items()}
+
+        # order[col]: row positions sorted by the column (NaN last)
+        # rank[col]: inverse of order, i.e. each row's place in that order
+        self.order, self.sorted_values, self.rank = {}, {}, {}
+        for col in SORT_COLUMNS + [c for c, _ in RANGE_FILTERS.values()]:
+            if col in df and col not in self.order:
+                values = df[col].to_numpy(dtype=float)
+                order = np.argsort(values, kind='stable').astype(position_dtype)
+                rank = np.empty_like(order)
+                rank[order] = np.arange(self.n_rows, dtype=position_dtype)
+                self.order[col], self.sorted_values[col], self.rank[col] = order, values[order], rank
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def values(self, col):
+        return sorted(self.inverted.get(col, {}))
+
+    def _range_rows(self, col, low, high):
+        sorted_values = self.sorted_values[col]
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        if high is None:
+            # Exclude NaN rows, which sort last
+            stop = self.n_rows - int(np.isnan(sorted_values).sum()) if self.n_rows else 0
+        else:
+            stop = np.searchsorted(sorted_values, high, side='right')
+        return self.order[col][start:stop]
+
+    def _resolve(self, filters, sort_col):
+        """Row positions matching ``filters``, ordered by ``sort_col``, and their ranks"""
+        candidates = None
+        for col, value in filters['equals'].items():
+            rows = self.inverted.get(col, {}).get(value, np.empty(0, dtype=np.int32))
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+        for col, (low, high) in filters['ranges'].items():
+            rows = self._range_rows(col, low, high)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+
+        if sort_col is None:
+            positions = np.arange(self.n_rows) if candidates is None else np.sort(candidates)
+            return positions, positions
+        if candidates is None:
+            return self.order[sort_col], np.arange(self.n_rows)
+        ranks = np.sort(self.rank[sort_col][candidates])
+        return self.order[sort_col][ranks], ranks
+
+    def parse(self, args):
+        """Normalise request arguments into a hashable query key"""
+        equals = {col: args[col.lower()] for col in FILTER_COLUMNS if args.get(col.lower())}
+        ranges = {}
+        for param, (col, bound) in RANGE_FILTERS.items():
+            if args.get(param) in (None, ''):
+                continue
+            try:
+                value = float(args[param])
+            except ValueError:
+                raise InvalidQuery(f'{param} must be a number')
+            low, high = ranges.get(col, (None, None))
+            ranges[col] = (value, high) if bound == 'min' else (low, value)
+
+        sort = args.get('sort') or ''
+        descending = sort.startswith('-')
+        sort_col = sort.lstrip('-') or None
+        if sort_col is not None and sort_col not in self.order:
+            raise InvalidQuery(f'Cannot sort by {sort_col!r}; choose from {", ".join(SORT_COLUMNS)}')
+
+        key = json.dumps({'eq': equals, 'range': ranges, 'sort': sort}, sort_keys=True)
+        return key, {'equals': equals, 'ranges': ranges}, sort_col, descending
+
+    def query(self, args):
+        """Cached ``(positions, ranks, descending, key)`` for a request's filters and sort"""
+        key, filters, sort_col, descending = self.parse(args)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key] + (descending, key)
+
+        result = self._resolve(filters, sort_col)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result + (descending, key)
+
+    def page(self, args, per_page, page=None, cursor=None):
+        """Row positions for one page plus paging metadata"""
+        positions, ranks, descending, key = self.query(args)
+        total = len(positions)
+
+        if cursor:
+            last_rank = decode_cursor(cursor, key, self.version)
+            if descending:
+                end = int(np.searchsorted(ranks, last_rank, side='left'))
+                start = max(end - per_page, 0)
+            else:
+                start = int(np.searchsorted(ranks, last_rank, side='right'))
+                end = min(start + per_page, total)
+        else:
+            offset = (max(page or 1, 1) - 1) * per_page
+            if descending:
+                end = max(total - offset, 0)
+                start = max(end - per_page, 0)
+            else:
+                start = min(offset, total)
+                end = min(start + per_page, total)
+
+        rows = positions[start:end]
+        page_ranks = ranks[start:end]
+        if descending:
+            rows, page_ranks = rows[::-1], page_ranks[::-1]
+            has_more = start > 0
+        else:
+            has_more = end < total
+
+        next_cursor = encode_cursor(key, page_ranks[-1], self.version) if has_more and len(rows) else None
+        return rows, {'total': total, 'next_cursor': next_cursor}
@@ -0,0 +1,179 @@
+"""Columnar copy of india_housing_prices.csv.
+
+``ingest_csv`` converts the CSV once, in chunks, into a Parquet file with
+explicit column types, dictionary-encoded categoricals and per-row-group
+statistics. ``read_dataset`` then loads only the columns a caller asks for,
+with categoricals as pandas ``category``. If pyarrow is missing, or the
+Parquet file is absent or older than the CSV, it falls back to reading the
+CSV with the same types:
+
+    python data_store.py            # (re)build the Parquet file
+"""
+import os
+
+import pandas as pd
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+CATEGORICAL_COLUMNS = ['State', 'City', 'Locality', 'Property_Type', 'Furnished_Status',
+                       'Public_Transport_Accessibility', 'Parking_Space', 'Security',
+                       'Amenities', 'Facing', 'Owner_Type', 'Availability_Status']
+
+INTEGER_COLUMNS = ['ID', 'BHK', 'Year_Built', 'Floor_No', 'Total_Floors', 'Age_of_Property',
+                   'Nearby_Schools', 'Nearby_Hospitals']
+
+FLOAT_COLUMNS = ['Size_in_SqFt', 'Price_in_Lakhs', 'Price_per_SqFt']
+
+ROW_GROUP_SIZE = 128_000
+
+
+def _csv_dtypes(columns=None):
+    dtypes = {col: 'str' for col in CATEGORICAL_COLUMNS}
+    dtypes.update({col: 'Int64' for col in INTEGER_COLUMNS})
+    dtypes.update({col: 'float64' for col in FLOAT_COLUMNS})
+    if columns is not None:
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in columns}
+    return dtypes
+
+
+def _arrow_type(col):
+    if col in INTEGER_COLUMNS:
+        return pa.int32()
+    if col in FLOAT_COLUMNS:
+        return pa.float64()
+    return pa.string()
+
+
+def ingest_csv(csv_path=None, parquet_path=None, chunksize=500_000):
+    """Convert the CSV to Parquet without holding the whole file in memory"""
+    if pq is None:
+        raise ImportError('pyarrow is required to build the Parquet data store')
+    csv_path = csv_path or config.DATA_PATH
+    parquet_path = parquet_path or config.PARQUET_PATH
+
+    stat = os.stat(csv_path)
+    source = {b'source_size': str(stat.st_size).encode(), b'source_mtime': repr(stat.st_mtime).encode()}
+
+    tmp_path = f'{parquet_path}.tmp{os.getpid()}'
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=_csv_dtypes(), chunksize=chunksize):
+            if writer is None:
+                schema = pa.schema([(col, _arrow_type(col)) for col in chunk.columns], metadata=source)
+                categoricals = [col for col in chunk.columns if col in CATEGORICAL_COLUMNS]
+                writer = pq.ParquetWriter(tmp_path, schema, use_dictionary=categoricals,
+                                          write_statistics=True, compression='snappy')
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def parquet_is_fresh(csv_path=None, parquet_path=None):
+    """True when the Parquet file exists and was built from the current CSV"""
+    if pq is None:
+        return False
+    csv_path = csv_path or config.DATA_PATH
+    parquet_path = parquet_path or config.PARQUET_PATH
+    if not os.path.exists(parquet_path):
+        return False
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return True
+    meta = pq.read_schema(parquet_path).metadata or {}
+    return (meta.get(b'source_size') == str(stat.st_size).encode()
+            and meta.get(b'source_mtime') == repr(stat.st_mtime).encode())
+
+
+def ensure_parquet(csv_path=None, parquet_path=None):
+    """Build the Parquet file if it is missing or stale; no-op without pyarrow"""
+    if pq is not None and not parquet_is_fresh(csv_path, parquet_path):
+        ingest_csv(csv_path, parquet_path)
+
+
+def read_dataset(columns=None, csv_path=None, parquet_path=None):
+    """Load the selected columns, from Parquet when it is up to date"""
+    if parquet_is_fresh(csv_path, parquet_path):
+        parquet_path = parquet_path or config.PARQUET_PATH
+        available = pq.read_schema(parquet_path).names
+        if columns is not None:
+            columns = [col for col in columns if col in available]
+        categoricals = [col for col in (columns or available) if col in CATEGORICAL_COLUMNS]
+        table = pq.read_table(parquet_path, columns=columns, read_dictionary=categoricals)
+        return table.to_pandas()
+
+    csv_path = csv_path or config.DATA_PATH
+    if columns is not None:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        columns = [col for col in columns if col in header]
+    df = pd.read_csv(csv_path, usecols=columns, dtype=_csv_dtypes(columns))
+    for col in df.columns:
+        # Match what pyarrow's to_pandas produces for the Parquet types
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in INTEGER_COLUMNS:
+            df[col] = df[col].astype('float64' if df[col].hasnans else 'int32')
+    return df
+
+
+def iter_batches(columns=None, batch_size=ROW_GROUP_SIZE, csv_path=None, parquet_path=None):
+    """The selected columns as DataFrames of up to ``batch_size`` rows, for one pass over large files"""
+    if parquet_is_fresh(csv_path, parquet_path):
+        parquet_file = pq.ParquetFile(parquet_path or config.PARQUET_PATH)
+        if columns is not None:
+            columns = [col for col in columns if col in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    csv_path = csv_path or config.DATA_PATH
+    if columns is not None:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        columns = [col for col in columns if col in header]
+    yield from pd.read_csv(csv_path, usecols=columns, dtype=_csv_dtypes(columns), chunksize=batch_size)
+
+
+def compact_frame(df):
+    """Shrink a loaded frame for long-lived in-process use
+
+    Categoricals become ``category`` with unused levels dropped, integers are
+    downcast to the smallest type that holds them, and floats become float32
+    only where that is lossless, so values served from the frame don't change.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS or series.dtype == object:
+            df[col] = series.astype('category').cat.remove_unused_categories()
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype):
+            narrow = series.astype('float32')
+            if narrow.astype('float64').equals(series.astype('float64')):
+                df[col] = narrow
+    return df
+
+
+def memory_footprint(df):
+    """Bytes held by each column, plus the total"""
+    usage = df.memory_usage(deep=True, index=True)
+    return {
+        'rows': int(len(df)),
+        'total_bytes': int(usage.sum()),
+        'columns': {col: int(size) for col, size in usage.items()},
+    }
+
+
+if __name__ == '__main__':
+    path = ingest_csv()
+    print(f'Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)')
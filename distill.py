@@ -0,0 +1,260 @@
+"""Distil the served forests into small, fast surrogate models.
+
+Each surrogate in ``SURROGATES`` is fitted on the forest's own predictions for
+the training rows (the "teacher" labels). The training rows are optionally
+topped up with synthetic rows, whose features are resampled independently
+from each column. Surrogates are then scored on held-out rows for:
+
+* fidelity: RMSE against the forest's predictions
+* accuracy: RMSE and R² against the real target. The forest was fitted on
+  every row, so its own RMSE and R² are reported as training error only
+* single-row latency (p50/p99) in the form app.py would serve them
+  (flattened trees for tree models)
+* size
+
+The most faithful surrogate whose p99 fits the budget and beats the forest's
+is saved next to the bundle, along with the full report. A forest that meets
+the budget on its own is not distilled at all. When ``SURROGATE_P99_MS`` is
+set, app.py wraps the forest in a ``BudgetedModel``. Single rows and small
+batches then go to the surrogate, and everything else goes to the forest:
+
+    python distill.py --only india --budget-ms 0.5
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import KBinsDiscretizer
+from sklearn.tree import DecisionTreeRegressor
+
+import bengaluru_model
+import config
+import india_model
+import model_store
+from tree_engine import compile_model
+
+# name -> factory for an unfitted surrogate
+SURROGATES = {
+    'tree-d8': lambda: DecisionTreeRegressor(max_depth=8, random_state=42),
+    'tree-d12': lambda: DecisionTreeRegressor(max_depth=12, min_samples_leaf=5, random_state=42),
+    'gbm-shallow': lambda: HistGradientBoostingRegressor(max_depth=3, max_iter=100, random_state=42),
+    'binned-linear': lambda: make_pipeline(
+        KBinsDiscretizer(n_bins=16, encode='onehot', strategy='quantile', subsample=None),
+        Ridge(alpha=1.0)),
+}
+
+# model name -> (feature preparation, dataset)
+DATASETS = {
+    'india': (india_model.prepare_training_data, config.DATA_PATH),
+    'bengaluru': (bengaluru_model.prepare_training_data, config.BENGALURU_DATA_PATH),
+}
+
+# Feature rows kept with a saved surrogate so app.py can time it on its own host
+SAMPLE_ROWS = 256
+
+
+def latency_profile(model, X, calls=300):
+    """Single-row predict latency percentiles in milliseconds"""
+    X = np.asarray(X, dtype=np.float64)
+    timings = np.empty(calls)
+    for i in range(calls):
+        row = X[i % len(X)].reshape(1, -1)
+        start = time.perf_counter()
+        model.predict(row)
+        timings[i] = time.perf_counter() - start
+    return {
+        'p50_ms': float(np.percentile(timings, 50) * 1000),
+        'p99_ms': float(np.percentile(timings, 99) * 1000),
+    }
+
+
+def model_size(model):
+    if hasattr(model, 'tree_'):
+        return {'nodes': int(model.tree_.node_count)}
+    if hasattr(model, 'estimators_'):
+        return {'nodes': int(sum(est.tree_.node_count for est in model.estimators_))}
+    if hasattr(model, '_predictors'):
+        return {'nodes': int(sum(p[0].get_n_leaf_nodes() * 2 - 1 for p in model._predictors))}
+    return {'coefficients': int(np.size(model[-1].coef_))}
+
+
+def augment(X, factor, seed=42):
+    """``factor`` x len(X) synthetic rows drawn column by column from X"""
+    n = int(len(X) * factor)
+    if n == 0:
+        return X[:0]
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.choice(X[:, j], n) for j in range(X.shape[1])])
+
+
+def _teacher_predict(teacher, X):
+    # The forests were fitted on DataFrames; keep the column names to avoid warnings
+    columns = getattr(teacher, 'feature_names_in_', None)
+    return teacher.predict(pd.DataFrame(X, columns=columns) if columns is not None else X)
+
+
+def distill(teacher, X, y, budget_ms=None, surrogates=None, augment_factor=1.0, seed=42):
+    """Fit and compare surrogates; return ``(best surrogate or None, report)``"""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed)
+    X_fit = np.vstack([X_train, augment(X_train, augment_factor, seed)])
+    y_fit = _teacher_predict(teacher, X_fit)
+    teacher_test = _teacher_predict(teacher, X_test)
+
+    teacher_serving = compile_model(teacher)
+    report = {
+        'budget_ms': budget_ms,
+        'rows': len(X_fit),
+        # The bundle was fitted on every row, X_test included, so this is training error
+        'teacher': {
+            'train_rmse': float(np.sqrt(mean_squared_error(y_test, teacher_test))),
+            'train_r2': float(r2_score(y_test, teacher_test)),
+            **latency_profile(teacher_serving, X_test),
+            **model_size(teacher),
+        },
+        'surrogates': {},
+        'selected': None,
+    }
+
+    if budget_ms and report['teacher']['p99_ms'] <= budget_ms:
+        # The forest already meets the budget; a surrogate would only cost accuracy
+        return None, report
+
+    fitted = {}
+    for name in surrogates or SURROGATES:
+        surrogate = SURROGATES[name]()
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            # Quantile binning drops empty bins of low-cardinality columns
+            warnings.simplefilter('ignore', UserWarning)
+            surrogate.fit(X_fit, y_fit)
+        fit_seconds = time.perf_counter() - start
+        predicted = surrogate.predict(X_test)
+        report['surrogates'][name] = {
+            'fidelity_rmse': float(np.sqrt(mean_squared_error(teacher_test, predicted))),
+            'rmse': float(np.sqrt(mean_squared_error(y_test, predicted))),
+            'r2': float(r2_score(y_test, predicted)),
+            'fit_seconds': fit_seconds,
+            **latency_profile(compile_model(surrogate), X_test),
+            **model_size(surrogate),
+        }
+        fitted[name] = surrogate
+
+    teacher_p99 = report['teacher']['p99_ms']
+    eligible = [name for name, stats in report['surrogates'].items()
+                if stats['p99_ms'] < teacher_p99 and (not budget_ms or stats['p99_ms'] <= budget_ms)]
+    if not eligible:
+        return None, report
+    best = min(eligible, key=lambda name: report['surrogates'][name]['fidelity_rmse'])
+    report['selected'] = best
+    sample = X_test[:SAMPLE_ROWS]
+    return {'name': best, 'model': fitted[best], 'sample': sample}, report
+
+
+class BudgetedModel:
+    """Serve a surrogate for requests of up to ``max_rows`` rows, the full model otherwise
+
+    Any error raised by the surrogate also falls back to the full model.
+    """
+
+    def __init__(self, surrogate, fallback, max_rows, name=None, latency=None):
+        self.surrogate = surrogate
+        self.fallback = fallback
+        self.max_rows = max_rows
+        self.name = name
+        self.latency = latency
+        self.surrogate_calls = self.fallback_calls = self.failures = 0
+
+    def predict(self, X):
+        if len(X) <= self.max_rows:
+            try:
+                prediction = self.surrogate.predict(X)
+                self.surrogate_calls += 1
+                return prediction
+            except Exception:
+                self.failures += 1
+        self.fallback_calls += 1
+        return self.fallback.predict(X)
+
+    def info(self):
+        return {
+            'serving': 'surrogate',
+            'surrogate': self.name,
+            'latency': self.latency,
+            'surrogate_calls': self.surrogate_calls,
+            'fallback_calls': self.fallback_calls,
+            'failures': self.failures,
+        }
+
+
+def budgeted_model(meta, fallback, budget_ms, max_rows, root=None):
+    """Wrap ``fallback`` with the bundle's surrogate if it meets ``budget_ms`` here
+
+    The saved sample rows are used to time both models on this host.
+    ``fallback`` is returned as is when it meets the budget itself, when there
+    is no surrogate, or when the surrogate is too slow or no faster than it.
+    """
+    saved = model_store.load_surrogate(meta['name'], meta['version'], root)
+    if saved is None:
+        return fallback
+    fallback_p99 = latency_profile(fallback, saved['sample'])['p99_ms']
+    if fallback_p99 <= budget_ms:
+        return fallback
+    surrogate = compile_model(saved['model'], max_rows)
+    latency = latency_profile(surrogate, saved['sample'])
+    if latency['p99_ms'] > budget_ms or latency['p99_ms'] >= fallback_p99:
+        return fallback
+    return BudgetedModel(surrogate, fallback, max_rows, saved['name'], latency)
+
+
+def distill_bundle(name, budget_ms=None, surrogates=None, augment_factor=1.0, root=None):
+    """Distil the latest bundle of ``name`` and attach the result to it"""
+    prepare, path = DATASETS[name]
+    bundle = model_store.load_bundle(name, root=root)
+    X, y = prepare(path)[:2]
+    surrogate, report = distill(bundle['model'], X, y, budget_ms, surrogates, augment_factor)
+    report['version'] = bundle['meta']['version']
+    model_store.save_surrogate(name, bundle['meta']['version'], surrogate, report, root=root)
+    return report
+
+
+def print_report(name, report):
+    teacher = report['teacher']
+    print(f"\n{name}: forest p99 {teacher['p99_ms']:.3f} ms, {teacher['nodes']} nodes, "
+          f"training RMSE {teacher['train_rmse']:.4f} (in-sample, not comparable with the holdout RMSE below)")
+    print(f"{'surrogate':14} {'fidelity':>9} {'rmse':>9} {'r2':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for surrogate, stats in report['surrogates'].items():
+        print(f"{surrogate:14} {stats['fidelity_rmse']:9.4f} {stats['rmse']:9.4f} {stats['r2']:7.4f} "
+              f"{stats['p50_ms']:8.3f} {stats['p99_ms']:8.3f}")
+    if report['selected']:
+        print(f"selected: {report['selected']}")
+    elif not report['surrogates']:
+        print('selected: none, the forest meets the budget')
+    else:
+        print('selected: none faster than the forest within budget')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distil the trained forests into surrogate models')
+    parser.add_argument('--only', choices=sorted(DATASETS), help='distil a single model')
+    parser.add_argument('--budget-ms', type=float, default=config.SURROGATE_P99_MS or None,
+                        help='p99 single-row latency the surrogate must meet')
+    parser.add_argument('--surrogates', nargs='+', choices=sorted(SURROGATES))
+    parser.add_argument('--augment', type=float, default=1.0, help='synthetic rows per training row')
+    args = parser.parse_args()
+
+    for name in ([args.only] if args.only else DATASETS):
+        report = distill_bundle(name, args.budget_ms, args.surrogates, args.augment)
+        print_report(name, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Constant-time categorical encoding for serving.
+
+A fitted ``LabelEncoder`` validates its input and runs ``searchsorted`` on
+every ``transform`` call. At load time each encoder is compiled once into a
+plain dict lookup. Values the model never saw map to code 0, as before, or
+to a designated fallback category. Each one is counted so unknown-category
+traffic can be measured.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Code used for categories missing from the training data
+UNKNOWN_CODE = 0
+
+
+class CompiledEncoder:
+    """Dict-backed replacement for ``LabelEncoder.transform`` with hit counters"""
+
+    def __init__(self, label_encoder, fallback=None):
+        self.classes_ = label_encoder.classes_
+        self.table = {label: code for code, label in enumerate(self.classes_.tolist())}
+        self.unknown_code = self.table.get(fallback, UNKNOWN_CODE)
+        self.lookups = 0
+        self.unknown = 0
+        self._lock = threading.Lock()
+
+    def encode(self, value):
+        code = self.table.get(value)
+        with self._lock:
+            self.lookups += 1
+            if code is None:
+                self.unknown += 1
+        return self.unknown_code if code is None else code
+
+    def encode_many(self, values):
+        """Encode an array of labels in one pass"""
+        codes = pd.Series(values, dtype=object).map(self.table)
+        missing = int(codes.isna().sum())
+        with self._lock:
+            self.lookups += len(codes)
+            self.unknown += missing
+        return codes.fillna(self.unknown_code).to_numpy(dtype=np.int64)
+
+    def stats(self):
+        return {'lookups': self.lookups, 'unknown': self.unknown, 'classes': len(self.table)}
+
+
+def compile_encoders(le_dict, fallbacks=None):
+    """Compile a ``{column: LabelEncoder}`` dict as saved in the model bundles
+
+    ``fallbacks`` optionally maps a column to the category unknown values
+    should be encoded as.
+    """
+    fallbacks = fallbacks or {}
+    return {col: CompiledEncoder(le, fallbacks.get(col)) for col, le in le_dict.items()}
+
+
+def encoder_stats(encoders):
+    return {col: enc.stats() for col, enc in encoders.items()}
@@ -0,0 +1,126 @@
+"""Turn user inputs into model feature matrices.
+
+The form field names, the feature each one feeds and its default live in the
+``*_FIELDS`` tables below so the single-row and batch endpoints agree.
+``build_feature_row`` serves the single-row endpoints and
+``build_feature_matrix`` assembles a whole batch column by column with numpy
+instead of building a dict per row.
+"""
+import numpy as np
+import pandas as pd
+
+# Reference year used to derive Age_of_Property from Year_Built
+CURRENT_YEAR = 2024
+
+# (form field, feature column, default)
+INDIA_NUMERIC_FIELDS = [
+    ('bhk', 'BHK', 2),
+    ('size', 'Size_in_SqFt', 1000),
+    ('year_built', 'Year_Built', 2010),
+    ('floor_no', 'Floor_No', 1),
+    ('total_floors', 'Total_Floors', 5),
+    ('nearby_schools', 'Nearby_Schools', 5),
+    ('nearby_hospitals', 'Nearby_Hospitals', 3),
+]
+
+INDIA_CATEGORICAL_FIELDS = [
+    ('state', 'State', 'Maharashtra'),
+    ('property_type', 'Property_Type', 'Apartment'),
+    ('furnished_status', 'Furnished_Status', 'Semi-furnished'),
+    ('transport', 'Public_Transport_Accessibility', 'Medium'),
+    ('parking', 'Parking_Space', 'Yes'),
+    ('security', 'Security', 'Yes'),
+    ('facing', 'Facing', 'North'),
+    ('owner_type', 'Owner_Type', 'Owner'),
+    ('availability', 'Availability_Status', 'Ready_to_Move'),
+]
+
+# Features the form does not ask for
+INDIA_CONSTANTS = {'Price_per_SqFt': 0.1}
+
+BENGALURU_NUMERIC_FIELDS = [
+    ('bhk', 'BHK', 2),
+    ('size', 'total_sqft', 1200),
+    ('bath', 'bath', 2),
+    ('balcony', 'balcony', 1),
+]
+
+BENGALURU_CATEGORICAL_FIELDS = [
+    ('area_type', 'area_type', 'Super built-up Area'),
+    ('availability', 'availability', 'Ready To Move'),
+    ('locality', 'location', 'Whitefield'),
+]
+
+BENGALURU_CONSTANTS = {}
+
+SPECS = {
+    'india': (INDIA_NUMERIC_FIELDS, INDIA_CATEGORICAL_FIELDS, INDIA_CONSTANTS),
+    'bengaluru': (BENGALURU_NUMERIC_FIELDS, BENGALURU_CATEGORICAL_FIELDS, BENGALURU_CONSTANTS),
+}
+
+
+def build_feature_row(form, spec, encoders, feature_columns, timer=None):
+    """Feature vector for one request, in ``feature_columns`` order
+
+    ``encoders`` are the compiled encoders from encoding.compile_encoders.
+    A metrics.StageTimer, if given, is lapped after each stage.
+    """
+    numeric_fields, categorical_fields, constants = SPECS[spec]
+    features = dict(constants)
+
+    for field, feature, default in numeric_fields:
+        features[feature] = float(form.get(field, default))
+    if 'Year_Built' in features:
+        features['Age_of_Property'] = CURRENT_YEAR - features['Year_Built']
+    if timer is not None:
+        timer.lap('form_parsing')
+
+    for field, feature, default in categorical_fields:
+        if feature in encoders:
+            features[feature + '_encoded'] = encoders[feature].encode(form.get(field, default))
+    if timer is not None:
+        timer.lap('encoding')
+
+    row = [features.get(col, 0) for col in feature_columns]
+    if timer is not None:
+        timer.lap('feature_assembly')
+    return row
+
+
+def build_feature_matrix(records, spec, encoders, feature_columns):
+    """Feature matrix for a DataFrame of raw form-style records
+
+    Missing or non-numeric inputs fall back to the field default, the same
+    defaults the single-row endpoints use.
+    """
+    numeric_fields, categorical_fields, constants = SPECS[spec]
+    n_rows = len(records)
+    columns = {}
+
+    for field, feature, default in numeric_fields:
+        if field in records:
+            values = pd.to_numeric(records[field], errors='coerce').to_numpy(dtype=float)
+            values = np.where(np.isnan(values), default, values)
+        else:
+            values = np.full(n_rows, default, dtype=float)
+        columns[feature] = values
+    if 'Year_Built' in columns:
+        columns['Age_of_Property'] = CURRENT_YEAR - columns['Year_Built']
+
+    for feature, value in constants.items():
+        columns[feature] = np.full(n_rows, value, dtype=float)
+
+    for field, feature, default in categorical_fields:
+        if feature not in encoders:
+            continue
+        if field in records:
+            raw = records[field].where(records[field].notna(), default).astype(str).to_numpy()
+        else:
+            raw = np.full(n_rows, default, dtype=object)
+        columns[feature + '_encoded'] = encoders[feature].encode_many(raw)
+
+    X = np.zeros((n_rows, len(feature_columns)), dtype=float)
+    for i, col in enumerate(feature_columns):
+        if col in columns:
+            X[:, i] = columns[col]
+    return X
@@ -0,0 +1,25 @@
+"""Multi-process serving of app.py with shared model and dataset arrays.
+
+    gunicorn -c gunicorn_conf.py app:app
+
+The master publishes the latest bundles and the dataset to SHARED_DIR once
+at startup. The workers map them read-only instead of loading their own
+copies. Publish again after retraining (``python shared_store.py``) and the
+workers switch to the new version within REGISTRY_POLL_SECONDS, without a
+restart.
+"""
+import os
+
+# Must be set before config is imported, here and in the workers
+os.environ.setdefault('SHARED_DIR', '/dev/shm/house-prices')
+
+import shared_store  # noqa: E402
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'sync'
+
+
+def on_starting(server):
+    for name, version in shared_store.publish_all().items():
+        server.log.info('published %s %s to %s', name, version, shared_store.shared_dir(name))
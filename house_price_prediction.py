@@ -1,333 +1,385 @@
 # House Price Prediction using PySpark
 # Complete pipeline for predicting house prices using regression models
+#
+# Each stage is a function so other jobs can reuse them. Every stage makes
+# one pass over its input: a single streaming_stats scan covers the null
+# counts, the column statistics and the outlier bounds. The indexers are fitted in
+# one multi-column pass. The modelling frame is persisted once, and its
+# train/test row counts come from the same job that fills the cache. All
+# three metrics for a model come from one aggregation over its predictions.
 
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, when, isnan, count, mean, stddev
-from pyspark.sql.types import DoubleType, IntegerType
+from pyspark.sql import functions as F
+from pyspark.storagelevel import StorageLevel
+from pyspark.ml import PipelineModel
 from pyspark.ml.feature import VectorAssembler, StringIndexer
 from pyspark.ml.regression import LinearRegression, DecisionTreeRegressor, RandomForestRegressor
-from pyspark.ml.evaluation import RegressionEvaluator
-from pyspark.ml import Pipeline
 import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-
-# Initialize Spark Session
-print("Initializing Spark Session...")
-spark = SparkSession.builder \
-    .appName("HousePricePrediction") \
-    .config("spark.sql.adaptive.enabled", "true") \
-    .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
-    .getOrCreate()
-
-print(f"Spark Version: {spark.version}")
-
-# Load the dataset
-print("\n1. Loading Dataset...")
-df = spark.read.csv("india_housing_prices.csv", header=True, inferSchema=True)
-
-print(f"Dataset shape: {df.count()} rows, {len(df.columns)} columns")
-print("\nDataset Schema:")
-df.printSchema()
-
-# Display first few rows
-print("\nFirst 5 rows:")
-df.show(5, truncate=False)
-
-# Data Exploration and Cleaning
-print("\n2. Data Exploration and Cleaning...")
-
-# Check for null values
-print("\nNull value counts:")
-null_counts = df.select([count(when(col(c).isNull() | isnan(col(c)), c)).alias(c) for c in df.columns])
-null_counts.show()
-
-# Basic statistics for numerical columns
-print("\nBasic Statistics:")
-numerical_cols = ['BHK', 'Size_in_SqFt', 'Price_in_Lakhs', 'Price_per_SqFt', 'Year_Built', 
+
+import config
+import data_store
+from streaming_stats import profile_spark, spark_filter
+
+NUMERICAL_COLS = ['BHK', 'Size_in_SqFt', 'Price_in_Lakhs', 'Price_per_SqFt', 'Year_Built',
                   'Floor_No', 'Total_Floors', 'Age_of_Property', 'Nearby_Schools', 'Nearby_Hospitals']
-df.select(numerical_cols).describe().show()
 
-# Data Cleaning - Handle missing values and outliers
-print("\n3. Data Preprocessing...")
+CATEGORICAL_COLS = ['State', 'City', 'Property_Type', 'Furnished_Status', 'Public_Transport_Accessibility',
+                    'Parking_Space', 'Security', 'Facing', 'Owner_Type', 'Availability_Status']
 
-# Remove rows with null values in critical columns
-df_clean = df.filter(
-    col("Price_in_Lakhs").isNotNull() & 
-    col("Size_in_SqFt").isNotNull() & 
-    col("BHK").isNotNull()
-)
+# Rows missing any of these are dropped
+CRITICAL_COLS = ['Price_in_Lakhs', 'Size_in_SqFt', 'BHK']
 
-# Remove outliers using IQR method for price
-price_stats = df_clean.select(
-    mean("Price_in_Lakhs").alias("mean_price"),
-    stddev("Price_in_Lakhs").alias("std_price")
-).collect()[0]
+FEATURE_COLS = [
+    'BHK', 'Size_in_SqFt', 'Price_per_SqFt', 'Year_Built', 'Floor_No', 'Total_Floors',
+    'Age_of_Property', 'Nearby_Schools', 'Nearby_Hospitals',
+] + [f'{c}_indexed' for c in CATEGORICAL_COLS]
 
-# Keep prices within 3 standard deviations
-price_threshold = price_stats["mean_price"] + 3 * price_stats["std_price"]
-df_clean = df_clean.filter(col("Price_in_Lakhs") <= price_threshold)
+LABEL_COL = 'Price_in_Lakhs'
 
-# Convert categorical variables to numerical using StringIndexer
-categorical_cols = ['State', 'City', 'Property_Type', 'Furnished_Status', 'Public_Transport_Accessibility', 
-                   'Parking_Space', 'Security', 'Facing', 'Owner_Type', 'Availability_Status']
+TRAIN_FRACTION = 0.8
+SEED = 42
 
-indexers = [StringIndexer(inputCol=col_name, outputCol=f"{col_name}_indexed", handleInvalid="keep") 
-           for col_name in categorical_cols]
+MODEL_PATH = 'best_house_price_model'
 
-# Create pipeline for indexing
-indexer_pipeline = Pipeline(stages=indexers)
-df_indexed = indexer_pipeline.fit(df_clean).transform(df_clean)
 
-print(f"Cleaned dataset shape: {df_indexed.count()} rows")
+def create_spark_session(app_name='HousePricePrediction', master=None):
+    builder = SparkSession.builder \
+        .appName(app_name) \
+        .config("spark.sql.adaptive.enabled", "true") \
+        .config("spark.sql.adaptive.coalescePartitions.enabled", "true")
+    if master:
+        builder = builder.master(master)
+    return builder.getOrCreate()
 
-# Feature Selection and Engineering
-print("\n4. Feature Selection and Engineering...")
 
-# Select features for the model
-feature_cols = [
-    'BHK', 'Size_in_SqFt', 'Price_per_SqFt', 'Year_Built', 'Floor_No', 'Total_Floors', 
-    'Age_of_Property', 'Nearby_Schools', 'Nearby_Hospitals',
-    'State_indexed', 'City_indexed', 'Property_Type_indexed', 'Furnished_Status_indexed',
-    'Public_Transport_Accessibility_indexed', 'Parking_Space_indexed', 'Security_indexed',
-    'Facing_indexed', 'Owner_Type_indexed', 'Availability_Status_indexed'
-]
-
-# Create feature vector
-assembler = VectorAssembler(inputCols=feature_cols, outputCol="features")
-df_features = assembler.transform(df_indexed)
-
-# Select final columns for modeling
-final_df = df_features.select("features", col("Price_in_Lakhs").alias("label"))
-
-print("Feature vector created successfully!")
-print(f"Final dataset for modeling: {final_df.count()} rows")
-
-# Split the dataset
-print("\n5. Splitting Dataset...")
-train_df, test_df = final_df.randomSplit([0.8, 0.2], seed=42)
-
-print(f"Training set: {train_df.count()} rows")
-print(f"Testing set: {test_df.count()} rows")
-
-# Model Training and Evaluation
-print("\n6. Training Regression Models...")
-
-# Initialize models
-lr = LinearRegression(featuresCol="features", labelCol="label")
-dt = DecisionTreeRegressor(featuresCol="features", labelCol="label")
-rf = RandomForestRegressor(featuresCol="features", labelCol="label", numTrees=100)
-
-# Train models
-print("\nTraining Linear Regression...")
-lr_model = lr.fit(train_df)
-
-print("Training Decision Tree Regression...")
-dt_model = dt.fit(train_df)
-
-print("Training Random Forest Regression...")
-rf_model = rf.fit(train_df)
-
-# Make predictions
-print("\n7. Making Predictions...")
-lr_predictions = lr_model.transform(test_df)
-dt_predictions = dt_model.transform(test_df)
-rf_predictions = rf_model.transform(test_df)
-
-# Evaluate models
-print("\n8. Model Evaluation...")
-
-evaluator_rmse = RegressionEvaluator(labelCol="label", predictionCol="prediction", metricName="rmse")
-evaluator_mae = RegressionEvaluator(labelCol="label", predictionCol="prediction", metricName="mae")
-evaluator_r2 = RegressionEvaluator(labelCol="label", predictionCol="prediction", metricName="r2")
-
-# Linear Regression Metrics
-lr_rmse = evaluator_rmse.evaluate(lr_predictions)
-lr_mae = evaluator_mae.evaluate(lr_predictions)
-lr_r2 = evaluator_r2.evaluate(lr_predictions)
-
-# Decision Tree Metrics
-dt_rmse = evaluator_rmse.evaluate(dt_predictions)
-dt_mae = evaluator_mae.evaluate(dt_predictions)
-dt_r2 = evaluator_r2.evaluate(dt_predictions)
-
-# Random Forest Metrics
-rf_rmse = evaluator_rmse.evaluate(rf_predictions)
-rf_mae = evaluator_mae.evaluate(rf_predictions)
-rf_r2 = evaluator_r2.evaluate(rf_predictions)
-
-# Display Results
-print("\n" + "="*60)
-print("MODEL EVALUATION RESULTS")
-print("="*60)
-
-print(f"\nLinear Regression:")
-print(f"  RMSE: {lr_rmse:.4f}")
-print(f"  MAE:  {lr_mae:.4f}")
-print(f"  R²:   {lr_r2:.4f}")
-
-print(f"\nDecision Tree Regression:")
-print(f"  RMSE: {dt_rmse:.4f}")
-print(f"  MAE:  {dt_mae:.4f}")
-print(f"  R²:   {dt_r2:.4f}")
-
-print(f"\nRandom Forest Regression:")
-print(f"  RMSE: {rf_rmse:.4f}")
-print(f"  MAE:  {rf_mae:.4f}")
-print(f"  R²:   {rf_r2:.4f}")
-
-# Determine best model
-models_performance = {
-    'Linear Regression': {'RMSE': lr_rmse, 'MAE': lr_mae, 'R2': lr_r2},
-    'Decision Tree': {'RMSE': dt_rmse, 'MAE': dt_mae, 'R2': dt_r2},
-    'Random Forest': {'RMSE': rf_rmse, 'MAE': rf_mae, 'R2': rf_r2}
-}
-
-best_model_name = min(models_performance.keys(), key=lambda x: models_performance[x]['RMSE'])
-best_model = rf_model if best_model_name == 'Random Forest' else (dt_model if best_model_name == 'Decision Tree' else lr_model)
-
-print(f"\n🏆 Best Model: {best_model_name}")
-print(f"   Best RMSE: {models_performance[best_model_name]['RMSE']:.4f}")
-
-# Display sample predictions
-print("\n9. Sample Predictions vs Actual Values:")
-print("="*60)
-
-if best_model_name == 'Random Forest':
-    sample_predictions = rf_predictions
-elif best_model_name == 'Decision Tree':
-    sample_predictions = dt_predictions
-else:
-    sample_predictions = lr_predictions
-
-# Show 10 sample predictions
-sample_results = sample_predictions.select("label", "prediction").limit(10)
-sample_df = sample_results.toPandas()
-
-print("Actual vs Predicted Prices (in Lakhs):")
-print("-" * 40)
-for i, row in sample_df.iterrows():
-    actual = row['label']
-    predicted = row['prediction']
-    error = abs(actual - predicted)
-    print(f"Actual: {actual:8.2f} | Predicted: {predicted:8.2f} | Error: {error:6.2f}")
-
-# Feature Importance (for Random Forest)
-if best_model_name == 'Random Forest':
-    print(f"\n10. Feature Importance (Random Forest):")
-    print("="*50)
-    
-    feature_importance = rf_model.featureImportances.toArray()
-    feature_names = feature_cols
-    
-    # Create feature importance pairs and sort
-    importance_pairs = list(zip(feature_names, feature_importance))
-    importance_pairs.sort(key=lambda x: x[1], reverse=True)
-    
-    print("Top 10 Most Important Features:")
-    print("-" * 40)
-    for i, (feature, importance) in enumerate(importance_pairs[:10]):
-        print(f"{i+1:2d}. {feature:25s}: {importance:.4f}")
-
-# Save the best model
-print(f"\n11. Saving the Best Model ({best_model_name})...")
-model_path = "best_house_price_model"
-best_model.write().overwrite().save(model_path)
-print(f"Model saved to: {model_path}")
-
-# Create visualization data
-print("\n12. Creating Performance Visualization...")
-
-# Convert sample predictions to pandas for plotting
-viz_data = sample_predictions.select("label", "prediction").limit(100).toPandas()
-
-# Create performance comparison chart
-plt.figure(figsize=(15, 5))
-
-# Subplot 1: Model Comparison
-plt.subplot(1, 3, 1)
-models = ['Linear Reg', 'Decision Tree', 'Random Forest']
-rmse_values = [lr_rmse, dt_rmse, rf_rmse]
-colors = ['skyblue', 'lightgreen', 'lightcoral']
-
-bars = plt.bar(models, rmse_values, color=colors)
-plt.title('Model Comparison (RMSE)', fontsize=12, fontweight='bold')
-plt.ylabel('RMSE')
-plt.xticks(rotation=45)
-
-# Highlight best model
-best_idx = rmse_values.index(min(rmse_values))
-bars[best_idx].set_color('gold')
-bars[best_idx].set_edgecolor('black')
-bars[best_idx].set_linewidth(2)
-
-# Add value labels on bars
-for i, v in enumerate(rmse_values):
-    plt.text(i, v + max(rmse_values)*0.01, f'{v:.2f}', ha='center', va='bottom', fontweight='bold')
-
-# Subplot 2: Actual vs Predicted
-plt.subplot(1, 3, 2)
-plt.scatter(viz_data['label'], viz_data['prediction'], alpha=0.6, color='blue')
-plt.plot([viz_data['label'].min(), viz_data['label'].max()], 
-         [viz_data['label'].min(), viz_data['label'].max()], 'r--', lw=2)
-plt.xlabel('Actual Price (Lakhs)')
-plt.ylabel('Predicted Price (Lakhs)')
-plt.title('Actual vs Predicted Prices', fontsize=12, fontweight='bold')
-
-# Subplot 3: R² Comparison
-plt.subplot(1, 3, 3)
-r2_values = [lr_r2, dt_r2, rf_r2]
-bars2 = plt.bar(models, r2_values, color=colors)
-plt.title('Model Comparison (R²)', fontsize=12, fontweight='bold')
-plt.ylabel('R² Score')
-plt.xticks(rotation=45)
-
-# Highlight best R² model
-best_r2_idx = r2_values.index(max(r2_values))
-bars2[best_r2_idx].set_color('gold')
-bars2[best_r2_idx].set_edgecolor('black')
-bars2[best_r2_idx].set_linewidth(2)
-
-# Add value labels on bars
-for i, v in enumerate(r2_values):
-    plt.text(i, v + max(r2_values)*0.01, f'{v:.3f}', ha='center', va='bottom', fontweight='bold')
-
-plt.tight_layout()
-plt.savefig('model_performance_comparison.png', dpi=300, bbox_inches='tight')
-plt.show()
-
-# Summary Report
-print("\n" + "="*80)
-print("HOUSE PRICE PREDICTION - FINAL SUMMARY REPORT")
-print("="*80)
-
-print(f"\n📊 Dataset Information:")
-print(f"   • Total records processed: {df_indexed.count():,}")
-print(f"   • Features used: {len(feature_cols)}")
-print(f"   • Training samples: {train_df.count():,}")
-print(f"   • Testing samples: {test_df.count():,}")
-
-print(f"\n🏆 Best Performing Model: {best_model_name}")
-print(f"   • RMSE: {models_performance[best_model_name]['RMSE']:.4f} Lakhs")
-print(f"   • MAE:  {models_performance[best_model_name]['MAE']:.4f} Lakhs")
-print(f"   • R²:   {models_performance[best_model_name]['R2']:.4f}")
-
-print(f"\n💾 Model Artifacts:")
-print(f"   • Best model saved to: {model_path}")
-print(f"   • Performance chart saved: model_performance_comparison.png")
-
-print(f"\n🎯 Model Interpretation:")
-if models_performance[best_model_name]['R2'] > 0.8:
-    print("   • Excellent model performance (R² > 0.8)")
-elif models_performance[best_model_name]['R2'] > 0.6:
-    print("   • Good model performance (R² > 0.6)")
-elif models_performance[best_model_name]['R2'] > 0.4:
-    print("   • Moderate model performance (R² > 0.4)")
-else:
-    print("   • Model needs improvement (R² < 0.4)")
-
-print(f"\n✅ Pipeline completed successfully!")
-print("="*80)
-
-# Stop Spark Session
-spark.stop()
\ No newline at end of file
+def load_dataset(spark):
+    # Prefer the typed Parquet copy built by data_store.py; it needs no schema inference
+    if data_store.parquet_is_fresh():
+        return spark.read.parquet(config.PARQUET_PATH)
+    return spark.read.csv(config.DATA_PATH, header=True, inferSchema=True)
+
+
+def profile(df):
+    """Null counts, distinct counts, moments and quantiles of every column in one scan
+
+    Returns a streaming_stats.DatasetStats; ``stats[LABEL_COL]`` gives the
+    bounds the outlier filter uses.
+    """
+    return profile_spark(df)
+
+
+def print_profile(stats):
+    summary = stats.to_dict()
+    print("\nNull value counts:")
+    for c, s in summary.items():
+        print(f"  {c:32s} {s['nulls']:>10,}  ({s['distinct']:,} distinct)")
+
+    print("\nBasic Statistics:")
+    print(f"  {'column':18s} {'count':>10s} {'mean':>12s} {'stddev':>12s} {'min':>10s} {'median':>10s} {'max':>10s}")
+    for c in NUMERICAL_COLS:
+        s = summary.get(c)
+        if s and 'mean' in s:
+            print(f"  {c:18s} {s['count']:>10,} {s['mean']:>12.2f} {s['std']:>12.2f} "
+                  f"{s['min']:>10.2f} {s['p50']:>10.2f} {s['max']:>10.2f}")
+
+
+def price_bounds(stats, k=None):
+    """IQR bounds on the price (config.OUTLIER_IQR_K), or None to keep every row"""
+    k = config.OUTLIER_IQR_K if k is None else k
+    return stats[LABEL_COL].iqr_bounds(k) if k > 0 else None
+
+
+def drop_incomplete(df):
+    """Drop rows missing a critical column"""
+    condition = F.lit(True)
+    for c in CRITICAL_COLS:
+        condition = condition & F.col(c).isNotNull()
+    return df.filter(condition)
+
+
+def drop_outliers(df, bounds=None):
+    """Drop rows outside ``bounds``; None keeps every row"""
+    return spark_filter(df, [bounds]) if bounds is not None else df
+
+
+def fit_indexer(df):
+    """One StringIndexer over every categorical column, fitted in a single pass"""
+    indexer = StringIndexer(inputCols=CATEGORICAL_COLS, outputCols=[f'{c}_indexed' for c in CATEGORICAL_COLS],
+                            handleInvalid="keep")
+    return indexer.fit(df)
+
+
+def assembler():
+    return VectorAssembler(inputCols=FEATURE_COLS, outputCol="features")
+
+
+def modelling_frame(df, indexer_model, storage_level=StorageLevel.MEMORY_AND_DISK):
+    """Persisted ``features``/``label``/``is_train`` frame and its split sizes
+
+    The split column is stored with the rows, so the train and test sets are
+    cheap filters over the cache. The counts come from the job that fills it.
+    """
+    features = assembler().transform(indexer_model.transform(df))
+    model_df = features.select(
+        "features",
+        F.col(LABEL_COL).alias("label"),
+        (F.rand(SEED) < TRAIN_FRACTION).alias("is_train"),
+    ).persist(storage_level)
+    counts = {row['is_train']: row['count'] for row in model_df.groupBy("is_train").count().collect()}
+    return model_df, counts.get(True, 0), counts.get(False, 0)
+
+
+def split(model_df):
+    train_df = model_df.filter(F.col("is_train")).select("features", "label")
+    test_df = model_df.filter(~F.col("is_train")).select("features", "label")
+    return train_df, test_df
+
+
+def scoring_pipeline(indexer_model, model):
+    """Indexer, assembler and regressor as one PipelineModel that scores raw listings"""
+    return PipelineModel(stages=[indexer_model, assembler(), model])
+
+
+def build_models():
+    return {
+        'Linear Regression': LinearRegression(featuresCol="features", labelCol="label"),
+        'Decision Tree': DecisionTreeRegressor(featuresCol="features", labelCol="label"),
+        'Random Forest': RandomForestRegressor(featuresCol="features", labelCol="label", numTrees=100),
+    }
+
+
+def evaluate(predictions):
+    """RMSE, MAE and R² from one aggregation over ``label``/``prediction``"""
+    error = F.col("prediction") - F.col("label")
+    row = predictions.agg(
+        F.count(F.lit(1)).alias('n'),
+        F.sum(error * error).alias('sse'),
+        F.sum(F.abs(error)).alias('sae'),
+        F.var_pop("label").alias('label_var'),
+    ).collect()[0]
+    n = row['n']
+    if not n:
+        return {'RMSE': float('nan'), 'MAE': float('nan'), 'R2': float('nan')}
+    sst = row['label_var'] * n
+    return {
+        'RMSE': (row['sse'] / n) ** 0.5,
+        'MAE': row['sae'] / n,
+        'R2': 1 - row['sse'] / sst if sst else float('nan'),
+    }
+
+
+def train_and_evaluate(train_df, test_df, models=None):
+    """``{name: (fitted model, metrics)}`` for each estimator"""
+    results = {}
+    for name, estimator in (models or build_models()).items():
+        print(f"\nTraining {name}...")
+        fitted = estimator.fit(train_df)
+        results[name] = (fitted, evaluate(fitted.transform(test_df)))
+    return results
+
+
+def plot_performance(results, viz_data, path='model_performance_comparison.png'):
+    names = list(results)
+    rmse_values = [results[name][1]['RMSE'] for name in names]
+    r2_values = [results[name][1]['R2'] for name in names]
+    labels = ['Linear Reg' if name == 'Linear Regression' else name for name in names]
+    colors = ['skyblue', 'lightgreen', 'lightcoral']
+
+    # Create performance comparison chart
+    plt.figure(figsize=(15, 5))
+
+    # Subplot 1: Model Comparison
+    plt.subplot(1, 3, 1)
+    bars = plt.bar(labels, rmse_values, color=colors)
+    plt.title('Model Comparison (RMSE)', fontsize=12, fontweight='bold')
+    plt.ylabel('RMSE')
+    plt.xticks(rotation=45)
+
+    # Highlight best model
+    best_idx = rmse_values.index(min(rmse_values))
+    bars[best_idx].set_color('gold')
+    bars[best_idx].set_edgecolor('black')
+    bars[best_idx].set_linewidth(2)
+
+    # Add value labels on bars
+    for i, v in enumerate(rmse_values):
+        plt.text(i, v + max(rmse_values)*0.01, f'{v:.2f}', ha='center', va='bottom', fontweight='bold')
+
+    # Subplot 2: Actual vs Predicted
+    plt.subplot(1, 3, 2)
+    plt.scatter(viz_data['label'], viz_data['prediction'], alpha=0.6, color='blue')
+    plt.plot([viz_data['label'].min(), viz_data['label'].max()],
+             [viz_data['label'].min(), viz_data['label'].max()], 'r--', lw=2)
+    plt.xlabel('Actual Price (Lakhs)')
+    plt.ylabel('Predicted Price (Lakhs)')
+    plt.title('Actual vs Predicted Prices', fontsize=12, fontweight='bold')
+
+    # Subplot 3: R² Comparison
+    plt.subplot(1, 3, 3)
+    bars2 = plt.bar(labels, r2_values, color=colors)
+    plt.title('Model Comparison (R²)', fontsize=12, fontweight='bold')
+    plt.ylabel('R² Score')
+    plt.xticks(rotation=45)
+
+    # Highlight best R² model
+    best_r2_idx = r2_values.index(max(r2_values))
+    bars2[best_r2_idx].set_color('gold')
+    bars2[best_r2_idx].set_edgecolor('black')
+    bars2[best_r2_idx].set_linewidth(2)
+
+    # Add value labels on bars
+    for i, v in enumerate(r2_values):
+        plt.text(i, v + max(r2_values)*0.01, f'{v:.3f}', ha='center', va='bottom', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.show()
+
+
+def main():
+    # Initialize Spark Session
+    print("Initializing Spark Session...")
+    spark = create_spark_session()
+    print(f"Spark Version: {spark.version}")
+
+    # Load the dataset
+    print("\n1. Loading Dataset...")
+    df = load_dataset(spark)
+    print("\nDataset Schema:")
+    df.printSchema()
+
+    # Display first few rows
+    print("\nFirst 5 rows:")
+    df.show(5, truncate=False)
+
+    # Data Exploration - counts, nulls, statistics and quantiles in one scan
+    # of the rows that have every critical column, which are the ones trained on
+    print("\n2. Data Exploration and Cleaning...")
+    df_complete = drop_incomplete(df)
+    stats = profile(df_complete)
+    print(f"Dataset shape: {stats[LABEL_COL].rows} rows with {', '.join(CRITICAL_COLS)} present, "
+          f"{len(df.columns)} columns")
+    print_profile(stats)
+
+    # Data Cleaning - Handle outliers
+    print("\n3. Data Preprocessing...")
+    bounds = price_bounds(stats)
+    if bounds is not None:
+        print(f"Keeping prices in [{bounds.low:.2f}, {bounds.high:.2f}] Lakhs "
+              f"(quartiles ± {config.OUTLIER_IQR_K} IQR)")
+    df_clean = drop_outliers(df_complete, bounds)
+
+    # Convert categorical variables to numerical using StringIndexer
+    indexer_model = fit_indexer(df_clean)
+
+    # Feature Selection and Engineering
+    print("\n4. Feature Selection and Engineering...")
+    model_df, n_train, n_test = modelling_frame(df_clean, indexer_model)
+    try:
+        print("Feature vector created successfully!")
+        print(f"Final dataset for modeling: {n_train + n_test} rows")
+
+        # Split the dataset
+        print("\n5. Splitting Dataset...")
+        train_df, test_df = split(model_df)
+        print(f"Training set: {n_train} rows")
+        print(f"Testing set: {n_test} rows")
+
+        # Model Training and Evaluation
+        print("\n6. Training and Evaluating Regression Models...")
+        results = train_and_evaluate(train_df, test_df)
+
+        # Display Results
+        print("\n" + "="*60)
+        print("MODEL EVALUATION RESULTS")
+        print("="*60)
+        for name, (_, metrics) in results.items():
+            print(f"\n{name}:")
+            print(f"  RMSE: {metrics['RMSE']:.4f}")
+            print(f"  MAE:  {metrics['MAE']:.4f}")
+            print(f"  R²:   {metrics['R2']:.4f}")
+
+        # Determine best model
+        best_model_name = min(results, key=lambda name: results[name][1]['RMSE'])
+        best_model, best_metrics = results[best_model_name]
+        print(f"\n🏆 Best Model: {best_model_name}")
+        print(f"   Best RMSE: {best_metrics['RMSE']:.4f}")
+
+        # One small job gives both the printed samples and the chart points
+        viz_data = best_model.transform(test_df).select("label", "prediction").limit(100).toPandas()
+
+        # Display sample predictions
+        print("\n7. Sample Predictions vs Actual Values:")
+        print("="*60)
+        print("Actual vs Predicted Prices (in Lakhs):")
+        print("-" * 40)
+        for _, row in viz_data.head(10).iterrows():
+            actual = row['label']
+            predicted = row['prediction']
+            error = abs(actual - predicted)
+            print(f"Actual: {actual:8.2f} | Predicted: {predicted:8.2f} | Error: {error:6.2f}")
+
+        # Feature Importance (for Random Forest)
+        if best_model_name == 'Random Forest':
+            print(f"\n8. Feature Importance (Random Forest):")
+            print("="*50)
+
+            # Create feature importance pairs and sort
+            importance_pairs = list(zip(FEATURE_COLS, best_model.featureImportances.toArray()))
+            importance_pairs.sort(key=lambda x: x[1], reverse=True)
+
+            print("Top 10 Most Important Features:")
+            print("-" * 40)
+            for i, (feature, importance) in enumerate(importance_pairs[:10]):
+                print(f"{i+1:2d}. {feature:25s}: {importance:.4f}")
+
+        # Save the best model with its fitted indexer so batch_score.py can score raw listings
+        print(f"\n9. Saving the Best Model ({best_model_name})...")
+        scoring_pipeline(indexer_model, best_model).write().overwrite().save(MODEL_PATH)
+        print(f"Pipeline model saved to: {MODEL_PATH}")
+
+        # Create visualization data
+        print("\n10. Creating Performance Visualization...")
+        plot_performance(results, viz_data)
+    finally:
+        model_df.unpersist()
+
+    # Summary Report
+    print("\n" + "="*80)
+    print("HOUSE PRICE PREDICTION - FINAL SUMMARY REPORT")
+    print("="*80)
+
+    print(f"\n📊 Dataset Information:")
+    print(f"   • Total records processed: {n_train + n_test:,}")
+    print(f"   • Features used: {len(FEATURE_COLS)}")
+    print(f"   • Training samples: {n_train:,}")
+    print(f"   • Testing samples: {n_test:,}")
+
+    print(f"\n🏆 Best Performing Model: {best_model_name}")
+    print(f"   • RMSE: {best_metrics['RMSE']:.4f} Lakhs")
+    print(f"   • MAE:  {best_metrics['MAE']:.4f} Lakhs")
+    print(f"   • R²:   {best_metrics['R2']:.4f}")
+
+    print(f"\n💾 Model Artifacts:")
+    print(f"   • Best model saved to: {MODEL_PATH}")
+    print(f"   • Performance chart saved: model_performance_comparison.png")
+
+    print(f"\n🎯 Model Interpretation:")
+    if best_metrics['R2'] > 0.8:
+        print("   • Excellent model performance (R² > 0.8)")
+    elif best_metrics['R2'] > 0.6:
+        print("   • Good model performance (R² > 0.6)")
+    elif best_metrics['R2'] > 0.4:
+        print("   • Moderate model performance (R² > 0.4)")
+    else:
+        print("   • Model needs improvement (R² < 0.4)")
+
+    print(f"\n✅ Pipeline completed successfully!")
+    print("="*80)
+
+    # Stop Spark Session
+    spark.stop()
+
+
+if __name__ == '__main__':
+    main()
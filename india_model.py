@@ -0,0 +1,79 @@
+from sklearn.preprocessing import LabelEncoder
+
+import config
+import data_store
+from encoding import compile_encoders
+from streaming_stats import filter_frame, profile_frame
+from training import fit_forest
+
+NUMERICAL_FEATURES = ['BHK', 'Size_in_SqFt', 'Price_per_SqFt', 'Year_Built',
+                      'Floor_No', 'Total_Floors', 'Age_of_Property',
+                      'Nearby_Schools', 'Nearby_Hospitals']
+
+CATEGORICAL_FEATURES = ['State', 'Property_Type', 'Furnished_Status',
+                        'Public_Transport_Accessibility', 'Parking_Space',
+                        'Security', 'Facing', 'Owner_Type', 'Availability_Status']
+
+
+# Columns the model is trained on
+TRAINING_COLUMNS = NUMERICAL_FEATURES + CATEGORICAL_FEATURES + ['Price_in_Lakhs']
+
+# Rows missing any of these are dropped
+REQUIRED_COLUMNS = ['Price_in_Lakhs', 'Size_in_SqFt', 'BHK']
+
+
+def load_india_data(path=None, columns=None):
+    """Read the national dataset and drop rows missing the core columns"""
+    df = data_store.read_dataset(columns, csv_path=path)
+    return df.dropna(subset=REQUIRED_COLUMNS)
+
+
+def drop_price_outliers(df, k=None):
+    """Rows priced within ``k`` interquartile ranges of the quartiles (config.OUTLIER_IQR_K)"""
+    k = config.OUTLIER_IQR_K if k is None else k
+    if k <= 0:
+        return df
+    bounds = profile_frame(df, ['Price_in_Lakhs'])['Price_in_Lakhs'].iqr_bounds(k)
+    return filter_frame(df, [bounds])
+
+
+def prepare_training_data(path=None):
+    """Encoded feature matrix, target and the fitted encoders"""
+    return encode_training_data(drop_price_outliers(load_india_data(path, columns=TRAINING_COLUMNS)).copy())
+
+
+def encode_training_data(df_clean):
+    """Fit the encoders on a cleaned frame and add its encoded columns in place"""
+    # Encode categorical variables
+    le_dict = {}
+    for col in CATEGORICAL_FEATURES:
+        if col in df_clean.columns:
+            le = LabelEncoder()
+            df_clean[col + '_encoded'] = le.fit_transform(df_clean[col].astype(str))
+            le_dict[col] = le
+
+    # Prepare features
+    feature_cols = [col for col in NUMERICAL_FEATURES if col in df_clean.columns]
+    feature_cols += [col + '_encoded' for col in CATEGORICAL_FEATURES if col in df_clean.columns]
+
+    X = df_clean[feature_cols].fillna(0)
+    y = df_clean['Price_in_Lakhs']
+    return X, y, le_dict, feature_cols, df_clean
+
+
+def train_india_model(path=None):
+    X, y, le_dict, feature_cols, df_clean = prepare_training_data(path)
+
+    # Train model
+    model = fit_forest(X, y, n_estimators=100, random_state=42)
+
+    return model, le_dict, feature_cols, df_clean
+
+
+def new_training_rows(path, le_dict, feature_cols):
+    """Features and target for extra rows, encoded with an existing model's encoders"""
+    df = drop_price_outliers(load_india_data(path, columns=TRAINING_COLUMNS)).copy()
+    encoders = compile_encoders(le_dict)
+    for col, encoder in encoders.items():
+        df[col + '_encoded'] = encoder.encode_many(df[col].astype(str))
+    return df[feature_cols].fillna(0), df['Price_in_Lakhs']
@@ -0,0 +1,232 @@
+"""Latency histograms, the Prometheus /metrics page and an on-demand profiler.
+
+Each instrumented request path (/predict, /predict_bengaluru, analytics) is
+split into stages with a ``StageTimer``. At the end of the request, the time
+spent in each stage goes into the ``house_price_stage_seconds`` histogram,
+labelled by path and stage. Every request's total time goes into
+``house_price_request_seconds``, labelled by endpoint.
+
+Histograms use fixed buckets, so an observation is one bisect plus a few
+additions under a lock.
+
+``render`` writes them in the Prometheus text exposition format. With
+PROFILING=1, a request carrying an ``X-Profile`` header runs under
+``SamplingProfiler``. It samples the handling thread's stack every
+PROFILE_INTERVAL_MS and keeps the result as collapsed stacks for
+flamegraph tools.
+"""
+import bisect
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Upper bounds in seconds, from 10us to 10s
+LATENCY_BUCKETS = [0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Finished profiles kept for /api/profiles
+KEEP_PROFILES = 20
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with one series per label set"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = list(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labelvalues):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def summary(self):
+        """Count, mean and bucket-estimated p50/p95/p99 in ms, per label set"""
+        result = {}
+        for labels, (counts, total) in self.snapshot().items():
+            n = sum(counts)
+            quantiles = {}
+            for p in (50, 95, 99):
+                rank, seen = n * p / 100, 0
+                for bound, count in zip(self.buckets + [float('inf')], counts):
+                    seen += count
+                    if seen >= rank:
+                        quantiles[f'p{p}'] = bound * 1000
+                        break
+            result['/'.join(labels)] = {'count': n, 'mean_ms': total / n * 1000 if n else 0.0, **quantiles}
+        return result
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float('inf')], counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", le)])} '
+                             f'{cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {total!r}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+STAGES = Histogram('house_price_stage_seconds', 'Time spent in each stage of an instrumented request path',
+                   ['path', 'stage'])
+REQUESTS = Histogram('house_price_request_seconds', 'Time to produce a response, by endpoint',
+                     ['endpoint', 'method', 'status'])
+
+
+class StageTimer:
+    """Splits one request into consecutive stages
+
+    ``lap(stage)`` charges the time since the previous lap to ``stage``.
+    Repeated stages add up. ``finish()`` records each stage once in STAGES.
+    """
+
+    def __init__(self, path, histogram=STAGES):
+        self.path = path
+        self.histogram = histogram
+        self.stages = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self):
+        for stage, seconds in self.stages.items():
+            self.histogram.observe(seconds, self.path, stage)
+
+
+class timed:
+    """Context manager recording one stage of ``path`` in STAGES"""
+
+    def __init__(self, path, stage, histogram=STAGES):
+        self.labels = (path, stage)
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._start, *self.labels)
+
+
+def gauge(name, documentation, samples, kind='gauge'):
+    """Exposition lines for a gauge or counter; ``samples`` is ``[(labels dict, value)]``"""
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels, labels.values())} {_format_value(value)}')
+    return lines
+
+
+def render(extra=()):
+    """The /metrics page: both histograms plus ``extra`` exposition lines"""
+    lines = STAGES.render() + REQUESTS.render() + list(extra)
+    return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval
+
+    ``stop()`` returns the samples as collapsed stacks: one
+    ``outer;inner;leaf count`` line per distinct stack, the input format of
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id=None, interval_ms=1.0):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval_ms / 1000.0
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling; safe to call more than once"""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.seconds = time.perf_counter() - self.started
+        return self.collapsed()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """The most recent finished profiles, by id"""
+
+    def __init__(self, keep=KEEP_PROFILES):
+        self.keep = keep
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def add(self, endpoint, profiler):
+        with self._lock:
+            self._next_id += 1
+            profile_id = str(self._next_id)
+            self._profiles[profile_id] = {
+                'id': profile_id,
+                'endpoint': endpoint,
+                'at': time.time(),
+                'seconds': profiler.seconds,
+                'samples': sum(profiler.samples.values()),
+                'collapsed': profiler.collapsed(),
+            }
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+            return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != 'collapsed'} for p in reversed(self._profiles.values())]
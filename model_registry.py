@@ -0,0 +1,196 @@
+"""Hot reload of the served models from the artifact registry.
+
+The app keeps what it serves for each model as one immutable snapshot. A
+``ServedModel`` holds the model, encoders, feature columns and bundle meta.
+The India dataset and the indexes built on it form a ``ServedData``. A view
+reads the snapshot once, with ``registry.get(name)``, and uses it for the
+whole request. Swapping in a new version rebinds a single dict entry, which
+is atomic: requests already running finish on the old snapshot, and new ones
+get the new snapshot.
+
+A daemon thread polls each source's version: the bundle's LATEST pointer, or
+the shared CURRENT pointer in shared mode. When a version changes, the thread
+loads it in the background and validates it. It then runs canary predictions
+to warm it (page faults, lazily built tables) before swapping it in. A load or
+validation failure keeps the current version serving and is reported by
+``stats``. ``on_swap(name, previous)`` is called after each swap with the
+snapshot that was replaced, so resources it holds can be released.
+
+Nothing is loaded up front. The first ``get(name)`` loads that entry, so a
+route only waits for the models it uses. ``warm_up`` does the same for every
+entry on a background thread, so the first requests usually find them ready.
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+ServedModel = namedtuple('ServedModel', ['model', 'encoders', 'feature_columns', 'meta'])
+ServedData = namedtuple('ServedData', ['frame', 'version', 'index', 'encoder'])
+
+# Canary predictions run on a new model before it is swapped in
+CANARY_ROUNDS = 20
+
+
+class InvalidBundle(Exception):
+    """A newly published version failed validation"""
+
+
+class Source:
+    """How to find, load and check one entry of the registry
+
+    ``version()`` returns the published version. ``load(version)`` builds the
+    snapshot, and ``validate(snapshot)`` raises InvalidBundle or returns
+    canary rows to warm it with. ``initial()`` does the first load and returns
+    ``(snapshot, version)``; without it the published version is loaded.
+    """
+
+    def __init__(self, version, load, validate=None, initial=None):
+        self.version = version
+        self.load = load
+        self.validate = validate
+        self.initial = initial
+
+
+def validate_model(served, canary_rows):
+    """Check a ServedModel scores ``canary_rows`` to finite values; returns the rows"""
+    X = np.asarray(canary_rows, dtype=np.float64)
+    n_features = getattr(served.model, 'n_features_in_', X.shape[1])
+    if len(served.feature_columns) != n_features or X.shape[1] != n_features:
+        raise InvalidBundle(f'{served.meta.get("name")} {served.meta.get("version")}: expects {n_features} '
+                            f'features, bundle lists {len(served.feature_columns)}')
+    predictions = np.asarray(served.model.predict(X))
+    if predictions.shape != (len(X),) or not np.isfinite(predictions).all():
+        raise InvalidBundle(f'{served.meta.get("name")} {served.meta.get("version")}: canary predictions failed')
+    return X
+
+
+def warm(served, rows, rounds=CANARY_ROUNDS):
+    """Single-row canary predictions; returns the slowest in ms"""
+    slowest = 0.0
+    for i in range(rounds):
+        start = time.perf_counter()
+        served.model.predict(rows[i % len(rows)].reshape(1, -1))
+        slowest = max(slowest, time.perf_counter() - start)
+    return slowest * 1000
+
+
+class ModelRegistry:
+    """Current snapshot per source, replaced atomically by a watcher thread"""
+
+    def __init__(self, sources, interval=5.0, on_swap=None):
+        self.sources = sources
+        self.interval = interval
+        self.on_swap = on_swap
+        self._current = {}
+        self._rejected = {}
+        self._events = {name: {'reloads': 0, 'failures': 0, 'last_error': None, 'last_reload': None,
+                               'load_seconds': None} for name in sources}
+        self._first_load_locks = {name: threading.Lock() for name in sources}
+        self._reload_lock = threading.Lock()
+        self._thread = None
+        self._warm_up_thread = None
+
+    def load_initial(self, name, snapshot, version):
+        self._current[name] = (version, snapshot)
+
+    def _load_first(self, name):
+        with self._first_load_locks[name]:
+            entry = self._current.get(name)
+            if entry is None:
+                start = time.perf_counter()
+                source = self.sources[name]
+                if source.initial is not None:
+                    snapshot, version = source.initial()
+                else:
+                    version = source.version()
+                    snapshot = source.load(version)
+                entry = self._current[name] = (version, snapshot)
+                self._events[name]['load_seconds'] = time.perf_counter() - start
+            return entry
+
+    def get(self, name):
+        """Current snapshot of ``name``, loaded on the first call"""
+        entry = self._current.get(name)
+        if entry is None:
+            entry = self._load_first(name)
+        return entry[1]
+
+    def loaded(self, name):
+        return name in self._current
+
+    def version(self, name):
+        entry = self._current.get(name)
+        return entry and entry[0]
+
+    def reload(self, name):
+        """Load, validate, warm and swap in ``name`` if a new version is out
+
+        Returns True when a new version was swapped in.
+        """
+        if not self.loaded(name):
+            # The first get() loads whatever is latest by then
+            return False
+        source = self.sources[name]
+        events = self._events[name]
+        with self._reload_lock:
+            version = source.version()
+            if version is None or version in (self.version(name), self._rejected.get(name)):
+                return False
+            start = time.perf_counter()
+            try:
+                snapshot = source.load(version)
+                if source.validate is not None:
+                    rows = source.validate(snapshot)
+                    events['canary_max_ms'] = warm(snapshot, rows)
+            except Exception as exc:
+                events['failures'] += 1
+                events['last_error'] = f'{version}: {exc}'
+                # Don't retry the same broken version on every poll
+                self._rejected[name] = version
+                return False
+            previous = self._current[name][1]
+            self._current[name] = (version, snapshot)
+            if self.on_swap is not None:
+                self.on_swap(name, previous)
+            events['reloads'] += 1
+            events['last_reload'] = {'version': version, 'at': time.time(),
+                                     'seconds': time.perf_counter() - start}
+            return True
+
+    def reload_all(self):
+        return [name for name in self.sources if self.reload(name)]
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload_all()
+            except Exception:  # pragma: no cover - keep watching whatever happens
+                pass
+
+    def _warm_up(self, names):
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as exc:
+                # Left unloaded; the first request for it tries again
+                self._events[name]['last_error'] = f'warm-up: {exc}'
+
+    def warm_up(self, names=None):
+        """Load every entry (or ``names``) on a background thread"""
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(target=self._warm_up, args=(list(names or self.sources),),
+                                                    name='model-registry-warm-up', daemon=True)
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
+
+    def stats(self):
+        return {name: {'version': self.version(name), 'loaded': self.loaded(name), **self._events[name]}
+                for name in self.sources}
@@ -0,0 +1,199 @@
+"""Versioned model bundles on disk.
+
+Each trained model is written to ``<ARTIFACT_DIR>/<name>/<version>/`` as
+
+    bundle.joblib   model, encoders and feature column order
+    meta.json       version, checksum of the training data, library versions
+    surrogate.joblib, distill.json
+                    optional distilled model and its report (distill.py)
+
+and ``<ARTIFACT_DIR>/<name>/LATEST`` names the version the app should load.
+Bundles are dumped uncompressed so joblib can memory-map the numpy arrays
+they contain when they are loaded back.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+import joblib
+import sklearn
+
+import config
+
+# Bump when the bundle layout changes so old artifacts are retrained
+BUNDLE_FORMAT = 1
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_dir(name, root=None):
+    return os.path.join(root or config.ARTIFACT_DIR, name)
+
+
+def latest_version(name, root=None):
+    """Version named by the LATEST pointer, or None if nothing was saved yet"""
+    pointer = os.path.join(model_dir(name, root), 'LATEST')
+    try:
+        with open(pointer) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, text):
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'w') as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def save_bundle(name, model, encoders, feature_cols, data_path, root=None, extra=None):
+    """Write a new bundle version and point LATEST at it"""
+    base = model_dir(name, root)
+    os.makedirs(base, exist_ok=True)
+
+    version = time.strftime('%Y%m%d-%H%M%S')
+    final_dir = os.path.join(base, version)
+    suffix = 1
+    while os.path.exists(final_dir):
+        final_dir = os.path.join(base, f'{version}-{suffix}')
+        suffix += 1
+    version = os.path.basename(final_dir)
+
+    stat = os.stat(data_path)
+    meta = {
+        'name': name,
+        'version': version,
+        'format': BUNDLE_FORMAT,
+        'created': time.time(),
+        'data_path': os.path.abspath(data_path),
+        'data_size': stat.st_size,
+        'data_mtime': stat.st_mtime,
+        'data_checksum': file_checksum(data_path),
+        'sklearn_version': sklearn.__version__,
+        'feature_cols': list(feature_cols),
+    }
+    meta.update(extra or {})
+
+    # Build the version in a scratch directory so readers never see half a bundle
+    tmp_dir = f'{final_dir}.tmp{os.getpid()}'
+    os.makedirs(tmp_dir)
+    try:
+        joblib.dump({'model': model, 'encoders': encoders, 'feature_cols': list(feature_cols)},
+                    os.path.join(tmp_dir, 'bundle.joblib'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as fh:
+            json.dump(meta, fh, indent=2)
+        os.replace(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _write_atomic(os.path.join(base, 'LATEST'), version)
+    return version
+
+
+def read_meta(name, version=None, root=None):
+    version = version or latest_version(name, root)
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(model_dir(name, root), version, 'meta.json')) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def load_bundle(name, version=None, root=None, mmap=True):
+    """Load a bundle; numpy arrays are memory-mapped read-only when ``mmap`` is set"""
+    version = version or latest_version(name, root)
+    if version is None:
+        raise FileNotFoundError(f'No saved bundle for model {name!r}')
+    path = os.path.join(model_dir(name, root), version)
+    bundle = joblib.load(os.path.join(path, 'bundle.joblib'), mmap_mode='r' if mmap else None)
+    bundle['meta'] = read_meta(name, version, root)
+    return bundle
+
+
+def save_surrogate(name, version, surrogate, report, root=None):
+    """Attach a distilled surrogate and its report to an existing bundle version"""
+    path = os.path.join(model_dir(name, root), version)
+    if surrogate is not None:
+        tmp_path = os.path.join(path, f'surrogate.joblib.tmp{os.getpid()}')
+        joblib.dump(surrogate, tmp_path)
+        os.replace(tmp_path, os.path.join(path, 'surrogate.joblib'))
+    elif os.path.exists(os.path.join(path, 'surrogate.joblib')):
+        # An earlier run's surrogate no longer applies
+        os.remove(os.path.join(path, 'surrogate.joblib'))
+    _write_atomic(os.path.join(path, 'distill.json'), json.dumps(report, indent=2))
+
+
+def load_surrogate(name, version, root=None):
+    """The surrogate saved for a bundle version, or None"""
+    try:
+        return joblib.load(os.path.join(model_dir(name, root), version, 'surrogate.joblib'))
+    except FileNotFoundError:
+        return None
+
+
+def is_stale(meta, data_path):
+    """True when the bundle was built from different data or an incompatible setup"""
+    if meta is None:
+        return True
+    if meta.get('format') != BUNDLE_FORMAT or meta.get('sklearn_version') != sklearn.__version__:
+        return True
+    try:
+        stat = os.stat(data_path)
+    except FileNotFoundError:
+        # Nothing to retrain from; serve whatever we have
+        return False
+    if stat.st_size == meta.get('data_size') and stat.st_mtime == meta.get('data_mtime'):
+        return False
+    return file_checksum(data_path) != meta.get('data_checksum')
+
+
+@contextmanager
+def _training_lock(name, root=None):
+    """Serialise training across processes so N workers don't train N times"""
+    base = model_dir(name, root)
+    os.makedirs(base, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(base, '.lock'), 'w') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def load_or_train(name, train_fn, data_path, root=None):
+    """Load the latest bundle, retraining with ``train_fn`` only if it is missing or stale
+
+    ``train_fn(data_path)`` returns ``(model, encoders, feature_cols, data)``
+    like the training functions in india_model and bengaluru_model.
+    """
+    if not is_stale(read_meta(name, root=root), data_path):
+        return load_bundle(name, root=root)
+
+    with _training_lock(name, root):
+        # Another process may have finished training while we waited
+        if is_stale(read_meta(name, root=root), data_path):
+            model, encoders, feature_cols, _ = train_fn(data_path)
+            save_bundle(name, model, encoders, feature_cols, data_path, root=root)
+    return load_bundle(name, root=root)
@@ -0,0 +1,90 @@
+"""LRU/TTL cache in front of model inference.
+
+Entries are keyed on the model name and bundle version plus the encoded
+feature vector, so a prediction is reused only for the exact same model
+inputs. Loading a new bundle calls ``invalidate`` for that model, which drops
+its old entries right away instead of leaving them to age out.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(model_name, model_version, vector):
+    # float() folds ints, numpy scalars and -0.0 into one representation
+    return (model_name, model_version, tuple(float(v) + 0.0 for v in vector))
+
+
+class PredictionCache:
+    """Thread-safe bounded LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        """Cached value for ``key``, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, model_name, model_version, vector, compute):
+        """Return the cached prediction for ``vector`` or store ``compute()``"""
+        if not self.enabled:
+            return compute()
+        key = canonical_key(model_name, model_version, vector)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, model_name=None):
+        """Drop every entry, or only those for ``model_name``"""
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == model_name]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
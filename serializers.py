@@ -0,0 +1,142 @@
+"""Response serialisation.
+
+``FastJSONProvider`` is installed as the app's JSON provider, so every
+``jsonify`` call uses it. It uses orjson when that is installed, writes NaN
+and infinities as ``null`` instead of emitting invalid JSON, and accepts
+numpy scalars and arrays.
+
+``FrameEncoder`` serialises pages of the served dataset straight from its
+column arrays. JSON tokens for every category are built once, and a page is
+encoded one column at a time into record strings. No per-row dicts or
+intermediate DataFrame are created. It can also produce NDJSON and Arrow IPC.
+"""
+import json
+import math
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def _sanitize(obj):
+    """Replace non-finite floats with None so the result is valid JSON"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _sanitize(obj.tolist())
+    if isinstance(obj, np.generic):
+        return _sanitize(obj.item())
+    return obj
+
+
+def _default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the json module"""
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and set(kwargs) <= {'indent', 'separators'}:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option).decode()
+
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        try:
+            return json.dumps(obj, allow_nan=False, **kwargs)
+        except ValueError:
+            return json.dumps(_sanitize(obj), allow_nan=False, **kwargs)
+
+
+def _json_tokens(values):
+    """JSON text for each value of a 1-D array, with NaN as null"""
+    kind = values.dtype.kind
+    if kind == 'b':
+        return ['true' if v else 'false' for v in values.tolist()]
+    if kind in 'iu':
+        return list(map(str, values.tolist()))
+    if kind == 'f':
+        return [repr(v) if math.isfinite(v) else 'null' for v in values.tolist()]
+    return [json.dumps(_sanitize(v.item() if isinstance(v, np.generic) else v), default=_default)
+            for v in values.tolist()]
+
+
+class FrameEncoder:
+    """Encodes row subsets of a static DataFrame without building row dicts"""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = sorted(df.columns)
+        # Key prefix for each column: '{"A":' for the first, ',"B":' for the rest
+        self.prefixes = [('{' if i == 0 else ',') + json.dumps(col) + ':' for i, col in enumerate(self.columns)]
+        self._arrays = {}
+        for col in self.columns:
+            series = df[col]
+            if series.dtype.name == 'category':
+                # Token table indexed by category code; code -1 (missing) hits the trailing null
+                tokens = [json.dumps(str(c)) for c in series.cat.categories] + ['null']
+                self._arrays[col] = ('category', series.cat.codes.to_numpy(), np.array(tokens, dtype=object))
+            else:
+                self._arrays[col] = ('values', series.to_numpy(), None)
+
+    def _column_tokens(self, col, rows):
+        kind, values, tokens = self._arrays[col]
+        if kind == 'category':
+            return tokens[values[rows]]
+        return _json_tokens(values[rows])
+
+    def records(self, rows):
+        """One JSON object string per row"""
+        columns = [self._column_tokens(col, rows) for col in self.columns]
+        prefixes = self.prefixes
+        return [''.join([p + t for p, t in zip(prefixes, cells)]) + '}' for cells in zip(*columns)]
+
+    def to_json(self, rows):
+        """JSON array text for the given row positions"""
+        if len(rows) == 0:
+            return '[]'
+        return '[' + ','.join(self.records(rows)) + ']'
+
+    def to_ndjson(self, rows):
+        if len(rows) == 0:
+            return ''
+        return '\n'.join(self.records(rows)) + '\n'
+
+    def to_arrow(self, rows):
+        """Arrow IPC stream bytes for the given row positions"""
+        # Imported here so pyarrow only loads once Arrow output is asked for
+        try:
+            import pyarrow as pa
+        except ImportError:  # pragma: no cover - optional dependency
+            raise ImportError('pyarrow is required for Arrow output') from None
+        table = pa.Table.from_pandas(self.df.iloc[rows], preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
@@ -0,0 +1,166 @@
+"""Model node arrays and dataset columns shared between serving processes.
+
+With N worker processes, each one used to hold its own copy of both forests
+and of the India dataset. In shared mode a master process publishes them once
+as plain ``.npy`` files under ``SHARED_DIR``. That directory should be on
+tmpfs (``/dev/shm``) so the files live in shared memory. Workers map the
+files read-only with ``np.load(mmap_mode='r')``, and every worker reads the
+same physical pages:
+
+    <SHARED_DIR>/<model>/<version>/   FlatForest arrays + encoders/meta
+    <SHARED_DIR>/<model>/CURRENT      published version
+    <SHARED_DIR>/data/<checksum>/     one array per column (codes for categoricals)
+    <SHARED_DIR>/data/CURRENT
+
+Publishing writes a new version directory and then replaces ``CURRENT``
+atomically. The app's model registry polls ``CURRENT`` and attaches workers
+to the new version without a restart. Superseded versions are unlinked;
+workers still holding them keep their mappings until they let go.
+
+    python shared_store.py     # publish the latest bundles and the dataset
+"""
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import config
+import data_store
+import model_store
+from india_model import load_india_data
+from tree_engine import FlatForest
+
+# Versions kept per model besides the current one
+KEEP_VERSIONS = 1
+
+
+def shared_dir(name, root=None):
+    return os.path.join(root or config.SHARED_DIR, name)
+
+
+def current_version(name, root=None):
+    try:
+        with open(os.path.join(shared_dir(name, root), 'CURRENT')) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, text):
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'w') as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def _publish_dir(name, version, write, root=None):
+    """Fill ``<name>/<version>`` through ``write(tmp_dir)`` and make it current"""
+    base = shared_dir(name, root)
+    final_dir = os.path.join(base, version)
+    if not os.path.exists(final_dir):
+        os.makedirs(base, exist_ok=True)
+        tmp_dir = f'{final_dir}.tmp{os.getpid()}'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            write(tmp_dir)
+            os.replace(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    _write_atomic(os.path.join(base, 'CURRENT'), version)
+
+    # Drop old versions; attached workers keep their mappings alive
+    versions = sorted(v for v in os.listdir(base) if v != version and os.path.isdir(os.path.join(base, v))
+                      and '.tmp' not in v)
+    for old in versions[:max(0, len(versions) - KEEP_VERSIONS)]:
+        shutil.rmtree(os.path.join(base, old), ignore_errors=True)
+    return version
+
+
+def publish_model(name, version=None, root=None):
+    """Flatten a saved bundle's forest into shared node arrays"""
+    bundle = model_store.load_bundle(name, version, mmap=False)
+    forest = FlatForest.from_sklearn(bundle['model'])
+
+    def write(path):
+        for field in FlatForest.ARRAYS:
+            np.save(os.path.join(path, f'{field}.npy'), getattr(forest, field))
+        joblib.dump({
+            'encoders': bundle['encoders'],
+            'feature_cols': bundle['feature_cols'],
+            'meta': bundle['meta'],
+            'max_depth': forest.max_depth,
+            'n_features_in_': forest.n_features_in_,
+        }, os.path.join(path, 'state.joblib'))
+
+    return _publish_dir(name, bundle['meta']['version'], write, root)
+
+
+def attach_model(name, version=None, root=None):
+    """``{'model', 'encoders', 'feature_cols', 'meta'}`` with the forest memory-mapped"""
+    version = version or current_version(name, root)
+    if version is None:
+        raise FileNotFoundError(f'Model {name!r} has not been published to {shared_dir(name, root)}')
+    path = os.path.join(shared_dir(name, root), version)
+    state = joblib.load(os.path.join(path, 'state.joblib'))
+    arrays = {field: np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r') for field in FlatForest.ARRAYS}
+    forest = FlatForest(max_depth=state['max_depth'], n_features_in_=state['n_features_in_'], **arrays)
+    return {'model': forest, 'encoders': state['encoders'], 'feature_cols': state['feature_cols'],
+            'meta': state['meta'], 'shared_version': version}
+
+
+def publish_frame(df, version, name='data', root=None):
+    """Store each column as one array; categoricals as codes plus their labels"""
+    def write(path):
+        layout = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            entry = {'name': col, 'file': f'col{i}.npy'}
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.cat.codes.to_numpy()
+                entry['categories'] = series.cat.categories.tolist()
+            else:
+                values = series.to_numpy()
+            np.save(os.path.join(path, entry['file']), np.ascontiguousarray(values))
+            layout.append(entry)
+        with open(os.path.join(path, 'columns.json'), 'w') as fh:
+            json.dump({'version': version, 'columns': layout}, fh)
+
+    return _publish_dir(name, version, write, root)
+
+
+def attach_frame(name='data', version=None, root=None):
+    """The published frame, built on memory-mapped column arrays without copying"""
+    version = version or current_version(name, root)
+    if version is None:
+        raise FileNotFoundError(f'Dataset {name!r} has not been published to {shared_dir(name, root)}')
+    path = os.path.join(shared_dir(name, root), version)
+    with open(os.path.join(path, 'columns.json')) as fh:
+        layout = json.load(fh)
+    columns = {}
+    for entry in layout['columns']:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, entry['categories'], validate=False)
+        columns[entry['name']] = values
+    return pd.DataFrame(columns, copy=False), version
+
+
+def publish_all(root=None):
+    """Publish the latest model bundles and the compacted India dataset"""
+    published = {name: publish_model(name, root=root) for name in ['india', 'bengaluru']}
+    meta = model_store.read_meta('india')
+    frame = data_store.compact_frame(load_india_data())
+    published['data'] = publish_frame(frame, meta['data_checksum'][:16], root=root)
+    return published
+
+
+if __name__ == '__main__':
+    if not config.SHARED_DIR:
+        raise SystemExit('Set SHARED_DIR (e.g. /dev/shm/house-prices) to publish shared arrays')
+    for name, version in publish_all().items():
+        print(f'{name}: published {version} to {shared_dir(name)}')
@@ -0,0 +1,106 @@
+"""Where the web app's startup time goes.
+
+Imports the app in a fresh interpreter under ``python -X importtime`` and
+reports the slowest imports, both per top-level package and per module. With
+``--serve`` it also starts the app and times how long /healthz and /readyz
+take to answer after the process starts.
+
+    python startup_profile.py
+    python startup_profile.py --serve --port 5055
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+
+def import_profile(module='app', env=None):
+    """``[(module, self_seconds, cumulative_seconds)]`` from ``-X importtime``"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def by_package(rows):
+    """Self time summed per top-level package, slowest first"""
+    totals = defaultdict(float)
+    for name, self_seconds, _ in rows:
+        totals[name.split('.')[0]] += self_seconds
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except OSError:
+        return None
+
+
+def time_to_ready(port, timeout=120.0, env=None):
+    """Seconds from process start until /healthz and then /readyz return 200"""
+    code = f'from app import app; app.run(port={port}, use_reloader=False)'
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = {}
+    try:
+        for path in ['/healthz', '/readyz']:
+            while _get(f'http://127.0.0.1:{port}{path}') != 200:
+                if process.poll() is not None:
+                    raise RuntimeError(f'app exited with code {process.returncode}')
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f'{path} not ready after {timeout:.0f}s')
+                time.sleep(0.01)
+            timings[path] = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app', help='module to profile (default: app)')
+    parser.add_argument('--top', type=int, default=15, help='rows per table')
+    parser.add_argument('--serve', action='store_true', help='also time /healthz and /readyz')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    # Profile the import alone; the warm-up thread would otherwise race with it
+    env = dict(os.environ, WARMUP='0', REGISTRY_POLL_SECONDS='0')
+    rows = import_profile(args.module, env)
+    total = sum(self_seconds for _, self_seconds, _ in rows)
+    print(f'import {args.module}: {total:.3f}s across {len(rows)} modules\n')
+
+    print(f'{"package":<28}{"self s":>10}')
+    for name, seconds in by_package(rows)[:args.top]:
+        print(f'{name:<28}{seconds:>10.3f}')
+
+    print(f'\n{"module":<40}{"self s":>10}{"cumulative s":>14}')
+    for name, self_seconds, cumulative in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f'{name:<40}{self_seconds:>10.3f}{cumulative:>14.3f}')
+
+    if args.serve:
+        timings = time_to_ready(args.port, env=dict(os.environ, WARMUP='1'))
+        print()
+        for path, seconds in timings.items():
+            print(f'{path:<10} 200 after {seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
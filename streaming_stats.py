@@ -0,0 +1,360 @@
+"""Single-pass column statistics and outlier filters for pandas and Spark.
+
+``DatasetStats`` consumes a dataset one chunk at a time, so the data never
+has to fit in memory. For every column it keeps:
+
+* null count, and distinct values (HyperLogLog, ~1% error)
+* for numeric columns: count/mean/variance/min/max (Welford, merged across
+  chunks with Chan's formula) and a KLL quantile sketch (~1% rank error)
+
+Every accumulator is mergeable. Stats built on different chunks, processes or
+Spark partitions combine into the same result as one pass over everything.
+``profile_frames`` takes any iterable of DataFrames, e.g.
+``data_store.iter_batches``. ``profile_spark`` runs one ``mapInPandas`` job
+(one scan) and merges the partition results on the driver; the executors
+need this module on their path (``--py-files streaming_stats.py``).
+
+``ColumnStats.iqr_bounds`` / ``quantile_bounds`` / ``sigma_bounds`` return a
+``Bounds`` that filters pandas frames (``filter_frame``) and Spark DataFrames
+(``spark_filter``) alike:
+
+    python streaming_stats.py                  # profile the India dataset
+"""
+import argparse
+import math
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# KLL compactor size: larger is more accurate (rank error ~ 1.7 / k) and bigger
+SKETCH_K = 200
+
+# HyperLogLog precision: 2**p one-byte registers, relative error ~ 1.04 / sqrt(2**p)
+HLL_PRECISION = 14
+
+
+class Moments:
+    """Count, mean, variance, min and max, updated per chunk (Welford/Chan)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _combine(self, count, mean, m2, low, high):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values):
+        """Add a 1-D float array with no NaNs"""
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), float(mean), float(((values - mean) ** 2).sum()),
+                          float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def variance(self, ddof=1):
+        return self.m2 / (self.count - ddof) if self.count > ddof else math.nan
+
+    def std(self, ddof=1):
+        return math.sqrt(self.variance(ddof))
+
+
+class QuantileSketch:
+    """KLL sketch: approximate quantiles of a stream in O(k log n) memory
+
+    Level ``i`` holds items that each stand for ``2**i`` inputs. A level over
+    its capacity is sorted, and every other item moves up one level from a
+    random offset. Capacities shrink by 2/3 per level below the top one.
+    The offsets come from a seeded generator, so the same input in the same
+    chunks always gives the same sketch.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the total weight is unchanged
+                keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = keep
+                compacted = True
+
+    def update(self, values):
+        """Add a 1-D float array with no NaNs"""
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return [math.nan for _ in qs]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.clip(np.asarray(qs, dtype=float), 0, 1) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(values) - 1)
+        return values[positions].tolist()
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+
+class DistinctCounter:
+    """HyperLogLog distinct-value estimate from 64-bit hashes"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Position of the leftmost 1 bit in the remaining 64 - p bits
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class Bounds:
+    """Keep rows whose ``column`` lies in [low, high]; rows with a null there are kept"""
+
+    def __init__(self, column, low=-math.inf, high=math.inf):
+        self.column = column
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f'Bounds({self.column!r}, {self.low!r}, {self.high!r})'
+
+    def mask(self, df):
+        values = df[self.column]
+        return values.isna() | values.between(self.low, self.high)
+
+    def spark_condition(self):
+        from pyspark.sql import functions as F
+        column = F.col(self.column)
+        condition = column.isNull()
+        if math.isfinite(self.low) and math.isfinite(self.high):
+            return condition | column.between(self.low, self.high)
+        if math.isfinite(self.low):
+            return condition | (column >= self.low)
+        if math.isfinite(self.high):
+            return condition | (column <= self.high)
+        return condition | column.isNotNull()
+
+
+class ColumnStats:
+    """Nulls, distinct count and, for numeric columns, moments and quantiles"""
+
+    def __init__(self, name, numeric, k=SKETCH_K):
+        self.name = name
+        self.numeric = numeric
+        self.rows = 0
+        self.nulls = 0
+        self.distinct = DistinctCounter()
+        self.moments = Moments() if numeric else None
+        self.sketch = QuantileSketch(k) if numeric else None
+
+    def update(self, series):
+        self.rows += len(series)
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        self.distinct.update(pd.util.hash_pandas_object(present, index=False).to_numpy())
+        if self.numeric:
+            values = present.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.moments.update(values)
+            self.sketch.update(values)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def quantiles(self, qs):
+        return self.sketch.quantiles(qs)
+
+    def iqr_bounds(self, k=1.5):
+        """[Q1 - k*IQR, Q3 + k*IQR]"""
+        q1, q3 = self.quantiles([0.25, 0.75])
+        return Bounds(self.name, q1 - k * (q3 - q1), q3 + k * (q3 - q1))
+
+    def quantile_bounds(self, lower=0.01, upper=0.99):
+        low, high = self.quantiles([lower, upper])
+        return Bounds(self.name, low, high)
+
+    def sigma_bounds(self, n=3):
+        spread = n * self.moments.std()
+        return Bounds(self.name, self.moments.mean - spread, self.moments.mean + spread)
+
+    def to_dict(self):
+        result = {'rows': self.rows, 'nulls': self.nulls, 'distinct': self.distinct.estimate()}
+        if self.numeric and self.moments.count:
+            q = self.quantiles([0.01, 0.25, 0.5, 0.75, 0.99])
+            result.update({
+                'count': self.moments.count, 'mean': self.moments.mean, 'std': self.moments.std(),
+                'min': self.moments.min, 'max': self.moments.max,
+                'p1': q[0], 'p25': q[1], 'p50': q[2], 'p75': q[3], 'p99': q[4],
+            })
+        return result
+
+
+class DatasetStats:
+    """ColumnStats for each column, fed one DataFrame chunk at a time"""
+
+    def __init__(self, columns=None, k=SKETCH_K):
+        self.wanted = columns
+        self.k = k
+        self.columns = {}
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def update(self, frame):
+        for name in self.wanted or frame.columns:
+            series = frame[name]
+            if name not in self.columns:
+                numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+                self.columns[name] = ColumnStats(name, numeric, self.k)
+            self.columns[name].update(series)
+        return self
+
+    def merge(self, other):
+        for name, stats in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(stats)
+            else:
+                self.columns[name] = stats
+        return self
+
+    def to_dict(self):
+        return {name: stats.to_dict() for name, stats in self.columns.items()}
+
+
+def profile_frames(frames, columns=None, k=SKETCH_K):
+    """One pass over an iterable of DataFrame chunks"""
+    stats = DatasetStats(columns, k)
+    for frame in frames:
+        stats.update(frame)
+    return stats
+
+
+def profile_frame(df, columns=None, chunk_rows=1_000_000, k=SKETCH_K):
+    """Profile an in-memory frame in chunks of ``chunk_rows``"""
+    return profile_frames((df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows)), columns, k)
+
+
+def profile_spark(df, columns=None, k=SKETCH_K):
+    """Profile a Spark DataFrame in one scan; each partition's stats are merged on the driver"""
+    columns = columns or df.columns
+
+    def partition_stats(batches):
+        stats = profile_frames(batches, columns, k)
+        yield pd.DataFrame({'state': [pickle.dumps(stats)]})
+
+    states = df.select(*columns).mapInPandas(partition_stats, 'state binary').collect()
+    stats = DatasetStats(columns, k)
+    for row in states:
+        stats.merge(pickle.loads(row['state']))
+    return stats
+
+
+def filter_frame(df, bounds):
+    """Rows of a pandas frame that satisfy every ``Bounds``"""
+    mask = pd.Series(True, index=df.index)
+    for bound in bounds:
+        mask &= bound.mask(df)
+    return df[mask]
+
+
+def spark_filter(df, bounds):
+    """Rows of a Spark DataFrame that satisfy every ``Bounds``"""
+    for bound in bounds:
+        df = df.filter(bound.spark_condition())
+    return df
+
+
+def main():
+    import data_store
+
+    parser = argparse.ArgumentParser(description='Single-pass statistics of the India dataset')
+    parser.add_argument('--columns', nargs='+', help='columns to profile (default: all)')
+    parser.add_argument('--batch-size', type=int, default=data_store.ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    stats = profile_frames(data_store.iter_batches(args.columns, args.batch_size), args.columns)
+    print(f'{"column":32s}{"rows":>10s}{"nulls":>8s}{"distinct":>10s}{"mean":>12s}{"std":>12s}'
+          f'{"p1":>10s}{"p50":>10s}{"p99":>10s}')
+    for name, s in stats.to_dict().items():
+        line = f'{name:32s}{s["rows"]:>10,}{s["nulls"]:>8,}{s["distinct"]:>10,}'
+        if 'mean' in s:
+            line += f'{s["mean"]:>12.2f}{s["std"]:>12.2f}{s["p1"]:>10.2f}{s["p50"]:>10.2f}{s["p99"]:>10.2f}'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
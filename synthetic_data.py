@@ -0,0 +1,192 @@
+"""Synthetic housing datasets for benchmarks.
+
+``india_frame`` produces rows in the schema of india_housing_prices.csv, and
+``bengaluru_frame`` raw rows in the format of Bengaluru_House_Data.csv:
+free-text sizes, ranges and units in total_sqft, and month availability.
+Prices follow size, location, property type, furnishing and age, with
+multiplicative noise. About 1% of India prices are missing and 0.2% are
+outliers, so the cleaning paths have something to do.
+
+The writers go chunk by chunk, each chunk with its own seed. A given
+(rows, seed) always gives the same file, and 10M rows never need to be in
+memory at once:
+
+    python synthetic_data.py --india-rows 1000000 --bengaluru-rows 50000 --out bench-data/
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from features import CURRENT_YEAR
+
+CITIES = {
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur'],
+    'Karnataka': ['Bangalore', 'Mysore'],
+    'Tamil Nadu': ['Chennai', 'Coimbatore'],
+    'Delhi': ['New Delhi'],
+    'Gujarat': ['Ahmedabad', 'Surat'],
+    'Kerala': ['Kochi', 'Trivandrum'],
+    'Telangana': ['Hyderabad'],
+    'West Bengal': ['Kolkata'],
+    'Uttar Pradesh': ['Lucknow', 'Noida'],
+    'Rajasthan': ['Jaipur'],
+}
+
+# Price per square foot in rupees, by state
+STATE_RATE = {
+    'Maharashtra': 11000, 'Karnataka': 8000, 'Tamil Nadu': 7000, 'Delhi': 12000, 'Gujarat': 5500,
+    'Kerala': 6000, 'Telangana': 7500, 'West Bengal': 6000, 'Uttar Pradesh': 5000, 'Rajasthan': 4500,
+}
+
+PROPERTY_TYPES = {'Apartment': 1.0, 'Independent House': 1.15, 'Villa': 1.4}
+FURNISHING = {'Furnished': 1.1, 'Semi-furnished': 1.0, 'Unfurnished': 0.92}
+TRANSPORT = {'High': 1.05, 'Medium': 1.0, 'Low': 0.95}
+AMENITIES = ['Gym, Pool', 'Clubhouse', 'Playground', 'Garden', 'Gym, Pool, Clubhouse']
+FACING = ['North', 'South', 'East', 'West']
+OWNER_TYPES = ['Owner', 'Builder', 'Broker']
+AVAILABILITY = ['Ready_to_Move', 'Under_Construction']
+
+BENGALURU_AREA_TYPES = ['Super built-up  Area', 'Built-up  Area', 'Plot  Area', 'Carpet  Area']
+BENGALURU_LOCATIONS = ['Whitefield', 'Sarjapur  Road', 'Electronic City', 'Kanakpura Road', 'Thanisandra',
+                       'Yelahanka', 'Uttarahalli', 'Hebbal', 'Marathahalli', 'Raja Rajeshwari Nagar',
+                       'Bannerghatta Road', 'Hennur Road', 'Haralur Road', 'Electronic City Phase II',
+                       'Koramangala', 'Indira Nagar', 'JP Nagar', 'Jayanagar', 'HSR Layout', 'Bellandur']
+BENGALURU_RATE = {loc: rate for loc, rate in zip(BENGALURU_LOCATIONS, np.linspace(4000, 14000, len(BENGALURU_LOCATIONS)))}
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Rows generated per chunk by the CSV writers
+CHUNK_ROWS = 500_000
+
+
+def india_frame(n, seed=0, start_id=1):
+    rng = np.random.default_rng(seed)
+    states = np.array(list(CITIES))
+    state = states[rng.integers(len(states), size=n)]
+    city = np.array([CITIES[s][i % len(CITIES[s])] for s, i in zip(state, rng.integers(3, size=n))])
+    bhk = rng.integers(1, 6, size=n)
+    size = np.clip(rng.normal(450 + 350 * bhk, 150), 300, None).round()
+    year_built = rng.integers(1990, CURRENT_YEAR, size=n)
+    property_type = rng.choice(list(PROPERTY_TYPES), size=n, p=[0.65, 0.25, 0.10])
+    furnished = rng.choice(list(FURNISHING), size=n)
+    transport = rng.choice(list(TRANSPORT), size=n)
+    total_floors = rng.integers(1, 31, size=n)
+
+    rate = np.array([STATE_RATE[s] for s in state])
+    multiplier = (pd.Series(property_type).map(PROPERTY_TYPES).to_numpy()
+                  * pd.Series(furnished).map(FURNISHING).to_numpy()
+                  * pd.Series(transport).map(TRANSPORT).to_numpy()
+                  * (1 - 0.005 * (CURRENT_YEAR - year_built)))
+    price = size * rate * multiplier * rng.lognormal(0, 0.15, size=n) / 1e5
+    outliers = rng.random(n) < 0.002
+    price[outliers] *= rng.uniform(5, 15, size=outliers.sum())
+    price = price.round(2)
+
+    df = pd.DataFrame({
+        'ID': np.arange(start_id, start_id + n),
+        'State': state,
+        'City': city,
+        'Locality': 'Locality_' + rng.integers(1, 51, size=n).astype(str).astype(object),
+        'Property_Type': property_type,
+        'BHK': bhk,
+        'Size_in_SqFt': size,
+        'Price_in_Lakhs': price,
+        'Price_per_SqFt': (price / size).round(4),
+        'Year_Built': year_built,
+        'Furnished_Status': furnished,
+        'Floor_No': (rng.random(n) * total_floors).astype(int),
+        'Total_Floors': total_floors,
+        'Age_of_Property': CURRENT_YEAR - year_built,
+        'Nearby_Schools': rng.integers(1, 11, size=n),
+        'Nearby_Hospitals': rng.integers(1, 11, size=n),
+        'Public_Transport_Accessibility': transport,
+        'Parking_Space': rng.choice(['Yes', 'No'], size=n),
+        'Security': rng.choice(['Yes', 'No'], size=n),
+        'Amenities': rng.choice(AMENITIES, size=n),
+        'Facing': rng.choice(FACING, size=n),
+        'Owner_Type': rng.choice(OWNER_TYPES, size=n),
+        'Availability_Status': rng.choice(AVAILABILITY, size=n, p=[0.7, 0.3]),
+    })
+    df.loc[rng.random(n) < 0.01, 'Price_in_Lakhs'] = np.nan
+    return df
+
+
+def bengaluru_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    bhk = rng.integers(1, 6, size=n)
+    sqft = np.clip(rng.normal(400 + 400 * bhk, 200), 350, None).round()
+    # A long tail of rare locations, folded into 'other' by the cleaner
+    location = np.where(rng.random(n) < 0.9, rng.choice(BENGALURU_LOCATIONS, size=n),
+                        'Rare Layout ' + rng.integers(1, 500, size=n).astype(str).astype(object))
+    rate = np.array([BENGALURU_RATE.get(loc, 5000) for loc in location])
+    price = (sqft * rate * rng.lognormal(0, 0.2, size=n) / 1e5).round(2)
+
+    total_sqft = sqft.astype(int).astype(str).astype(object)
+    ranged = rng.random(n) < 0.03
+    total_sqft[ranged] = [f'{int(s * 0.9)} - {int(s * 1.1)}' for s in sqft[ranged]]
+    metric = rng.random(n) < 0.005
+    total_sqft[metric] = [f'{s / 10.7639:.2f}Sq. Meter' for s in sqft[metric]]
+
+    ready = rng.random(n) < 0.8
+    month = (rng.integers(10, 29, size=n).astype(str).astype(object) + '-'
+             + rng.choice(MONTHS, size=n).astype(object))
+    balcony = rng.integers(0, 4, size=n).astype(float)
+    balcony[rng.random(n) < 0.05] = np.nan
+
+    return pd.DataFrame({
+        'area_type': rng.choice(BENGALURU_AREA_TYPES, size=n, p=[0.65, 0.18, 0.15, 0.02]),
+        'availability': np.where(ready, 'Ready To Move', month),
+        'location': location,
+        'size': bhk.astype(str).astype(object) + np.where(rng.random(n) < 0.8, ' BHK', ' Bedroom'),
+        'society': 'Soc' + rng.integers(1, 2000, size=n).astype(str).astype(object),
+        'total_sqft': total_sqft,
+        'bath': np.maximum(1, bhk + rng.integers(-1, 2, size=n)),
+        'balcony': balcony,
+        'price': price,
+    })
+
+
+def _write_csv(path, rows, make_chunk, chunk_rows):
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    written = 0
+    try:
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            chunk = make_chunk(min(chunk_rows, rows - start), i, start)
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            written += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def write_india_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    return _write_csv(path, rows, lambda n, i, start: india_frame(n, seed * 1000 + i, start + 1), chunk_rows)
+
+
+def write_bengaluru_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    return _write_csv(path, rows, lambda n, i, start: bengaluru_frame(n, seed * 1000 + i), chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write synthetic India and Bengaluru housing CSVs')
+    parser.add_argument('--india-rows', type=int, default=100_000)
+    parser.add_argument('--bengaluru-rows', type=int, default=13_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='.', help='output directory')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.india_rows:
+        path = os.path.join(args.out, 'india_housing_prices.csv')
+        print(f'{path}: {write_india_csv(path, args.india_rows, args.seed):,} rows')
+    if args.bengaluru_rows:
+        path = os.path.join(args.out, 'Bengaluru_House_Data.csv')
+        print(f'{path}: {write_bengaluru_csv(path, args.bengaluru_rows, args.seed):,} rows')
+
+
+if __name__ == '__main__':
+    main()
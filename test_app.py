@@ -0,0 +1,10 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('body, index', [([1, 2], 0), ([{'BHK': 2}, 'x'], 1), ({'records': [{}, None]}, 1)])
+def test_batch_rejects_records_that_are_not_objects(body, index):
+    response = app.app.test_client().post('/predict/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith(f'Record {index} ')
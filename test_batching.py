@@ -0,0 +1,39 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from batching import MicroBatcher
+
+
+class SumModel:
+    def predict(self, X):
+        return np.asarray(X).sum(axis=1)
+
+
+def test_coalesces_rows_and_returns_each_callers_result():
+    batcher = MicroBatcher(SumModel(), window_ms=20, max_rows=8)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: batcher.predict([[i, 1.0]])[0], range(16)))
+        assert results == [i + 1.0 for i in range(16)]
+        assert batcher.stats()['rows'] == 16
+        assert batcher.batches < 16
+    finally:
+        batcher.close()
+
+
+def test_close_drains_the_queue_and_ends_the_thread():
+    batcher = MicroBatcher(SumModel(), window_ms=10000, max_rows=64)
+    results = []
+    caller = threading.Thread(target=lambda: results.append(batcher.predict([[2.0, 3.0]])[0]))
+    caller.start()
+    while not batcher._queue:
+        time.sleep(0.001)
+    batcher.close(timeout=5)
+    caller.join(timeout=5)
+    assert results == [5.0]
+    assert not batcher._thread.is_alive()
+    # After closing, calls go straight to the model
+    assert batcher.predict([[1.0, 1.0]])[0] == 2.0
@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bengaluru_data import (OTHER_LOCATION, READY, UNDER_CONSTRUCTION, clean_chunk, load_bengaluru_dataset,
+                            parse_total_sqft)
+
+
+@pytest.mark.parametrize('raw, sqft', [
+    ('1056', 1056.0),
+    (' 1200 ', 1200.0),
+    ('2100.5', 2100.5),
+    ('1133 - 1384', 1258.5),
+    ('3090-5002', 4046.0),
+    ('34.46Sq. Meter', 34.46 * 10.7639),
+    ('142.61Sq. Meter', 142.61 * 10.7639),
+    ('1000Sq. Yards', 9000.0),
+    ('1Acres', 43560.0),
+    ('3Cents', 3 * 435.6),
+    ('1Grounds', 2400.0),
+])
+def test_parse_total_sqft(raw, sqft):
+    assert parse_total_sqft(pd.Series([raw]))[0] == pytest.approx(sqft)
+
+
+@pytest.mark.parametrize('raw', ['', 'abc', '12Furlongs', '1133 - ', None])
+def test_parse_total_sqft_unparseable_is_nan(raw):
+    assert np.isnan(parse_total_sqft(pd.Series([raw], dtype=object))[0])
+
+
+def _raw(rows):
+    columns = ['area_type', 'availability', 'location', 'size', 'total_sqft', 'bath', 'balcony', 'price']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def test_clean_chunk():
+    out = clean_chunk(_raw([
+        ['Super built-up  Area', 'Ready To Move', ' Whitefield ', '2 BHK', '1133 - 1384', 2, 1, 60.0],
+        ['Plot  Area', '19-Dec', 'Hebbal', '4 Bedroom', '2400', None, None, 200.0],
+        ['Built-up  Area', 'Immediate Possession', None, '1 RK', '34.46Sq. Meter', 1, 0, 25.0],
+        # Too small for 6 bedrooms
+        ['Plot  Area', 'Ready To Move', 'Hebbal', '6 Bedroom', '1020', 6, 2, 150.0],
+        # Unparseable size and area, and a missing price
+        ['Plot  Area', 'Ready To Move', 'Hebbal', None, '1200', 2, 1, 50.0],
+        ['Plot  Area', 'Ready To Move', 'Hebbal', '2 BHK', 'abc', 2, 1, 50.0],
+        ['Plot  Area', 'Ready To Move', 'Hebbal', '2 BHK', '1200', 2, 1, None],
+    ]))
+
+    assert list(out.index) == [0, 1, 2]
+    assert list(out['area_type']) == ['Super built-up Area', 'Plot Area', 'Built-up Area']
+    assert list(out['availability']) == [READY, UNDER_CONSTRUCTION, READY]
+    assert list(out['location']) == ['Whitefield', 'Hebbal', OTHER_LOCATION]
+    assert list(out['BHK']) == [2, 4, 1]
+    np.testing.assert_allclose(out['total_sqft'], [1258.5, 2400, 34.46 * 10.7639], rtol=1e-6)
+    # Missing bathrooms default to one per bedroom, missing balconies to none
+    assert list(out['bath']) == [2, 4, 1]
+    assert list(out['balcony']) == [1, 0, 0]
+    assert out['total_sqft'].dtype == np.float32
+    assert out['price'].dtype == np.float64
+
+
+def test_load_folds_rare_locations_across_chunks():
+    rows = [['Plot  Area', 'Ready To Move', 'Hebbal', '2 BHK', '1200', 2, 1, 50.0]] * 3
+    rows += [['Plot  Area', 'Ready To Move', 'Rare Layout', '2 BHK', '1200', 2, 1, 50.0]]
+    buffer = io.StringIO(_raw(rows).to_csv(index=False))
+    df = load_bengaluru_dataset(buffer, chunksize=2, min_location_count=2)
+    assert list(df['location']) == ['Hebbal'] * 3 + [OTHER_LOCATION]
+    assert df['location'].dtype == 'category'
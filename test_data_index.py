@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_index import DataIndex, InvalidQuery
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(0)
+    n = 1000
+    price = rng.integers(10, 60, size=n).astype(float)  # plenty of ties
+    price[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'ID': np.arange(1, n + 1),
+        'State': rng.choice(['Kerala', 'Delhi', 'Gujarat'], size=n),
+        'City': rng.choice(['A', 'B'], size=n),
+        'Price_in_Lakhs': price,
+        'BHK': rng.integers(1, 6, size=n),
+        'Size_in_SqFt': rng.integers(300, 3000, size=n).astype(float),
+        'Year_Built': rng.integers(1990, 2024, size=n),
+    })
+
+
+def _walk(index, args, per_page):
+    rows, meta = index.page(args, per_page)
+    pages = [rows]
+    while meta['next_cursor']:
+        rows, meta = index.page(args, per_page, cursor=meta['next_cursor'])
+        assert len(rows)
+        pages.append(rows)
+    return np.concatenate(pages), meta['total']
+
+
+def _expected(frame, args):
+    mask = np.ones(len(frame), dtype=bool)
+    if args.get('state'):
+        mask &= (frame['State'] == args['state']).to_numpy()
+    if args.get('min_bhk'):
+        mask &= (frame['BHK'] >= float(args['min_bhk'])).to_numpy()
+    sort = args['sort']
+    ascending = np.argsort(frame[sort.lstrip('-')].to_numpy(dtype=float), kind='stable')
+    ascending = ascending[mask[ascending]]
+    return ascending[::-1] if sort.startswith('-') else ascending
+
+
+@pytest.mark.parametrize('sort', ['Price_in_Lakhs', '-Price_in_Lakhs', 'ID', '-ID'])
+@pytest.mark.parametrize('filters', [{}, {'state': 'Kerala'}, {'state': 'Delhi', 'min_bhk': '3'}])
+@pytest.mark.parametrize('per_page', [7, 50])
+def test_cursor_paging_visits_every_row_once_in_order(frame, sort, filters, per_page):
+    index = DataIndex(frame)
+    args = {'sort': sort, **filters}
+    rows, total = _walk(index, args, per_page)
+    expected = _expected(frame, args)
+    assert total == len(expected)
+    np.testing.assert_array_equal(rows, expected)
+
+
+@pytest.mark.parametrize('sort', ['Price_in_Lakhs', '-Price_in_Lakhs'])
+def test_cursor_and_page_numbers_agree(frame, sort):
+    index = DataIndex(frame)
+    args = {'sort': sort, 'state': 'Gujarat'}
+    rows, meta = index.page(args, 20)
+    for page in range(2, 6):
+        by_cursor, meta = index.page(args, 20, cursor=meta['next_cursor'])
+        by_number, _ = index.page(args, 20, page=page)
+        np.testing.assert_array_equal(by_cursor, by_number)
+
+
+def test_cursor_from_another_query_is_rejected(frame):
+    index = DataIndex(frame)
+    _, meta = index.page({'sort': 'ID'}, 10)
+    with pytest.raises(InvalidQuery):
+        index.page({'sort': '-ID'}, 10, cursor=meta['next_cursor'])
+
+
+def test_cursor_from_another_dataset_version_is_rejected(frame):
+    _, meta = DataIndex(frame, 'v1').page({'sort': 'ID'}, 10)
+    with pytest.raises(InvalidQuery):
+        DataIndex(frame, 'v2').page({'sort': 'ID'}, 10, cursor=meta['next_cursor'])
+    rows, _ = DataIndex(frame, 'v1').page({'sort': 'ID'}, 10, cursor=meta['next_cursor'])
+    assert list(rows) == list(range(10, 20))
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+import distill
+from distill import BudgetedModel, budgeted_model
+
+
+class SleepyModel:
+    def __init__(self, seconds, value=0.0):
+        self.seconds = seconds
+        self.value = value
+
+    def predict(self, X):
+        time.sleep(self.seconds)
+        return np.full(len(X), self.value)
+
+
+def _forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    return RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0).fit(X, X[:, 0]), X, X[:, 0]
+
+
+def test_forest_within_budget_is_not_distilled():
+    forest, X, y = _forest()
+    surrogate, report = distill.distill(forest, X, y, budget_ms=1000, surrogates=['tree-d8'])
+    assert surrogate is None
+    assert report['selected'] is None and report['surrogates'] == {}
+
+
+def test_only_surrogates_faster_than_the_forest_are_selected(monkeypatch):
+    forest, X, y = _forest()
+    p99 = {RandomForestRegressor: 1.0, DecisionTreeRegressor: 0.5, HistGradientBoostingRegressor: 2.0}
+    monkeypatch.setattr(distill, 'compile_model', lambda model, *args: model)
+    monkeypatch.setattr(distill, 'latency_profile', lambda model, rows: {'p50_ms': 0.0, 'p99_ms': p99[type(model)]})
+    surrogate, report = distill.distill(forest, X, y, surrogates=['tree-d8', 'gbm-shallow'])
+    assert set(report['surrogates']) == {'tree-d8', 'gbm-shallow'}
+    assert report['selected'] == 'tree-d8' and surrogate['name'] == 'tree-d8'
+
+    p99[DecisionTreeRegressor] = 1.0
+    surrogate, report = distill.distill(forest, X, y, surrogates=['tree-d8', 'gbm-shallow'])
+    assert surrogate is None and report['selected'] is None
+
+
+def _saved(monkeypatch, model):
+    monkeypatch.setattr(distill.model_store, 'load_surrogate', lambda name, version, root=None: {
+        'name': 'fake', 'model': model, 'sample': np.zeros((4, 2))})
+    monkeypatch.setattr(distill, 'compile_model', lambda model, max_rows=None: model)
+
+
+def test_budgeted_model_keeps_a_forest_within_budget(monkeypatch):
+    _saved(monkeypatch, SleepyModel(0))
+    fallback = SleepyModel(0)
+    assert budgeted_model({'name': 'india', 'version': 'v1'}, fallback, budget_ms=50, max_rows=10) is fallback
+
+
+def test_budgeted_model_wraps_a_slow_forest(monkeypatch):
+    _saved(monkeypatch, SleepyModel(0, value=1.0))
+    served = budgeted_model({'name': 'india', 'version': 'v1'}, SleepyModel(0.002), budget_ms=1, max_rows=10)
+    assert isinstance(served, BudgetedModel)
+    assert served.predict(np.zeros((1, 2)))[0] == 1.0
@@ -0,0 +1,47 @@
+import numpy as np
+
+from batching import MicroBatcher
+from model_registry import ModelRegistry, ServedModel, Source
+
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+class Published:
+    """A fake artifact store: bump ``version`` to publish a new model"""
+
+    def __init__(self, batching=False):
+        self.version = 'v1'
+        self.batching = batching
+
+    def load(self, version):
+        model = ConstantModel(float(version[1:]))
+        if self.batching:
+            model = MicroBatcher(model, window_ms=1)
+        return ServedModel(model, {}, ['x'], {'name': 'm', 'version': version})
+
+
+def test_swap_passes_the_replaced_snapshot_so_its_batcher_can_be_closed():
+    published = Published(batching=True)
+    swapped = []
+
+    def on_swap(name, previous):
+        swapped.append(previous)
+        previous.model.close()
+
+    registry = ModelRegistry({'m': Source(lambda: published.version, published.load)}, interval=0, on_swap=on_swap)
+    old = registry.get('m')
+    published.version = 'v2'
+    assert registry.reload('m')
+
+    assert swapped == [old]
+    assert not old.model._thread.is_alive()
+    assert registry.get('m').model.predict([[0.0]])[0] == 2.0
+    # A request still holding the old snapshot is answered without the batching thread
+    assert old.model.predict([[0.0]])[0] == 1.0
+    registry.get('m').model.close()
@@ -0,0 +1,62 @@
+import numpy as np
+
+import app
+from model_registry import ModelRegistry, ServedModel, Source
+from prediction_cache import PredictionCache
+
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+def _registry(published):
+    def load(version):
+        return ServedModel(ConstantModel(float(version[1:])), {}, ['x'], {'name': 'india', 'version': version})
+    return ModelRegistry({'india': Source(lambda: published['version'], load),
+                          'data': Source(lambda: published['data'], lambda version: version)},
+                         interval=0, on_swap=app.on_swap)
+
+
+def _predict(registry, vector):
+    served = registry.get('india')
+    return app.prediction_cache.get_or_compute('india', served.meta['version'], vector,
+                                               lambda: served.model.predict([vector])[0])
+
+
+def test_swapping_the_model_drops_its_cached_predictions():
+    app.prediction_cache.invalidate()
+    published = {'version': 'v1', 'data': 'd1'}
+    registry = _registry(published)
+    vector = [3.0, 1.0]
+
+    assert _predict(registry, vector) == 1.0
+    app.prediction_cache.put(('bengaluru', 'b1', (1.0,)), 7.0)
+    published['version'] = 'v2'
+    assert registry.reload('india')
+
+    stats = app.prediction_cache.stats()
+    assert stats['size'] == 1  # only the other model's entry is left
+    assert app.prediction_cache.get(('bengaluru', 'b1', (1.0,))) == 7.0
+    assert _predict(registry, vector) == 2.0
+
+
+def test_swapping_the_dataset_keeps_cached_predictions():
+    app.prediction_cache.invalidate()
+    published = {'version': 'v1', 'data': 'd1'}
+    registry = _registry(published)
+    registry.get('data')
+    _predict(registry, [1.0])
+    published['data'] = 'd2'
+    assert registry.reload('data')
+    assert app.prediction_cache.stats()['size'] == 1
+
+
+def test_get_or_compute_keys_on_version():
+    cache = PredictionCache(max_size=10)
+    assert cache.get_or_compute('india', 'v1', [1, 2], lambda: 1.0) == 1.0
+    assert cache.get_or_compute('india', 'v1', np.array([1.0, 2.0]), lambda: 99.0) == 1.0
+    assert cache.get_or_compute('india', 'v2', [1, 2], lambda: 2.0) == 2.0
@@ -0,0 +1,14 @@
+import json
+
+import numpy as np
+from flask import Flask
+
+import serializers
+from serializers import FastJSONProvider
+
+
+def test_json_fallback_writes_nan_in_arrays_as_null(monkeypatch):
+    monkeypatch.setattr(serializers, 'orjson', None)
+    provider = FastJSONProvider(Flask(__name__))
+    body = provider.dumps({'values': np.array([1.5, np.nan, np.inf]), 'scalar': np.float32('nan'), 'n': np.int64(3)})
+    assert json.loads(body) == {'values': [1.5, None, None], 'scalar': None, 'n': 3}
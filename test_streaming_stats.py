@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import Bounds, QuantileSketch, filter_frame, profile_frame, profile_frames
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _rank_errors(data, estimates):
+    # Distance from q to the range of ranks the estimate covers (wide for tied values)
+    data = np.sort(data)
+    errors = []
+    for q, value in zip(QS, estimates):
+        low = np.searchsorted(data, value, side='left') / len(data)
+        high = np.searchsorted(data, value, side='right') / len(data)
+        errors.append(max(low - q, q - high, 0))
+    return errors
+
+
+@pytest.mark.parametrize('make', [
+    lambda rng, n: rng.normal(size=n),
+    lambda rng, n: rng.lognormal(0, 1.5, size=n),
+    lambda rng, n: rng.integers(0, 20, size=n).astype(float),
+    lambda rng, n: np.arange(n, dtype=float),  # sorted input
+])
+def test_quantile_rank_error_is_small(make):
+    data = make(np.random.default_rng(0), 200_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(data, 37):
+        sketch.update(chunk)
+    assert sketch.n == len(data)
+    assert max(_rank_errors(data, sketch.quantiles(QS))) < 0.02
+
+
+def test_merged_sketches_are_as_accurate():
+    data = np.random.default_rng(1).exponential(size=100_000)
+    parts = [QuantileSketch(seed=i) for i in range(8)]
+    for part, chunk in zip(parts, np.array_split(data, 8)):
+        part.update(chunk)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.n == len(data)
+    assert max(_rank_errors(data, merged.quantiles(QS))) < 0.02
+
+
+def test_small_inputs_are_exact():
+    data = np.random.default_rng(2).permutation(100).astype(float)
+    sketch = QuantileSketch()
+    sketch.update(data)
+    assert sketch.quantiles([0, 0.25, 0.5, 1]) == [0.0, 24.0, 49.0, 99.0]
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_iqr_bounds():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'price': rng.normal(100, 10, size=100_000)})
+    stats = profile_frame(df, chunk_rows=7_000)['price']
+    q1, q3 = np.quantile(df['price'], [0.25, 0.75])
+    bounds = stats.iqr_bounds(1.5)
+    assert bounds.column == 'price'
+    # Within a small rank error of the exact quartiles (IQR of N(100, 10) is ~13.5)
+    assert bounds.low == pytest.approx(q1 - 1.5 * (q3 - q1), abs=1.0)
+    assert bounds.high == pytest.approx(q3 + 1.5 * (q3 - q1), abs=1.0)
+    # And exactly q1 - k*IQR, q3 + k*IQR of the sketch's own quartiles
+    s1, s3 = stats.quantiles([0.25, 0.75])
+    assert (bounds.low, bounds.high) == (s1 - 1.5 * (s3 - s1), s3 + 1.5 * (s3 - s1))
+    assert stats.iqr_bounds(0).low == s1
+
+
+def test_moments_and_nulls_match_pandas():
+    rng = np.random.default_rng(4)
+    values = rng.normal(50, 5, size=10_000)
+    values[rng.random(len(values)) < 0.1] = np.nan
+    df = pd.DataFrame({'x': values, 'city': rng.choice(['A', 'B', 'C'], size=len(values))})
+    stats = profile_frames(df.iloc[i:i + 1_200] for i in range(0, len(df), 1_200))
+    x = stats['x'].to_dict()
+    assert x['rows'] == len(df) and x['nulls'] == df['x'].isna().sum()
+    assert x['mean'] == pytest.approx(df['x'].mean())
+    assert x['std'] == pytest.approx(df['x'].std())
+    assert (x['min'], x['max']) == (df['x'].min(), df['x'].max())
+    assert stats['city'].to_dict() == {'rows': len(df), 'nulls': 0, 'distinct': 3}
+
+
+def test_filter_frame_keeps_nulls_and_applies_every_bound():
+    df = pd.DataFrame({'price': [1.0, 5.0, 10.0, np.nan, 50.0], 'bhk': [1, 2, 9, 3, 2]})
+    kept = filter_frame(df, [Bounds('price', 2, 20), Bounds('bhk', high=5)])
+    assert list(kept.index) == [1, 3]
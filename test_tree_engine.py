@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from tree_engine import FlatForest
+
+
+def _data(n=600, n_features=5, nan_fraction=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=n)
+    X[rng.random(X.shape) < nan_fraction] = np.nan
+    return X, y
+
+
+@pytest.mark.parametrize('model', [
+    RandomForestRegressor(n_estimators=20, random_state=0),
+    RandomForestRegressor(n_estimators=10, max_depth=4, random_state=0),
+    DecisionTreeRegressor(random_state=0),
+])
+@pytest.mark.parametrize('train_nan', [0.0, 0.1])
+def test_matches_sklearn_including_nan_rows(model, train_nan):
+    X, y = _data(nan_fraction=train_nan)
+    model.fit(X, y)
+    X_test, _ = _data(n=300, nan_fraction=0.2, seed=1)
+    flat = FlatForest.from_sklearn(model)
+    np.testing.assert_array_equal(flat.predict(X_test), model.predict(X_test))
+    # Single rows take the same path as the app's /predict
+    for row in X_test[:20]:
+        assert flat.predict(row.reshape(1, -1))[0] == model.predict(row.reshape(1, -1))[0]
+
+
+def test_large_batches_go_to_the_fallback():
+    X, y = _data(nan_fraction=0.0)
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(model, keep_fallback=True, max_rows=10)
+    np.testing.assert_array_equal(flat.predict(X[:50]), model.predict(X[:50]))
@@ -0,0 +1,53 @@
+import numpy as np
+from sklearn.model_selection import KFold
+
+import tuning
+
+
+def test_successive_halving_samples_rungs_at_random(monkeypatch):
+    # Rows sorted by the target, like a file sorted by state or date
+    X = np.arange(3000, dtype=float).reshape(-1, 1)
+    y = np.arange(3000, dtype=float)
+    folds = {'X': X, 'y': y, 'folds': list(KFold(n_splits=3, shuffle=True, random_state=0).split(X))}
+    candidates = [('linear', {'fit_intercept': True})] * 9
+
+    seen = []
+
+    def score(family, params, X, y, train_idx, test_idx):
+        seen.append(train_idx)
+        return {'rmse': 1.0, 'mae': 1.0, 'r2': 0.0, 'fit_seconds': 0.0, 'predict_us_per_row': 0.0, 'n_nodes': 0}
+
+    monkeypatch.setattr(tuning, '_score_fold', score)
+    tuning.successive_halving(candidates, folds, eta=3, n_jobs=1, verbose=False)
+
+    train = folds['folds'][0][0]
+    first = seen[0]
+    assert len(first) < len(train)
+    assert set(first) <= set(train)
+    assert not np.array_equal(first, train[:len(first)])
+    # Spread over the whole file, not its first rows
+    assert first.max() > 0.9 * len(X) and first.min() < 0.1 * len(X)
+    # Every candidate in a rung trains on the same rows
+    n_folds = len(folds['folds'])
+    for k in range(len(candidates)):
+        assert np.array_equal(seen[k * n_folds], first)
+
+
+def test_fold_cache_is_rebuilt_when_the_outlier_filter_changes(monkeypatch, tmp_path):
+    data_path = tmp_path / 'data.csv'
+    data_path.write_text('x\n1\n')
+    prepared = []
+
+    def prepare(path):
+        prepared.append(tuning.config.OUTLIER_IQR_K)
+        return np.arange(20.0).reshape(-1, 1), np.arange(20.0)
+
+    monkeypatch.setitem(tuning.DATASETS, 'india', (prepare, str(data_path)))
+    monkeypatch.setattr(tuning.config, 'OUTLIER_IQR_K', 1.5)
+    tuning.load_folds('india', root=str(tmp_path))
+    tuning.load_folds('india', root=str(tmp_path))
+    assert prepared == [1.5]
+
+    monkeypatch.setattr(tuning.config, 'OUTLIER_IQR_K', 3.0)
+    assert tuning.load_folds('india', root=str(tmp_path))['preprocessing'] == {'outlier_iqr_k': 3.0}
+    assert prepared == [1.5, 3.0]
@@ -0,0 +1,105 @@
+"""Offline training entry point.
+
+Trains the pan-India and Bengaluru models and writes versioned bundles that
+app.py loads at startup instead of fitting the forests itself:
+
+    python train_models.py              # retrain only missing/stale bundles
+    python train_models.py --force      # always write a new version
+    python train_models.py --only india
+
+    # Grow the current bundle with trees fitted on new rows only. Append
+    # the rows to the dataset as well, so the bundle is recorded as current.
+    python train_models.py --only india --incremental new_rows.csv --trees 20
+
+    # Also distil each bundle into a surrogate for SURROGATE_P99_MS serving
+    python train_models.py --distill --budget-ms 0.5
+"""
+import argparse
+
+import config
+import data_store
+import model_store
+import bengaluru_model
+import distill
+import india_model
+from training import add_trees
+
+# name -> (training function, dataset it is trained on)
+MODELS = {
+    'india': (india_model.train_india_model, config.DATA_PATH),
+    'bengaluru': (bengaluru_model.train_bengaluru_model, config.BENGALURU_DATA_PATH),
+}
+
+# name -> function preparing extra rows for an existing bundle
+NEW_ROWS = {
+    'india': india_model.new_training_rows,
+    'bengaluru': bengaluru_model.new_training_rows,
+}
+
+
+def train(name, force=False):
+    train_fn, path = MODELS[name]
+    meta = model_store.read_meta(name)
+    if not force and not model_store.is_stale(meta, path):
+        print(f"{name}: bundle {meta['version']} is up to date")
+        return meta['version']
+
+    print(f"{name}: training from {path}...")
+    model, encoders, feature_cols, _ = train_fn(path)
+    version = model_store.save_bundle(name, model, encoders, feature_cols, path)
+    print(f"{name}: saved bundle {version}")
+    return version
+
+
+def extend(name, new_rows_path, n_trees):
+    """Add ``n_trees`` trees fitted on ``new_rows_path`` to the latest bundle"""
+    _, path = MODELS[name]
+    bundle = model_store.load_bundle(name, mmap=False)
+    parent = bundle['meta']
+    X, y = NEW_ROWS[name](new_rows_path, bundle['encoders'], bundle['feature_cols'])
+    if not len(X):
+        print(f"{name}: no usable rows in {new_rows_path}")
+        return parent['version']
+
+    print(f"{name}: adding {n_trees} trees from {len(X)} rows to bundle {parent['version']}...")
+    model = add_trees(bundle['model'], X, y, n_trees)
+    version = model_store.save_bundle(name, model, bundle['encoders'], bundle['feature_cols'], path, extra={
+        'parent_version': parent['version'],
+        'increment_path': new_rows_path,
+        'increment_rows': int(len(X)),
+        'n_estimators': len(model.estimators_),
+    })
+    print(f"{name}: saved bundle {version} ({len(model.estimators_)} trees)")
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train and save model bundles')
+    parser.add_argument('--only', choices=sorted(MODELS), help='train a single model')
+    parser.add_argument('--force', action='store_true', help='retrain even if the bundle is current')
+    parser.add_argument('--incremental', metavar='CSV', help='grow the current bundle with trees fitted on these rows')
+    parser.add_argument('--trees', type=int, default=20, help='trees to add with --incremental')
+    parser.add_argument('--distill', action='store_true', help='distil a surrogate from each bundle')
+    parser.add_argument('--budget-ms', type=float, default=config.SURROGATE_P99_MS or None,
+                        help='p99 single-row latency the surrogate must meet')
+    args = parser.parse_args()
+    if args.incremental and not args.only:
+        parser.error('--incremental needs --only')
+
+    # Convert the CSV to Parquet once so the training loaders can read it selectively
+    data_store.ensure_parquet()
+
+    names = [args.only] if args.only else list(MODELS)
+    if args.incremental:
+        extend(args.only, args.incremental, args.trees)
+    else:
+        for name in names:
+            train(name, force=args.force)
+
+    if args.distill:
+        for name in names:
+            distill.print_report(name, distill.distill_bundle(name, args.budget_ms))
+
+
+if __name__ == '__main__':
+    main()
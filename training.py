@@ -0,0 +1,96 @@
+"""Training runner shared by the pipelines and train_models.py.
+
+* ``fit_candidates`` fits several candidate models at once in a process pool
+  and splits the machine's cores between them, so forests also build their
+  trees in parallel inside each worker.
+* ``fit_forest`` fits a single forest on every core.
+* ``add_trees`` grows an already fitted forest with ``warm_start``. New trees
+  are trained on fresh rows only, so a data refresh doesn't refit the forest
+  from scratch.
+
+Fitted forests get ``n_jobs`` reset to None before they are returned. Saved
+bundles therefore predict single-threaded and deterministically.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+import config
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def _set_jobs(estimator, n_jobs):
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+
+
+def evaluate(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    return {
+        'RMSE': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        'MAE': float(mean_absolute_error(y_test, y_pred)),
+        'R2': float(r2_score(y_test, y_pred)),
+    }
+
+
+def fit_forest(X, y, n_estimators=100, random_state=42, n_jobs=None):
+    """RandomForestRegressor fitted on all cores (TRAIN_N_JOBS)"""
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state,
+                                  n_jobs=n_jobs or config.TRAIN_N_JOBS)
+    model.fit(X, y)
+    _set_jobs(model, None)
+    return model
+
+
+def _fit_and_score(name, estimator, n_jobs, X_train, y_train, X_test, y_test):
+    _set_jobs(estimator, n_jobs)
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    metrics = evaluate(estimator, X_test, y_test) if X_test is not None else {}
+    metrics['fit_seconds'] = fit_seconds
+    _set_jobs(estimator, None)
+    return name, estimator, metrics
+
+
+def fit_candidates(candidates, X_train, y_train, X_test=None, y_test=None, max_workers=None):
+    """Fit ``{name: estimator}`` concurrently and return ``{name: (model, metrics)}``
+
+    Each worker process gets an equal share of the cores for estimators that
+    accept ``n_jobs``.
+    """
+    cores = available_cores()
+    max_workers = max(1, min(max_workers or len(candidates), len(candidates), cores))
+    jobs_per_worker = max(1, cores // max_workers)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fit_and_score, name, estimator, jobs_per_worker,
+                               X_train, y_train, X_test, y_test)
+                   for name, estimator in candidates.items()]
+        for future in futures:
+            name, model, metrics = future.result()
+            results[name] = (model, metrics)
+    # Keep the caller's ordering
+    return {name: results[name] for name in candidates}
+
+
+def add_trees(model, X_new, y_new, n_new_trees, n_jobs=None):
+    """Grow a fitted forest by ``n_new_trees`` trees trained on new rows"""
+    if not isinstance(model, RandomForestRegressor):
+        raise TypeError(f'Incremental training needs a RandomForestRegressor, not {type(model).__name__}')
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees,
+                     n_jobs=n_jobs or config.TRAIN_N_JOBS)
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False, n_jobs=None)
+    return model
@@ -0,0 +1,524 @@
+"""How the training pipelines scale with the size of the data.
+
+Writes synthetic datasets (synthetic_data.py) at each --rows size and runs
+each pipeline on them stage by stage. Each stage is timed and its memory
+measured:
+
+* ``india``      what load_model trains: read, clean, encode, split, fit the
+  forest, evaluate it, then compile it and its encoders for serving
+* ``bengaluru``  the same for train_bengaluru_model, on raw-format listings
+* ``simple``     house_price_prediction_simple.py, which prepares the data
+  with india_model; only its fit differs, three candidates in a process pool
+* ``spark``      house_price_prediction.py in local mode (needs pyspark); a
+  Spark stage is the action that runs it, so reading is timed with the
+  profile scan and cleaning with the indexer fit
+
+Each (pipeline, size) runs in a fresh interpreter, so memory from one run
+doesn't carry into the next, and a run killed for running out of memory
+doesn't stop the rest. Memory is the process RSS: before the stage, its peak
+while the stage runs (sampled every 10 ms) and after it. The fit stage of
+``simple`` also reports the largest worker process's peak. --tracemalloc
+adds the peak of Python and numpy allocations. For Spark only the driver
+is measured.
+
+Once a pipeline fails or a stage takes longer than --budget seconds, larger
+sizes are skipped for it. The report lists seconds and peak memory per
+stage and size. It fits each stage's growth as ``seconds ~ rows^k`` from the
+two largest sizes, and its memory above the interpreter's baseline the same
+way. From those fits it projects time and peak memory to --project rows. It
+names the stage that failed first, or else the first that would not fit in
+memory:
+
+    python training_benchmark.py --rows 10000 100000 1000000
+    python training_benchmark.py --pipelines india simple --rows 1000000 10000000 --budget 1800
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+import synthetic_data
+from benchmark import RESULTS_DIR, ROOT, git_commit
+
+PIPELINE_STAGES = {
+    'india': ['read', 'clean', 'encode', 'split', 'fit', 'evaluate', 'compile'],
+    'bengaluru': ['read', 'clean', 'encode', 'split', 'fit', 'evaluate', 'compile'],
+    'simple': ['read', 'clean', 'encode', 'split', 'fit', 'evaluate'],
+    'spark': ['session', 'read_profile', 'clean_index', 'assemble', 'fit', 'evaluate'],
+}
+
+MB = 1 << 20
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+
+
+def total_memory_bytes():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class StageRecorder:
+    """Times stages and samples their memory; every record is appended to ``path`` as it completes"""
+
+    def __init__(self, path, trace=False, interval=0.01):
+        self.path = path
+        self.trace = trace
+        self.interval = interval
+        if trace:
+            import tracemalloc
+            tracemalloc.start()
+
+    def _write(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    @contextmanager
+    def stage(self, name):
+        gc.collect()
+        before = rss_bytes()
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak = [before or 0]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], rss_bytes() or 0)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        if before is not None:
+            sampler.start()
+        if self.trace:
+            import tracemalloc
+            tracemalloc.reset_peak()
+
+        record = {'stage': name}
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record['error'] = f'{type(exc).__name__}: {exc}'
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            done.set()
+            after = rss_bytes()
+            if before is None:
+                # No /proc: only the process high-water mark is available
+                record['rss_peak_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                                              * MAXRSS_UNIT / MB, 1)
+            else:
+                sampler.join()
+                peak[0] = max(peak[0], after)
+                record.update(rss_before_mb=round(before / MB, 1), rss_peak_mb=round(peak[0] / MB, 1),
+                              rss_after_mb=round(after / MB, 1), peak_increase_mb=round((peak[0] - before) / MB, 1))
+            children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            if children > children_before:
+                record['child_peak_mb'] = round(children * MAXRSS_UNIT / MB, 1)
+            if self.trace:
+                import tracemalloc
+                record['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+            self._write(record)
+
+
+# Pipelines, run in the worker process; config reads the paths from the environment
+
+def _sklearn_tail(stage, X, y, fit, compile_fn=None):
+    from sklearn.model_selection import train_test_split
+    from training import evaluate
+
+    with stage('split') as record:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        record['rows'] = len(X_train)
+    with stage('fit'):
+        models = fit(X_train, y_train)
+    with stage('evaluate') as record:
+        record['metrics'] = {name: evaluate(model, X_test, y_test) for name, model in models.items()}
+    if compile_fn is not None:
+        with stage('compile'):
+            compile_fn(models)
+
+
+def _india_features(stage):
+    """Read, clean and encode stages shared by the india and simple pipelines"""
+    import data_store
+    import india_model
+
+    with stage('read') as record:
+        df = data_store.read_dataset(india_model.TRAINING_COLUMNS)
+        record['rows'] = len(df)
+    with stage('clean') as record:
+        df_clean = india_model.drop_price_outliers(df.dropna(subset=india_model.REQUIRED_COLUMNS)).copy()
+        del df
+        record['rows'] = len(df_clean)
+    with stage('encode'):
+        X, y, le_dict, _, _ = india_model.encode_training_data(df_clean)
+    return X, y, le_dict
+
+
+def run_india(stage, trees):
+    from encoding import compile_encoders
+    from training import fit_forest
+    from tree_engine import compile_model
+
+    X, y, le_dict = _india_features(stage)
+
+    def compile_for_serving(models):
+        compile_model(models['forest'])
+        compile_encoders(le_dict)
+
+    _sklearn_tail(stage, X, y, lambda X_train, y_train: {'forest': fit_forest(X_train, y_train, trees)},
+                  compile_for_serving)
+
+
+def run_bengaluru(stage, trees):
+    import bengaluru_data
+    import bengaluru_model
+    from encoding import compile_encoders
+    from training import fit_forest
+    from tree_engine import compile_model
+
+    # The chunks are held so parsing and cleaning can be timed apart; the app streams them
+    with stage('read') as record:
+        chunks = list(bengaluru_data.read_raw())
+        record['rows'] = sum(len(chunk) for chunk in chunks)
+    with stage('clean') as record:
+        listings = bengaluru_data.clean_listings(chunks)
+        del chunks
+        record['rows'] = len(listings)
+    with stage('encode'):
+        X, y, le_dict, _, _ = bengaluru_model.encode_training_data(listings)
+
+    def compile_for_serving(models):
+        compile_model(models['forest'])
+        compile_encoders(le_dict, bengaluru_model.ENCODER_FALLBACKS)
+
+    _sklearn_tail(stage, X, y, lambda X_train, y_train: {'forest': fit_forest(X_train, y_train, trees)},
+                  compile_for_serving)
+
+
+def run_simple(stage, trees):
+    import house_price_prediction_simple as simple
+    from training import fit_candidates
+
+    X, y, _ = _india_features(stage)
+
+    def fit(X_train, y_train):
+        candidates = simple.build_models()
+        candidates['Random Forest'].set_params(n_estimators=trees)
+        return {name: model for name, (model, _) in fit_candidates(candidates, X_train, y_train).items()}
+
+    _sklearn_tail(stage, X, y, fit)
+
+
+def run_spark(stage, trees):
+    import house_price_prediction as pipeline
+
+    with stage('session'):
+        spark = pipeline.create_spark_session('HousePriceTrainingBenchmark', 'local[*]')
+    model_df = None
+    try:
+        with stage('read_profile') as record:
+            df = pipeline.drop_incomplete(pipeline.load_dataset(spark))
+            stats = pipeline.profile(df)
+            record['rows'] = stats[pipeline.LABEL_COL].rows
+        with stage('clean_index'):
+            df_clean = pipeline.drop_outliers(df, pipeline.price_bounds(stats))
+            indexer_model = pipeline.fit_indexer(df_clean)
+        with stage('assemble') as record:
+            model_df, n_train, n_test = pipeline.modelling_frame(df_clean, indexer_model)
+            train_df, test_df = pipeline.split(model_df)
+            record['rows'] = n_train + n_test
+        with stage('fit'):
+            estimators = pipeline.build_models()
+            estimators['Random Forest'].setNumTrees(trees)
+            fitted = {name: estimator.fit(train_df) for name, estimator in estimators.items()}
+        with stage('evaluate') as record:
+            record['metrics'] = {name: pipeline.evaluate(model.transform(test_df)) for name, model in fitted.items()}
+    finally:
+        if model_df is not None:
+            model_df.unpersist()
+        spark.stop()
+
+
+PIPELINES = {'india': run_india, 'bengaluru': run_bengaluru, 'simple': run_simple, 'spark': run_spark}
+
+
+# Orchestration, in the parent process
+
+def prepare_data(rows, pipeline, seed=0, source='csv', root=RESULTS_DIR):
+    """Directory with the files ``pipeline`` reads at this size, written on first use"""
+    workdir = os.path.abspath(os.path.join(root, f'training-data-{rows}-{seed}'))
+    os.makedirs(workdir, exist_ok=True)
+    paths = {
+        'india': os.path.join(workdir, 'india_housing_prices.csv'),
+        'bengaluru': os.path.join(workdir, 'Bengaluru_House_Data.csv'),
+        'parquet': os.path.join(workdir, 'india_housing_prices.parquet'),
+    }
+    if pipeline == 'bengaluru':
+        if not os.path.exists(paths['bengaluru']):
+            synthetic_data.write_bengaluru_csv(paths['bengaluru'], rows, seed)
+    else:
+        if not os.path.exists(paths['india']):
+            synthetic_data.write_india_csv(paths['india'], rows, seed)
+        if source == 'parquet':
+            import data_store
+            data_store.ensure_parquet(paths['india'], paths['parquet'])
+    return workdir, paths
+
+
+def worker_env(paths, source):
+    return dict(os.environ,
+                DATA_PATH=paths['india'],
+                BENGALURU_DATA_PATH=paths['bengaluru'],
+                # An empty path makes data_store read the CSV
+                PARQUET_PATH=paths['parquet'] if source == 'parquet' else '',
+                MPLBACKEND='Agg')
+
+
+def run_worker(pipeline, rows, workdir, paths, args):
+    """Stage records for one run; a crash or timeout is recorded against the stage that was running"""
+    records_path = os.path.join(workdir, f'{pipeline}-stages.jsonl')
+    log_path = os.path.join(workdir, f'{pipeline}.log')
+    if os.path.exists(records_path):
+        os.remove(records_path)
+    command = [sys.executable, os.path.join(ROOT, 'training_benchmark.py'), '--worker', pipeline,
+               '--worker-output', records_path, '--trees', str(args.trees)]
+    if args.tracemalloc:
+        command.append('--tracemalloc')
+
+    start = time.perf_counter()
+    failure = None
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=worker_env(paths, args.source),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        try:
+            returncode = process.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            returncode = None
+            failure = f'timed out after {args.timeout:.0f}s'
+
+    records = []
+    if os.path.exists(records_path):
+        with open(records_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    if returncode is not None and returncode < 0:
+        failure = f'killed by signal {-returncode}'
+    elif returncode:
+        failure = next((r['error'] for r in records if 'error' in r), f'exited with code {returncode}')
+    if failure and not any('error' in r for r in records):
+        # The process died inside the stage after the last one it recorded
+        stages = PIPELINE_STAGES[pipeline]
+        running = stages[len(records)] if len(records) < len(stages) else stages[-1]
+        records.append({'stage': running, 'error': failure})
+    return {
+        'pipeline': pipeline,
+        'rows': rows,
+        'seconds': round(time.perf_counter() - start, 3),
+        'failure': failure,
+        'log': log_path,
+        'stages': records,
+    }
+
+
+def growth_exponent(points):
+    """``k`` in ``y ~ rows^k`` through the two largest sizes, or None"""
+    points = [(rows, value) for rows, value in points if value and value > 0]
+    if len(points) < 2:
+        return None
+    (r0, v0), (r1, v1) = sorted(points)[-2:]
+    return float(np.log(v1 / v0) / np.log(r1 / r0))
+
+
+def stage_memory_mb(record):
+    """Peak RSS of the stage, plus its largest worker process's when it had any"""
+    return (record.get('rss_peak_mb') or 0) + record.get('child_peak_mb', 0)
+
+
+def scaling_report(runs, project_rows, memory_bytes=None):
+    """Per pipeline: growth of each stage, projections to ``project_rows`` and the stage that breaks first"""
+    report = {}
+    for pipeline in dict.fromkeys(run['pipeline'] for run in runs):
+        pipeline_runs = [run for run in runs if run['pipeline'] == pipeline and run.get('stages')]
+        failed = next((run for run in pipeline_runs if run['failure']), None)
+        completed = [run for run in pipeline_runs if not run['failure']]
+        # Memory grows on top of the interpreter and its imports, measured before the first stage
+        baseline = min((run['stages'][0].get('rss_before_mb') or 0 for run in completed), default=0)
+        stages = {}
+        for name in PIPELINE_STAGES[pipeline]:
+            records = [(run['rows'], r) for run in completed for r in run['stages'] if r['stage'] == name]
+            seconds = [(rows, r['seconds']) for rows, r in records]
+            data_mb = [(rows, stage_memory_mb(r) - baseline) for rows, r in records]
+            entry = {'time_exponent': growth_exponent(seconds), 'memory_exponent': growth_exponent(data_mb)}
+            if entry['time_exponent'] is not None:
+                rows, value = max(seconds)
+                entry['projected_seconds'] = round(value * (project_rows / rows) ** entry['time_exponent'], 1)
+            if entry['memory_exponent'] is not None:
+                rows, value = max(data_mb)
+                growth = (project_rows / rows) ** max(entry['memory_exponent'], 0)
+                entry['projected_peak_mb'] = round(baseline + value * growth, 1)
+            stages[name] = {key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()}
+
+        breaks = None
+        if failed:
+            stage = next(r for r in failed['stages'] if 'error' in r)
+            breaks = {'stage': stage['stage'], 'rows': failed['rows'], 'reason': stage['error']}
+        elif memory_bytes:
+            over = [(entry['projected_peak_mb'], name) for name, entry in stages.items()
+                    if entry.get('projected_peak_mb', 0) * MB > memory_bytes]
+            if over:
+                peak, name = min(over)
+                breaks = {'stage': name, 'rows': project_rows,
+                          'reason': f'projected peak RSS {peak:,.0f} MB exceeds {memory_bytes / MB:,.0f} MB of memory'}
+        slowest = None
+        if completed:
+            largest = max(completed, key=lambda run: run['rows'])
+            slowest = max(largest['stages'], key=lambda r: r['seconds'])['stage']
+        report[pipeline] = {'stages': stages, 'breaks_first': breaks,
+                            'slowest_stage_at_largest_size': slowest}
+    return report
+
+
+def print_runs(runs):
+    for pipeline in dict.fromkeys(run['pipeline'] for run in runs):
+        pipeline_runs = [run for run in runs if run['pipeline'] == pipeline]
+        sizes = [run['rows'] for run in pipeline_runs]
+        print(f'\n{pipeline}: seconds / peak MB')
+        print(f'{"stage":<14}' + ''.join(f'{rows:>22,}' for rows in sizes))
+        for name in PIPELINE_STAGES[pipeline]:
+            cells = []
+            for run in pipeline_runs:
+                record = next((r for r in run.get('stages', []) if r['stage'] == name), None)
+                if run.get('skipped'):
+                    cells.append('skipped')
+                elif record is None:
+                    cells.append('-')
+                elif 'error' in record:
+                    cells.append('FAILED')
+                else:
+                    cells.append(f'{record["seconds"]:.2f}s / {stage_memory_mb(record):,.0f}')
+            print(f'{name:<14}' + ''.join(f'{cell:>22}' for cell in cells))
+
+
+def print_report(report, project_rows):
+    for pipeline, entry in report.items():
+        print(f'\n{pipeline}: growth (seconds ~ rows^k) and projection to {project_rows:,} rows')
+        print(f'{"stage":<14}{"time k":>10}{"memory k":>10}{"seconds":>14}{"peak MB":>14}')
+        for name, stage in entry['stages'].items():
+            cells = [stage.get('time_exponent'), stage.get('memory_exponent'),
+                     stage.get('projected_seconds'), stage.get('projected_peak_mb')]
+            print(f'{name:<14}' + ''.join(f'{"-" if value is None else f"{value:,.2f}":>{width}}'
+                                          for value, width in zip(cells, [10, 10, 14, 14])))
+        breaks = entry['breaks_first']
+        if breaks:
+            print(f'breaks first: {breaks["stage"]} at {breaks["rows"]:,} rows ({breaks["reason"]})')
+        if entry['slowest_stage_at_largest_size']:
+            print(f'slowest stage at the largest size: {entry["slowest_stage_at_largest_size"]}')
+
+
+def worker_main(args):
+    recorder = StageRecorder(args.worker_output, trace=args.tracemalloc)
+    PIPELINES[args.worker](recorder.stage, args.trees)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--pipelines', nargs='+', choices=sorted(PIPELINES), default=['india', 'bengaluru', 'simple', 'spark'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--source', choices=['csv', 'parquet'], default='csv', help='what the India pipelines read')
+    parser.add_argument('--trees', type=int, default=100, help='trees per random forest')
+    parser.add_argument('--budget', type=float, default=600,
+                        help='skip larger sizes once a stage takes longer than this many seconds')
+    parser.add_argument('--timeout', type=float, help='seconds before a run is killed')
+    parser.add_argument('--project', type=int, default=10_000_000, help='rows to project to')
+    parser.add_argument('--tracemalloc', action='store_true', help='also report peak traced allocations')
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/training-<time>-<commit>.json)')
+    parser.add_argument('--worker', choices=sorted(PIPELINES), help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    pipelines = list(args.pipelines)
+    if 'spark' in pipelines:
+        try:
+            import pyspark  # noqa: F401
+        except ImportError:
+            print('pyspark is not installed; skipping the spark pipeline')
+            pipelines.remove('spark')
+
+    runs = []
+    for pipeline in pipelines:
+        stop = None
+        for rows in sorted(args.rows):
+            if stop:
+                runs.append({'pipeline': pipeline, 'rows': rows, 'skipped': stop, 'stages': []})
+                continue
+            start = time.perf_counter()
+            workdir, paths = prepare_data(rows, pipeline, args.seed, args.source)
+            data_seconds = time.perf_counter() - start
+            print(f'{pipeline} at {rows:,} rows...', end=' ', flush=True)
+            run = run_worker(pipeline, rows, workdir, paths, args)
+            run['data_seconds'] = round(data_seconds, 3)
+            runs.append(run)
+            print(f'{run["seconds"]:.1f}s' + (f' FAILED: {run["failure"]}' if run['failure'] else ''))
+            if run['failure']:
+                stop = f'{pipeline} failed at {rows:,} rows'
+            elif max(r['seconds'] for r in run['stages']) > args.budget:
+                stop = f'a stage took over {args.budget:.0f}s at {rows:,} rows'
+
+    memory = total_memory_bytes()
+    report = scaling_report(runs, args.project, memory)
+    print_runs(runs)
+    print_report(report, args.project)
+
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'cpu_count': os.cpu_count(),
+            'memory_mb': round(memory / MB) if memory else None,
+            'params': {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'worker', 'worker_output')},
+        },
+        'runs': runs,
+        'report': report,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f'training-{datetime.now():%Y%m%d-%H%M%S}-{commit or "nogit"}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nWrote {output}')
+
+
+if __name__ == '__main__':
+    main()
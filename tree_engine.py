@@ -0,0 +1,148 @@
+"""Flattened tree-ensemble inference.
+
+A fitted ``RandomForestRegressor`` (or a single ``DecisionTreeRegressor``) is
+copied once into contiguous node arrays: feature, threshold, left, right and
+value for every node of every tree. ``predict`` then walks all trees for all
+rows at once, one tree level per step, with numpy gathers. Only the
+(row, tree) pairs that have not reached a leaf stay active. This avoids
+sklearn's per-call input validation, joblib dispatch and Python loop over
+estimators, which dominate single-row latency.
+
+The gather-based walk loses to sklearn's compiled loops on large batches
+(the crossover is a few hundred rows). So when built with a ``fallback``
+model, batches above ``max_rows`` are handed to the fallback.
+
+Results are bit-for-bit identical to sklearn. Features are compared as
+float32, as sklearn does, and per-tree outputs are summed in estimator order
+before dividing by the tree count.
+"""
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+# Rows evaluated per traversal; bounds the (rows x trees) working arrays
+ROW_CHUNK = 8192
+
+# Default batch size above which a FlatForest defers to its fallback model
+FLAT_MAX_ROWS = 256
+
+
+class FlatForest:
+    """Contiguous node arrays for an ensemble of regression trees"""
+
+    # Per-node and per-tree arrays, as stored by shared_store
+    ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'is_leaf', 'roots']
+
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots, max_depth, n_features_in_,
+                 fallback=None, max_rows=FLAT_MAX_ROWS, is_leaf=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features_in_
+        self.is_leaf = left == np.arange(len(left), dtype=left.dtype) if is_leaf is None else is_leaf
+        self.fallback = fallback
+        self.max_rows = max_rows
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model, keep_fallback=False, max_rows=FLAT_MAX_ROWS):
+        if isinstance(model, RandomForestRegressor):
+            trees = [est.tree_ for est in model.estimators_]
+        elif isinstance(model, DecisionTreeRegressor):
+            trees = [model.tree_]
+        else:
+            raise TypeError(f'Cannot flatten {type(model).__name__}')
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise TypeError('Only single-output regression trees are supported')
+
+        total = sum(tree.node_count for tree in trees)
+        index_dtype = np.int32 if total < 2 ** 31 else np.int64
+        feature = np.empty(total, dtype=index_dtype)
+        threshold = np.empty(total, dtype=np.float64)
+        left = np.empty(total, dtype=index_dtype)
+        right = np.empty(total, dtype=index_dtype)
+        value = np.empty(total, dtype=np.float64)
+        missing_left = np.zeros(total, dtype=bool)
+        roots = np.empty(len(trees), dtype=index_dtype)
+
+        offset = 0
+        for t, tree in enumerate(trees):
+            n = tree.node_count
+            nodes = np.arange(offset, offset + n, dtype=index_dtype)
+            is_leaf = tree.children_left == -1
+            # Leaves point at themselves so extra traversal steps are no-ops
+            feature[offset:offset + n] = np.where(is_leaf, 0, tree.feature)
+            threshold[offset:offset + n] = tree.threshold
+            left[offset:offset + n] = np.where(is_leaf, nodes, tree.children_left + offset)
+            right[offset:offset + n] = np.where(is_leaf, nodes, tree.children_right + offset)
+            value[offset:offset + n] = tree.value[:, 0, 0]
+            if hasattr(tree, 'missing_go_to_left'):
+                missing_left[offset:offset + n] = tree.missing_go_to_left.astype(bool)
+            roots[t] = offset
+            offset += n
+
+        max_depth = max(tree.max_depth for tree in trees)
+        return cls(feature, threshold, left, right, value, missing_left, roots, max_depth, model.n_features_in_,
+                   fallback=model if keep_fallback else None, max_rows=max_rows)
+
+    def _leaves(self, X):
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_base = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        has_nan = np.isnan(X_flat).any()
+
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            x = X_flat[row_base[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_nan:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = nxt
+            active = active[~self.is_leaf[nxt]]
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f'X has {X.shape[1]} features, but the model expects {self.n_features_in_}')
+        if self.fallback is not None and X.shape[0] > self.max_rows:
+            return self.fallback.predict(X)
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            leaf_values = self.value[self._leaves(X[start:start + ROW_CHUNK])]
+            # Sum tree by tree, in order, to reproduce sklearn's rounding
+            total = np.zeros(leaf_values.shape[0], dtype=np.float64)
+            for t in range(self.n_trees):
+                total += leaf_values[:, t]
+            out[start:start + ROW_CHUNK] = total / self.n_trees
+        return out
+
+
+def compile_model(model, max_rows=FLAT_MAX_ROWS):
+    """FlatForest for tree models, deferring large batches to ``model``
+
+    Any other estimator is returned unchanged.
+    """
+    try:
+        return FlatForest.from_sklearn(model, keep_fallback=True, max_rows=max_rows)
+    except TypeError:
+        return model
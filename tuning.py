@@ -0,0 +1,278 @@
+"""Hyperparameter search over the model zoo with successive halving.
+
+Candidates are sampled from ``SEARCH_SPACES``, which covers linear regression,
+decision trees and random forests. Each candidate is scored by k-fold
+cross-validation on a growing share of the training rows. After each rung
+only the best ``1/eta`` candidates go on, so most of the budget goes to the
+candidates that look promising.
+
+The encoded feature matrix and fold indices are cached under
+``<ARTIFACT_DIR>/tuning/<model>/``, keyed on the dataset checksum and the
+preprocessing settings (e.g. ``OUTLIER_IQR_K``). Trials load them
+memory-mapped instead of re-running the encoders, and the folds of a rung run
+in parallel.
+
+Every run writes a leaderboard JSON. It records each candidate's CV error,
+fit time, prediction time per row and tree node count, plus the cheapest
+candidate whose RMSE is within ``tolerance`` of the best:
+
+    python tuning.py --model india --candidates 30 --eta 3
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, ParameterSampler
+from sklearn.tree import DecisionTreeRegressor
+
+import bengaluru_data
+import bengaluru_model
+import config
+import india_model
+from model_store import file_checksum, model_dir
+
+# family -> (estimator class, parameter grid)
+SEARCH_SPACES = {
+    'linear': (LinearRegression, {'fit_intercept': [True, False]}),
+    'tree': (DecisionTreeRegressor, {
+        'max_depth': [4, 6, 8, 12, 16, None],
+        'min_samples_leaf': [1, 2, 5, 10, 20],
+    }),
+    'forest': (RandomForestRegressor, {
+        'n_estimators': [10, 25, 50, 100],
+        'max_depth': [6, 10, 14, None],
+        'max_features': [0.33, 0.6, 1.0],
+        'min_samples_leaf': [1, 2, 5],
+    }),
+}
+
+# Set on every candidate; folds already run in parallel, so forests stay single-threaded
+FIXED_PARAMS = {
+    'tree': {'random_state': 42},
+    'forest': {'random_state': 42, 'n_jobs': 1},
+}
+
+# model name -> (feature preparation, dataset)
+DATASETS = {
+    'india': (india_model.prepare_training_data, config.DATA_PATH),
+    'bengaluru': (bengaluru_model.prepare_training_data, config.BENGALURU_DATA_PATH),
+}
+
+
+# model name -> settings its feature preparation depends on, part of the fold cache key
+PREPROCESSING = {
+    'india': lambda: {'outlier_iqr_k': config.OUTLIER_IQR_K},
+    'bengaluru': lambda: {'min_sqft_per_bhk': bengaluru_data.MIN_SQFT_PER_BHK},
+}
+
+
+def preprocessing_key(name):
+    params = json.dumps(PREPROCESSING[name](), sort_keys=True)
+    return hashlib.sha256(params.encode()).hexdigest()[:8]
+
+
+def tuning_dir(name, root=None):
+    return os.path.join(model_dir('tuning', root), name)
+
+
+def load_folds(name, data_path=None, n_splits=5, seed=42, root=None):
+    """Encoded ``X``, ``y`` and k-fold indices for a dataset, cached on disk
+
+    The cache is keyed on the dataset checksum and the preprocessing settings,
+    so a changed file or outlier filter is encoded again. The arrays come back
+    memory-mapped.
+    """
+    prepare, default_path = DATASETS[name]
+    data_path = data_path or default_path
+    checksum = file_checksum(data_path)
+    base = tuning_dir(name, root)
+    path = os.path.join(base, f'folds-{checksum[:16]}-p{preprocessing_key(name)}-k{n_splits}-s{seed}.joblib')
+    if os.path.exists(path):
+        return joblib.load(path, mmap_mode='r')
+
+    X, y = prepare(data_path)[:2]
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=seed).split(X))
+    cached = {'X': X, 'y': y, 'folds': folds, 'data_checksum': checksum, 'preprocessing': PREPROCESSING[name]()}
+
+    os.makedirs(base, exist_ok=True)
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    joblib.dump(cached, tmp_path)
+    os.replace(tmp_path, path)
+    return joblib.load(path, mmap_mode='r')
+
+
+def sample_candidates(n_candidates, families=None, seed=42):
+    """``[(family, params)]`` spread evenly over the requested families"""
+    families = families or list(SEARCH_SPACES)
+    per_family = math.ceil(n_candidates / len(families))
+    candidates = []
+    for family in families:
+        grid = SEARCH_SPACES[family][1]
+        size = math.prod(len(values) for values in grid.values())
+        for params in ParameterSampler(grid, n_iter=min(per_family, size), random_state=seed):
+            candidates.append((family, params))
+    return candidates
+
+
+def build_estimator(family, params):
+    estimator_cls = SEARCH_SPACES[family][0]
+    return estimator_cls(**{**params, **FIXED_PARAMS.get(family, {})})
+
+
+def node_count(model):
+    if hasattr(model, 'estimators_'):
+        return int(sum(est.tree_.node_count for est in model.estimators_))
+    if hasattr(model, 'tree_'):
+        return int(model.tree_.node_count)
+    return 0
+
+
+def _score_fold(family, params, X, y, train_idx, test_idx):
+    model = build_estimator(family, params)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    X_test = X[test_idx]
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    y_test = y[test_idx]
+    return {
+        'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+        'fit_seconds': fit_seconds,
+        'predict_us_per_row': predict_seconds / len(test_idx) * 1e6,
+        'n_nodes': node_count(model),
+    }
+
+
+def rung_sizes(n_candidates, n_rows, eta=3, min_rows=None):
+    """Training rows per fold for each rung; the last rung uses all of them
+
+    Rungs are chosen so between 1 and ``eta`` finalists reach the last one.
+    """
+    n_rungs = max(1, math.floor(math.log(max(n_candidates, 1), eta) + 1e-9))
+    min_rows = min_rows or max(n_rows // eta ** (n_rungs - 1), 100)
+    return [min(n_rows, int(min_rows * eta ** k)) for k in range(n_rungs - 1)] + [n_rows]
+
+
+def successive_halving(candidates, folds, eta=3, min_rows=None, n_jobs=None, verbose=True, seed=42):
+    """Run the rungs and return one leaderboard entry per candidate
+
+    A rung with ``rows`` rows trains each fold on the first ``rows`` of a
+    seeded shuffle of that fold's training rows. KFold returns them in file
+    order, and a prefix of that would be a biased slice of sorted files.
+    Every candidate sees the same rows, and each rung's rows include the
+    previous rung's.
+    """
+    X, y = folds['X'], folds['y']
+    n_rows = min(len(train) for train, _ in folds['folds'])
+    rng = np.random.default_rng(seed)
+    shuffled = [(rng.permutation(train), test) for train, test in folds['folds']]
+    sizes = rung_sizes(len(candidates), n_rows, eta, min_rows)
+    survivors = list(range(len(candidates)))
+    entries = {}
+
+    with Parallel(n_jobs=n_jobs or config.TRAIN_N_JOBS) as parallel:
+        for rung, rows in enumerate(sizes):
+            start = time.perf_counter()
+            scores = parallel(
+                delayed(_score_fold)(*candidates[i], X, y, np.sort(train[:rows]), test)
+                for i in survivors for train, test in shuffled
+            )
+            n_folds = len(folds['folds'])
+            for k, i in enumerate(survivors):
+                per_fold = scores[k * n_folds:(k + 1) * n_folds]
+                family, params = candidates[i]
+                entry = {'family': family, 'params': params, 'rung': rung, 'rows': rows}
+                for metric in per_fold[0]:
+                    entry[metric] = float(np.mean([s[metric] for s in per_fold]))
+                entry['rmse_std'] = float(np.std([s['rmse'] for s in per_fold]))
+                entries[i] = entry
+
+            if verbose:
+                print(f"rung {rung}: {len(survivors)} candidates x {n_folds} folds on {rows} rows "
+                      f"({time.perf_counter() - start:.1f}s)")
+            if rung < len(sizes) - 1:
+                keep = max(1, len(survivors) // eta)
+                survivors = sorted(survivors, key=lambda i: entries[i]['rmse'])[:keep]
+
+    return sorted(entries.values(), key=lambda e: (-e['rung'], e['rmse']))
+
+
+def recommend(leaderboard, tolerance=0.01):
+    """Fastest-predicting finalist whose RMSE is within ``tolerance`` of the best"""
+    final_rung = leaderboard[0]['rung']
+    finalists = [e for e in leaderboard if e['rung'] == final_rung]
+    best_rmse = min(e['rmse'] for e in finalists)
+    eligible = [e for e in finalists if e['rmse'] <= best_rmse * (1 + tolerance)]
+    return min(eligible, key=lambda e: e['predict_us_per_row'])
+
+
+def write_leaderboard(name, report, root=None):
+    base = tuning_dir(name, root)
+    os.makedirs(base, exist_ok=True)
+    path = os.path.join(base, f"leaderboard-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    return path
+
+
+def tune(name, n_candidates=30, eta=3, n_splits=5, min_rows=None, families=None, tolerance=0.01,
+         n_jobs=None, seed=42, root=None):
+    start = time.perf_counter()
+    folds = load_folds(name, n_splits=n_splits, seed=seed, root=root)
+    candidates = sample_candidates(n_candidates, families, seed)
+    leaderboard = successive_halving(candidates, folds, eta, min_rows, n_jobs, seed=seed)
+    report = {
+        'model': name,
+        'data_checksum': folds['data_checksum'],
+        'eta': eta,
+        'folds': n_splits,
+        'candidates': len(candidates),
+        'tolerance': tolerance,
+        'seconds': time.perf_counter() - start,
+        'recommended': recommend(leaderboard, tolerance),
+        'leaderboard': leaderboard,
+    }
+    return report, write_leaderboard(name, report, root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Successive-halving hyperparameter search')
+    parser.add_argument('--model', choices=sorted(DATASETS), default='india')
+    parser.add_argument('--candidates', type=int, default=30)
+    parser.add_argument('--eta', type=int, default=3, help='keep 1/eta of the candidates per rung')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--min-rows', type=int, help='training rows per fold in the first rung')
+    parser.add_argument('--families', nargs='+', choices=sorted(SEARCH_SPACES))
+    parser.add_argument('--tolerance', type=float, default=0.01, help='relative RMSE slack for the recommendation')
+    args = parser.parse_args()
+
+    report, path = tune(args.model, args.candidates, args.eta, args.folds, args.min_rows, args.families,
+                        args.tolerance)
+    print(f"\n{'family':8} {'rmse':>10} {'fit s':>8} {'us/row':>8} {'nodes':>9}  params")
+    for entry in [e for e in report['leaderboard'] if e['rung'] == report['leaderboard'][0]['rung']]:
+        print(f"{entry['family']:8} {entry['rmse']:10.4f} {entry['fit_seconds']:8.2f} "
+              f"{entry['predict_us_per_row']:8.2f} {entry['n_nodes']:9.0f}  {entry['params']}")
+    best = report['recommended']
+    print(f"\nRecommended: {best['family']} {best['params']} (RMSE {best['rmse']:.4f})")
+    print(f"Leaderboard written to {path}")
+
+
+if __name__ == '__main__':
+    main()